@@ -0,0 +1,99 @@
+"""
+Measures the time taken to import rcpchgrowth in a fresh interpreter.
+
+Each run starts a new Python process, so nothing is cached in memory between runs (the operating
+system file cache will be warm after the first). The median of the runs is reported, together with
+the time for an interpreter that imports nothing, and whether scipy was imported.
+
+For each of ENTRY_POINTS the total `python -X importtime` reports (less the modules an empty
+interpreter imports at start up) is also reported as the median of the runs, together with the number
+of rcpchgrowth modules and which of the heavy third party packages the statement imported.
+
+    python benchmarks/import_time.py [runs]
+"""
+
+# standard imports
+import re
+import statistics
+import subprocess
+import sys
+
+IMPORT_RCPCHGROWTH = (
+    "import time, sys; start = time.perf_counter(); import rcpchgrowth; "
+    "print(time.perf_counter() - start, 'scipy' in sys.modules)"
+)
+
+# the imports a typical caller starts with
+ENTRY_POINTS = [
+    "import rcpchgrowth",
+    "from rcpchgrowth import sds_for_measurement",
+    "from rcpchgrowth import Measurement",
+    "from rcpchgrowth import create_chart",
+    "from rcpchgrowth import sds_and_centile_for_measurements",
+]
+HEAVY_PACKAGES = ["numpy", "scipy", "dateutil"]
+_IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)")
+
+
+def time_import(runs: int) -> tuple:
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_RCPCHGROWTH], capture_output=True, text=True, check=True
+        )
+        seconds, scipy_imported = result.stdout.split()
+        timings.append(float(seconds))
+    return statistics.median(timings), scipy_imported == "True"
+
+
+def time_interpreter(runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", "import time; print(time.perf_counter())"], capture_output=True, text=True, check=True
+        )
+        timings.append(float(result.stdout))
+    return statistics.median(timings)
+
+
+def importtime(statement: str, runs: int) -> tuple:
+    """
+    Returns the median total -X importtime (seconds) of the modules statement imports, and the names of the
+    rcpchgrowth modules and heavy packages it imported. The modules imported at start up are included.
+    """
+    timings = []
+    for _ in range(runs):
+        # -X importtime does not log the modules imported with importlib.import_module (as rcpchgrowth does for
+        # its public names), so the modules imported are read from sys.modules
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"{statement}\nimport sys; print(*sys.modules)"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        total = 0
+        for line in result.stderr.splitlines():
+            match = _IMPORTTIME_LINE.match(line)
+            if match is not None and len(match.group(2)) == 1:
+                # top level imports: their cumulative times include everything they imported
+                total += int(match.group(1))
+        timings.append(total / 1e6)
+    imported = [
+        module for module in result.stdout.split() if module.startswith("rcpchgrowth.") or module in HEAVY_PACKAGES
+    ]
+    return statistics.median(timings), sorted(imported)
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    seconds, scipy_imported = time_import(runs)
+    print(f"import rcpchgrowth: {seconds * 1000:.1f} ms (median of {runs}), scipy imported: {scipy_imported}")
+    start_up, _ = importtime("pass", runs)
+    for statement in ENTRY_POINTS:
+        seconds, imported = importtime(statement, runs)
+        heavy_packages = [module for module in imported if module in HEAVY_PACKAGES]
+        print(
+            f"-X importtime {statement}: {(seconds - start_up) * 1000:.1f} ms, "
+            f"{len(imported) - len(heavy_packages)} rcpchgrowth modules, "
+            f"heavy packages: {', '.join(heavy_packages) or 'none'}"
+        )
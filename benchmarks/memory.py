@@ -0,0 +1,56 @@
+"""
+Measures the memory a process uses for the reference data once it has touched every reference.
+
+A fresh Python process imports rcpchgrowth and then calculates an SDS for every reference, measurement method and
+sex at ages every 0.1 years from -0.3 to 20 (so every reference data table is loaded and interpolated). The resident
+set size (from /proc/self/statm, so Linux only) is reported after the import and after the calculations, as the
+median of the runs.
+
+    python benchmarks/memory.py [runs]
+"""
+
+# standard imports
+import statistics
+import subprocess
+import sys
+
+TOUCH_EVERY_REFERENCE = """
+import os
+
+def rss():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+start = rss()
+from rcpchgrowth import global_functions
+from rcpchgrowth.constants import REFERENCES, MEASUREMENT_METHODS, SEXES
+imported = rss()
+for reference in REFERENCES:
+    for measurement_method in MEASUREMENT_METHODS:
+        for sex in SEXES:
+            for tenths in range(-3, 201):
+                try:
+                    global_functions.sds_for_measurement(reference, tenths / 10, measurement_method, 10.0, sex)
+                except Exception:
+                    # not every reference has every measurement, sex and age
+                    pass
+print(start, imported, rss())
+"""
+
+
+def measure(runs: int) -> tuple:
+    results = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", TOUCH_EVERY_REFERENCE], capture_output=True, text=True, check=True
+        )
+        results.append([int(value) for value in result.stdout.split()])
+    start, imported, touched = (statistics.median(values) for values in zip(*results))
+    return imported - start, touched - imported
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    imported, touched = measure(runs)
+    print(f"RSS added by the import: {imported / 2**20:.1f} MB (median of {runs})")
+    print(f"RSS added by touching every reference: {touched / 2**20:.1f} MB")
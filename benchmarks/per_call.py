@@ -0,0 +1,75 @@
+"""
+Measures the time per call of the scalar calculation functions.
+
+    python benchmarks/per_call.py
+"""
+
+# standard imports
+from datetime import date
+import timeit
+
+# rcpch imports
+from rcpchgrowth import centile_bands, chart_bytes, create_chart, global_functions, Measurement
+from rcpchgrowth.constants import (
+    UK_WHO, CDC, HEIGHT, BMI, FEMALE, MALE, MINIMAL_PROFILE, NUMERIC_PROFILE, PLOTTABLE_PROFILE
+)
+
+CALLS = {
+    "sds_for_measurement (uk-who height, cubic)": lambda: global_functions.sds_for_measurement(
+        reference=UK_WHO, age=7.3, measurement_method=HEIGHT, observation_value=121.0, sex=FEMALE
+    ),
+    "sds_for_measurement (cdc bmi, linear)": lambda: global_functions.sds_for_measurement(
+        reference=CDC, age=11.07, measurement_method=BMI, observation_value=27.0, sex=MALE
+    ),
+    "measurement_from_sds (uk-who height)": lambda: global_functions.measurement_from_sds(
+        reference=UK_WHO, requested_sds=1.5, measurement_method=HEIGHT, sex=FEMALE, age=7.3
+    ),
+    "Measurement (uk-who bmi, term)": lambda: Measurement(
+        sex=FEMALE, birth_date=date(2015, 3, 1), observation_date=date(2023, 7, 12), measurement_method=BMI,
+        observation_value=17.2, reference=UK_WHO, gestation_weeks=40, gestation_days=0
+    ),
+    "Measurement(...).measurement (uk-who bmi, term)": lambda: Measurement(
+        sex=FEMALE, birth_date=date(2015, 3, 1), observation_date=date(2023, 7, 12), measurement_method=BMI,
+        observation_value=17.2, reference=UK_WHO, gestation_weeks=40, gestation_days=0
+    ).measurement,
+    "Measurement(..., profile=\"minimal\").measurement (uk-who bmi, term)": lambda: Measurement(
+        sex=FEMALE, birth_date=date(2015, 3, 1), observation_date=date(2023, 7, 12), measurement_method=BMI,
+        observation_value=17.2, reference=UK_WHO, gestation_weeks=40, gestation_days=0, profile=MINIMAL_PROFILE
+    ).measurement,
+    "Measurement(..., profile=\"numeric\").measurement (uk-who bmi, term)": lambda: Measurement(
+        sex=FEMALE, birth_date=date(2015, 3, 1), observation_date=date(2023, 7, 12), measurement_method=BMI,
+        observation_value=17.2, reference=UK_WHO, gestation_weeks=40, gestation_days=0, profile=NUMERIC_PROFILE
+    ).measurement,
+    "Measurement(..., profile=\"plottable\").measurement (uk-who bmi, term)": lambda: Measurement(
+        sex=FEMALE, birth_date=date(2015, 3, 1), observation_date=date(2023, 7, 12), measurement_method=BMI,
+        observation_value=17.2, reference=UK_WHO, gestation_weeks=40, gestation_days=0, profile=PLOTTABLE_PROFILE
+    ).measurement,
+    "Measurement (uk-who bmi, preterm)": lambda: Measurement(
+        sex=MALE, birth_date=date(2022, 3, 1), observation_date=date(2022, 9, 12), measurement_method=BMI,
+        observation_value=16.8, reference=UK_WHO, gestation_weeks=30, gestation_days=2
+    ),
+    "create_chart (uk-who height, cached)": lambda: create_chart(
+        reference=UK_WHO, measurement_method=HEIGHT, sex=FEMALE
+    ),
+    "chart_bytes (uk-who height, gzip)": lambda: chart_bytes(
+        reference=UK_WHO, measurement_method=HEIGHT, sex=FEMALE
+    ),
+    "centile": lambda: global_functions.centile(1.2),
+    "centile_band_for_centile": lambda: centile_bands.centile_band_for_centile(1.2, HEIGHT),
+    "sds_for_centile": lambda: global_functions.sds_for_centile(91.0),
+    "linear_interpolation": lambda: global_functions.linear_interpolation(
+        age=1.5, age_one_below=1.0, age_one_above=2.0, parameter_one_below=0.5, parameter_one_above=0.7
+    ),
+}
+
+
+def time_calls(repeat: int = 5, number: int = 2000) -> dict:
+    return {
+        name: min(timeit.repeat(call, repeat=repeat, number=number)) / number
+        for name, call in CALLS.items()
+    }
+
+
+if __name__ == "__main__":
+    for name, seconds in time_calls().items():
+        print(f"{name}: {seconds * 1e6:.2f} µs")
@@ -1,16 +1,118 @@
-from .age_advice_strings import comment_prematurity_correction
-from .bmi_functions import bmi_from_height_weight, weight_for_bmi_height
-from .cdc import select_reference_data_for_cdc_chart
-from .centile_bands import centile_band_for_centile
-from .chart_functions import create_chart
+"""
+The public names of rcpchgrowth are imported from their submodules on first use, so `import rcpchgrowth` (or
+`from rcpchgrowth import sds_for_measurement`) only imports the modules it needs. numpy, for example, is only
+imported by the batch functions. The constants are cheap to import and are always imported.
+"""
+
+# standard imports
+from importlib import import_module as _import_module
+
 from .constants import *
-from .date_calculations import chronological_decimal_age, corrected_decimal_age, chronological_calendar_age, estimated_date_delivery, corrected_gestational_age
-from .dynamic_growth import create_thrive_line, return_correlation, create_thrive_lines
-from .global_functions import centile, sds_for_measurement, measurement_from_sds, percentage_median_bmi, measurement_for_z, cubic_interpolation, linear_interpolation
-from .fictional_child import generate_fictional_child_data
-from .measurement import Measurement
-from .mid_parental_height import mid_parental_height, mid_parental_height_z, expected_height_z_from_mid_parental_height_z, lower_and_upper_limits_of_expected_height_z
-from .trisomy_21 import select_reference_data_for_trisomy_21
-from .trisomy_21_aap import select_reference_data_for_trisomy_21_aap
-from .turner import select_reference_data_for_turner
-from .uk_who import select_reference_data_for_uk_who_chart
+
+# public name: the submodule it is imported from
+_LAZY_ATTRIBUTES = {
+    "comment_prematurity_correction": "age_advice_strings",
+    "sds_and_centile_for_measurements": "batch_functions",
+    "measurements_from_sds": "batch_functions",
+    "reference_data_status": "batch_functions",
+    "centile_band_codes": "batch_functions",
+    "centile_bands_for_codes": "batch_functions",
+    "chronological_decimal_ages": "batch_functions",
+    "corrected_decimal_ages": "batch_functions",
+    "chronological_calendar_ages": "batch_functions",
+    "estimated_dates_delivery": "batch_functions",
+    "corrected_gestational_ages": "batch_functions",
+    "bmi_from_height_weight": "bmi_functions",
+    "weight_for_bmi_height": "bmi_functions",
+    "select_reference_data_for_cdc_chart": "cdc",
+    "centile_band_for_centile": "centile_bands",
+    "centile_band_code": "centile_bands",
+    "centile_band_for_code": "centile_bands",
+    "CHART_CACHE": "chart_cache",
+    "create_chart": "chart_functions",
+    "chronological_decimal_age": "date_calculations",
+    "corrected_decimal_age": "date_calculations",
+    "chronological_calendar_age": "date_calculations",
+    "calendar_age_years_months_days": "date_calculations",
+    "calendar_age_words": "date_calculations",
+    "estimated_date_delivery": "date_calculations",
+    "corrected_gestational_age": "date_calculations",
+    "create_thrive_line": "dynamic_growth",
+    "return_correlation": "dynamic_growth",
+    "create_thrive_lines": "dynamic_growth",
+    "centile": "global_functions",
+    "sds_for_measurement": "global_functions",
+    "measurement_from_sds": "global_functions",
+    "percentage_median_bmi": "global_functions",
+    "measurement_for_z": "global_functions",
+    "cubic_interpolation": "global_functions",
+    "linear_interpolation": "global_functions",
+    "generate_fictional_child_data": "fictional_child",
+    "LMS_CACHE": "lms_cache",
+    "LMS_GRID": "lms_tables",
+    "Measurement": "measurement",
+    "MeasurementResult": "measurement_result",
+    "chart_bytes": "precomputed_charts",
+    "mid_parental_height": "mid_parental_height",
+    "mid_parental_height_z": "mid_parental_height",
+    "expected_height_z_from_mid_parental_height_z": "mid_parental_height",
+    "lower_and_upper_limits_of_expected_height_z": "mid_parental_height",
+    "select_reference_data_for_trisomy_21": "trisomy_21",
+    "select_reference_data_for_trisomy_21_aap": "trisomy_21_aap",
+    "select_reference_data_for_turner": "turner",
+    "select_reference_data_for_uk_who_chart": "uk_who",
+}
+
+# submodules that were available as attributes of the package once it was imported
+_LAZY_SUBMODULES = {
+    "age_advice_strings",
+    "batch_functions",
+    "bmi_functions",
+    "bone_age",
+    "cdc",
+    "centile_bands",
+    "chart_cache",
+    "chart_functions",
+    "date_calculations",
+    "dynamic_growth",
+    "fictional_child",
+    "global_functions",
+    "lms_cache",
+    "lms_tables",
+    "measurement",
+    "measurement_result",
+    "mid_parental_height",
+    "precomputed_charts",
+    "reference_registry",
+    "trisomy_21",
+    "trisomy_21_aap",
+    "turner",
+    "uk_who",
+    "who",
+}
+
+
+__all__ = [name for name in globals() if not name.startswith("_")] + list(_LAZY_ATTRIBUTES) + sorted(
+    _LAZY_SUBMODULES.difference(_LAZY_ATTRIBUTES)
+)
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module_name = _LAZY_ATTRIBUTES[name]
+        value = getattr(_import_module(f".{module_name}", __name__), name)
+        if module_name in _LAZY_ATTRIBUTES:
+            # importing a submodule binds it on the package, which hides a public name it shares (the
+            # mid_parental_height function lives in the mid_parental_height module), so the name is bound again
+            globals()[module_name] = getattr(_import_module(f".{_LAZY_ATTRIBUTES[module_name]}", __name__), module_name)
+    elif name in _LAZY_SUBMODULES:
+        value = _import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # later lookups find the name in the module without calling __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
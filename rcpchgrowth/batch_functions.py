@@ -0,0 +1,710 @@
+"""
+Vectorised (batch) versions of the public SDS and centile functions in global_functions.
+
+The scalar functions select a reference, scan the LMS list and interpolate L, M and S once per
+observation. For large datasets this is slow, so these functions accept NumPy arrays (or anything
+that can be broadcast to them) and do the same work as array operations. Rows are grouped internally
+by reference, measurement_method and sex, so mixed datasets can be scored in a single call.
+
+The date calculations in date_calculations also have batch versions, which take columns of NumPy datetime64 dates
+(or integer days since 1970-01-01) instead of a Python date object per row.
+
+Results match the scalar path. Where the scalar path would raise (for example, because there is no
+reference data for that age and measurement_method) the batch functions return NaN.
+"""
+
+# third party imports
+import numpy as np
+
+# rcpch imports
+from .centile_bands import centile_bands_for_format, centile_band_for_code
+from .constants import *
+from .date_calculations import calendar_age_words
+from .lms_tables import LMSTable
+from .measurement_result import measurement_fields
+from .normal_distribution import normal_cdf_array, normal_ppf_array
+from .reference_data import REFERENCE_DATA
+from .reference_registry import reference_for
+
+"""
+birth_date: date of birth
+observation_date: date of observation
+sex: sex (string, MALE or FEMALE)
+age: chronological or corrected decimal age - array
+measurement_method: height, weight, bmi, ofc (decimal) - string or array
+observation_value: value (float) - array
+reference: reference data - string or array
+"""
+
+"""Public functions"""
+
+
+def sds_and_centile_for_measurements(
+    reference,
+    age,
+    measurement_method,
+    observation_value,
+    sex,
+    profile: str = FULL_PROFILE,
+    fields: list = None,
+    return_status: bool = False,
+) -> tuple:
+    """
+    Batch version of sds_for_measurement and centile.
+    Accepts arrays (or scalars, which are broadcast) of reference, age, measurement_method, observation_value and sex
+    and returns a tuple of two float arrays: (sds, centile).
+    As with sds_for_measurement, the oldest reference is always selected at the disjunction ages.
+    Rows for which there is no reference data are returned as NaN.
+    As for a Measurement, a profile or list of fields (see measurement_constants.py) selects what is calculated:
+    where no centile is asked for (as in the minimal profile) the centiles are not calculated, and are returned as None.
+    With return_status, a third array gives the reason each NaN row has no result (see status_constants.py), without
+    raising or catching an exception for any row: (sds, centile, status).
+    """
+    centiles_wanted = not measurement_fields(profile=profile, fields=fields).isdisjoint(_CENTILE_FIELDS)
+
+    references, ages, measurement_methods, observation_values, sexes = _broadcast_rows(
+        reference, age, measurement_method, observation_value, sex
+    )
+
+    sds = np.full(ages.shape, np.nan)
+    status = np.full(ages.shape, STATUS_OK, dtype=np.int8)
+
+    for (group_reference, group_measurement_method, group_sex), rows in _groups(
+        references, measurement_methods, sexes
+    ):
+        group_ages = ages[rows]
+        l, m, s, sigma, status[rows] = _lms_and_status_for_ages(
+            reference=group_reference,
+            ages=group_ages,
+            measurement_method=group_measurement_method,
+            sex=group_sex,
+            default_youngest_reference=False,  # The oldest child reference should always be selected for SDS calculation
+        )
+        group_sds = z_scores(l=l, m=m, s=s, observation=observation_values[rows])
+
+        if group_reference == CDC and group_measurement_method == BMI:
+            # CDC BMI references use sigma above the 95th centile - see sds_for_measurement
+            group_sds = _cdc_bmi_extended_z_scores(
+                sds=group_sds, l=l, m=m, s=s, sigma=sigma, observation=observation_values[rows]
+            )
+
+        sds[rows] = group_sds
+
+    centile = centiles(sds) if centiles_wanted else None
+    if return_status:
+        _set_missing_status(status, sds, ages, observation_values)
+        return sds, centile, status
+    return sds, centile
+
+
+def reference_data_status(reference, age, measurement_method, sex) -> np.ndarray:
+    """
+    Batch version of reference_data_absent, for any reference.
+    Accepts arrays (or scalars, which are broadcast) of reference, age, measurement_method and sex and returns an
+    array of reason codes (see status_constants.py): STATUS_OK where the reference has data for the age,
+    measurement_method and sex, otherwise the first of the reference_data_absent checks that fails. Missing (NaN) ages
+    are STATUS_MISSING_VALUE. No reference data is loaded.
+    """
+    references, ages, measurement_methods, _, sexes = _broadcast_rows(reference, age, measurement_method, np.nan, sex)
+    status = np.full(ages.shape, STATUS_OK, dtype=np.int8)
+    for (group_reference, group_measurement_method, group_sex), rows in _groups(
+        references, measurement_methods, sexes
+    ):
+        status[rows] = _reference_status(group_reference, ages[rows], group_measurement_method, group_sex)
+    status[(status == STATUS_OK) & np.isnan(ages)] = STATUS_MISSING_VALUE
+    return status
+
+
+def centile_band_codes(sds, measurement_method, centile_format: str = COLE_TWO_THIRDS_SDS_NINE_CENTILES) -> np.ndarray:
+    """
+    Batch version of centile_band_code.
+    Accepts arrays (or scalars, which are broadcast) of sds and measurement_method and returns an array of centile band
+    codes (see reference_constants.py), found with one searchsorted of the band edges of the centile format.
+    centile_bands_for_codes words them as centile_band_for_centile would. NaN SDS are CENTILE_BAND_NONE.
+    """
+    sds, measurement_methods = np.broadcast_arrays(np.asarray(sds, dtype=float), np.asarray(measurement_method, dtype=str))
+    sds = sds.ravel()
+    measurement_methods = measurement_methods.ravel()
+
+    codes = np.full(sds.shape, CENTILE_BAND_NONE, dtype=np.int8)
+    bmi = measurement_methods == BMI
+    # only BMI has its own advisory thresholds, so there is one set of centile bands for BMI and one for the rest
+    for rows in (bmi, ~bmi):
+        if rows.any():
+            centile_bands = centile_bands_for_format(centile_format=centile_format, measurement_method=measurement_methods[rows][0])
+            group_sds = sds[rows]
+            group_codes = np.asarray(centile_bands.codes, dtype=np.int8)[
+                np.searchsorted(centile_bands.edges, group_sds, side="right")
+            ]
+            group_codes[np.isnan(group_sds)] = CENTILE_BAND_NONE
+            codes[rows] = group_codes
+    return codes
+
+
+def centile_bands_for_codes(codes, measurement_method, centile_format: str = COLE_TWO_THIRDS_SDS_NINE_CENTILES) -> np.ndarray:
+    """
+    Batch version of centile_band_for_code.
+    Accepts arrays (or scalars, which are broadcast) of centile band codes (from centile_band_codes) and
+    measurement_method and returns an object array of the advice strings (None for CENTILE_BAND_NONE).
+    Each different code and measurement_method is only worded once.
+    """
+    codes, measurement_methods = np.broadcast_arrays(np.asarray(codes, dtype=np.int8), np.asarray(measurement_method, dtype=str))
+    codes = codes.ravel()
+    measurement_methods = measurement_methods.ravel()
+
+    descriptions = np.empty(codes.shape, dtype=object)
+    for group_measurement_method in np.unique(measurement_methods):
+        rows = measurement_methods == group_measurement_method
+        unique_codes, code_rows = np.unique(codes[rows], return_inverse=True)
+        unique_descriptions = np.empty(unique_codes.shape, dtype=object)
+        unique_descriptions[:] = [
+            centile_band_for_code(code=int(code), measurement_method=str(group_measurement_method), centile_format=centile_format)
+            for code in unique_codes
+        ]
+        descriptions[rows] = unique_descriptions[code_rows.ravel()]
+    return descriptions
+
+
+def measurements_from_sds(
+    reference,
+    requested_sds,
+    measurement_method,
+    sex,
+    age,
+    default_youngest_reference=False,
+) -> np.ndarray:
+    """
+    Batch version of measurement_from_sds.
+    Accepts arrays (or scalars, which are broadcast) of reference, requested_sds, measurement_method, sex and age
+    and returns a float array of measurements, rounded to 4 decimal places as in measurement_from_sds.
+    default_youngest_reference can be a boolean or an array of booleans (one per row).
+    Rows for which there is no reference data, or where 1 + L * S * z < 0, are returned as NaN.
+    """
+
+    references, ages, measurement_methods, requested_sds, sexes = _broadcast_rows(
+        reference, age, measurement_method, requested_sds, sex
+    )
+    default_youngest_reference = np.broadcast_to(default_youngest_reference, ages.shape).ravel()
+
+    observation_values = np.full(ages.shape, np.nan)
+
+    for (group_reference, group_measurement_method, group_sex), rows in _groups(
+        references, measurement_methods, sexes
+    ):
+        l, m, s, sigma = lms_for_ages(
+            reference=group_reference,
+            age=ages[rows],
+            measurement_method=group_measurement_method,
+            sex=group_sex,
+            default_youngest_reference=default_youngest_reference[rows],
+        )
+        group_observation_values = measurements_for_z(z=requested_sds[rows], l=l, m=m, s=s)
+
+        if group_reference == CDC and group_measurement_method == BMI:
+            # CDC BMI references use sigma above the 95th centile - see measurement_from_sds
+            group_observation_values = _cdc_bmi_extended_measurements(
+                observation_values=group_observation_values, z=requested_sds[rows], l=l, m=m, s=s, sigma=sigma
+            )
+
+        observation_values[rows] = group_observation_values
+
+    return _round(observation_values, 4)
+
+
+def measurements_for_z(z, l, m, s) -> np.ndarray:
+    """
+    Batch version of measurement_for_z: returns measurements for arrays of z scores, L, M and S
+    x = M (1 + L S z)^(1/L) where L is not 0
+    x = M e^(S z) where L is 0
+    Where 1 + L S z is negative, it is not possible to calculate a power, and NaN is returned.
+    """
+    z, l, m, s = np.broadcast_arrays(
+        *(np.asarray(parameter, dtype=float) for parameter in (z, l, m, s))
+    )
+    measurement_values = np.full(l.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        first_step = 1 + (l * s * z)
+        box_cox = (l != 0.0) & (first_step >= 0)
+        measurement_values[box_cox] = (first_step[box_cox] ** (1 / l[box_cox])) * m[box_cox]
+        log_normal = l == 0.0
+        measurement_values[log_normal] = np.exp(s[log_normal] * z[log_normal]) * m[log_normal]
+    return measurement_values
+
+
+def centiles(z_score) -> np.ndarray:
+    """
+    Batch version of centile: converts an array of Z Scores to centiles, returned as percentages
+    """
+    return normal_cdf_array(np.asarray(z_score, dtype=float)) * 100
+
+
+def z_scores(l, m, s, observation) -> np.ndarray:
+    """
+    Batch version of z_score: converts arrays of (age-specific) L, M and S parameters into z-scores
+    """
+    l, m, s, observation = np.broadcast_arrays(
+        *(np.asarray(parameter, dtype=float) for parameter in (l, m, s, observation))
+    )
+    sds = np.full(l.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        box_cox = l != 0.0
+        sds[box_cox] = (
+            ((observation[box_cox] / m[box_cox]) ** l[box_cox]) - 1
+        ) / (l[box_cox] * s[box_cox])
+        log_normal = l == 0.0
+        sds[log_normal] = np.log(observation[log_normal] / m[log_normal]) / s[log_normal]
+    return sds
+
+
+def lms_for_ages(
+    reference: str,
+    age,
+    measurement_method: str,
+    sex: str,
+    default_youngest_reference=False,
+) -> tuple:
+    """
+    Batch version of lms_value_array_for_measurement_for_reference and fetch_lms.
+    Returns a tuple of four float arrays (l, m, s, sigma) for an array of ages in a single reference, measurement_method and sex.
+    default_youngest_reference can be a boolean or an array of booleans (one per age).
+    sigma is NaN unless the reference supplies it (CDC BMI). Ages with no reference data are NaN throughout.
+    """
+    l, m, s, sigma, _ = _lms_and_status_for_ages(
+        reference=reference,
+        ages=np.asarray(age, dtype=float),
+        measurement_method=measurement_method,
+        sex=sex,
+        default_youngest_reference=default_youngest_reference,
+    )
+    return l, m, s, sigma
+
+
+def chronological_decimal_ages(birth_date, observation_date) -> np.ndarray:
+    """
+    Batch version of chronological_decimal_age.
+    Accepts arrays (or scalars, which are broadcast) of birth_date and observation_date and returns a float array of
+    decimal ages. Dates can be NumPy datetime64 (or anything that converts to it, such as dates or ISO strings) or
+    integer days since 1970-01-01. Missing dates (NaT or NaN) are returned as NaN.
+    """
+    birth_days, observation_days = np.broadcast_arrays(_epoch_days(birth_date), _epoch_days(observation_date))
+    return (observation_days - birth_days) / 365.25
+
+
+def corrected_decimal_ages(birth_date, observation_date, gestation_weeks, gestation_days) -> np.ndarray:
+    """
+    Batch version of corrected_decimal_age.
+    Accepts arrays (or scalars, which are broadcast) of birth_date, observation_date (as for
+    chronological_decimal_ages), gestation_weeks and gestation_days and returns a float array of corrected decimal
+    ages. As in corrected_decimal_age, 0 gestation_weeks is term. Rows where corrected_decimal_age would raise (the
+    birth date is after the observation date) are returned as NaN.
+    """
+    birth_days, observation_days, gestation_weeks, gestation_days = np.broadcast_arrays(
+        _epoch_days(birth_date),
+        _epoch_days(observation_date),
+        np.asarray(gestation_weeks, dtype=float),
+        np.asarray(gestation_days, dtype=float),
+    )
+    pregnancy_length_days = np.where(
+        gestation_weeks == 0, TERM_PREGNANCY_LENGTH_DAYS, (gestation_weeks * 7) + gestation_days
+    )
+    # adding a timedelta to a date only adds its whole days (rounded down)
+    edd_days = birth_days + np.floor(TERM_PREGNANCY_LENGTH_DAYS - pregnancy_length_days)
+    corrected_ages = (observation_days - edd_days) / 365.25
+    return np.where(birth_days > observation_days, np.nan, corrected_ages)
+
+
+def chronological_calendar_ages(birth_date, observation_date) -> np.ndarray:
+    """
+    Batch version of chronological_calendar_age.
+    Accepts arrays (or scalars, which are broadcast) of birth_date and observation_date (as for
+    chronological_decimal_ages) and returns an object array of calendar ages in words. The years, months and days are
+    worked out as arrays, and each different calendar age is only worded once. Rows where chronological_calendar_age
+    would raise (the birth date is after the observation date), or with a missing date, are None.
+    """
+    birth_days, observation_days = np.broadcast_arrays(_epoch_days(birth_date), _epoch_days(observation_date))
+    calendar_ages = np.full(birth_days.shape, None, dtype=object)
+    in_order = birth_days <= observation_days
+    years, months, days = _calendar_age_years_months_days(
+        birth_days[in_order].astype(np.int64).astype("datetime64[D]"),
+        observation_days[in_order].astype(np.int64).astype("datetime64[D]"),
+    )
+    # the days left over are fewer than 31, so (years, months, days) can be coded as one integer
+    unique_ages, age_rows = np.unique((years * 12 + months) * 31 + days, return_inverse=True)
+    words = np.empty(len(unique_ages), dtype=object)
+    # as chronological_calendar_age, an age of 0 (the same dates) is the birth date
+    words[:] = [
+        calendar_age_words(years=age_months // 12, months=age_months % 12, days=age_days) or "Birth date"
+        for age_months, age_days in (divmod(int(age), 31) for age in unique_ages)
+    ]
+    calendar_ages[in_order] = words[age_rows.ravel()]
+    return calendar_ages
+
+
+def estimated_dates_delivery(birth_date, gestation_weeks, gestation_days) -> np.ndarray:
+    """
+    Batch version of estimated_date_delivery.
+    Accepts arrays (or scalars, which are broadcast) of birth_date (as for chronological_decimal_ages),
+    gestation_weeks and gestation_days and returns a datetime64[D] array of estimated dates of delivery
+    (.astype(np.int64) gives days since 1970-01-01). As in estimated_date_delivery, gestation_weeks of 0 or less is
+    term. Missing birth dates are returned as NaT.
+    """
+    birth_days, gestation_weeks, gestation_days = np.broadcast_arrays(
+        _epoch_days(birth_date), np.asarray(gestation_weeks, dtype=float), np.asarray(gestation_days, dtype=float)
+    )
+    return _datetimes(birth_days + _prematurity_days(gestation_weeks, gestation_days))
+
+
+def corrected_gestational_ages(birth_date, observation_date, gestation_weeks, gestation_days) -> tuple:
+    """
+    Batch version of corrected_gestational_age.
+    Accepts arrays (or scalars, which are broadcast) of birth_date, observation_date (as for
+    chronological_decimal_ages), gestation_weeks and gestation_days and returns a tuple of two float arrays:
+    (corrected_gestation_weeks, corrected_gestation_days). Where corrected_gestational_age returns None (two weeks
+    or more after the estimated date of delivery, or beyond 42 weeks) they are NaN.
+    """
+    birth_days, observation_days, gestation_weeks, gestation_days = np.broadcast_arrays(
+        _epoch_days(birth_date),
+        _epoch_days(observation_date),
+        np.asarray(gestation_weeks, dtype=float),
+        np.asarray(gestation_days, dtype=float),
+    )
+    edd_days = birth_days + _prematurity_days(gestation_weeks, gestation_days)
+    # unlike the estimated date of delivery, 0 gestation_weeks is not treated as term here
+    days_since_conception = observation_days - birth_days + (gestation_weeks * 7) + gestation_days
+    corrected_weeks = np.floor(days_since_conception / 7)
+    corrected_supplementary_days = days_since_conception - (corrected_weeks * 7)
+    no_correction = (
+        (observation_days >= edd_days + 14)
+        | (corrected_weeks > 42)
+        | ((corrected_weeks == 42) & (corrected_supplementary_days > 0))
+    )
+    return (
+        np.where(no_correction, np.nan, corrected_weeks),
+        np.where(no_correction, np.nan, corrected_supplementary_days),
+    )
+
+
+"""
+Private functions
+"""
+
+# the fields (see measurement_constants.py) that include a centile
+_CENTILE_FIELDS = ["corrected_centile", "chronological_centile", "measurement_calculated_values", "plottable_data"]
+
+
+def _lms_and_status_for_ages(
+    reference: str,
+    ages: np.ndarray,
+    measurement_method: str,
+    sex: str,
+    default_youngest_reference=False,
+) -> tuple:
+    # lms_for_ages, with the status of each age (see _reference_status). Ages for which the reference has data, but
+    # not for the measurement_method and sex, are STATUS_NO_MEASUREMENT_DATA.
+    l, m, s, sigma = (np.full(ages.shape, np.nan) for _ in range(4))
+
+    status, data_sets = _select_reference_data(
+        reference=reference,
+        ages=ages,
+        measurement_method=measurement_method,
+        sex=sex,
+        default_youngest_reference=np.broadcast_to(default_youngest_reference, ages.shape),
+    )
+    for selected, data_key, lms_value_array_for_measurement in data_sets:
+        if not selected.any():
+            continue
+        if len(lms_value_array_for_measurement) == 0:
+            status[selected] = STATUS_NO_MEASUREMENT_DATA
+            continue
+        (
+            l[selected],
+            m[selected],
+            s[selected],
+            sigma[selected],
+        ) = _interpolate_lms(
+            ages=ages[selected], lms_columns=_lms_columns(data_key, lms_value_array_for_measurement)
+        )
+
+    return l, m, s, sigma, status
+
+
+def _set_missing_status(status: np.ndarray, results: np.ndarray, ages: np.ndarray, values: np.ndarray):
+    # the rows with reference data but no result are missing an age or value, or could not be calculated
+    no_result = (status == STATUS_OK) & np.isnan(results)
+    status[no_result & (np.isnan(ages) | np.isnan(values))] = STATUS_MISSING_VALUE
+    status[(status == STATUS_OK) & no_result] = STATUS_NOT_CALCULABLE
+
+
+def _broadcast_rows(reference, age, measurement_method, observation_value, sex):
+    # broadcasts all the inputs to one dimensional arrays of the same length
+    ages = np.asarray(age, dtype=float)
+    observation_values = np.asarray(observation_value, dtype=float)
+    references = np.asarray(reference, dtype=str)
+    measurement_methods = np.asarray(measurement_method, dtype=str)
+    sexes = np.asarray(sex, dtype=str)
+
+    references, ages, measurement_methods, observation_values, sexes = np.broadcast_arrays(
+        references, ages, measurement_methods, observation_values, sexes
+    )
+    return (
+        references.ravel(),
+        ages.ravel(),
+        measurement_methods.ravel(),
+        observation_values.ravel(),
+        sexes.ravel(),
+    )
+
+
+def _groups(references, measurement_methods, sexes):
+    # yields ((reference, measurement_method, sex), row indices) for each combination present
+    unique_references, reference_codes = np.unique(references, return_inverse=True)
+    unique_methods, method_codes = np.unique(measurement_methods, return_inverse=True)
+    unique_sexes, sex_codes = np.unique(sexes, return_inverse=True)
+
+    for value in unique_references:
+        if value not in REFERENCES:
+            raise ValueError("No or incorrect reference supplied")
+    for value in unique_methods:
+        if value not in MEASUREMENT_METHODS:
+            raise ValueError(f"{value} is not a recognised measurement_method")
+    for value in unique_sexes:
+        if value not in SEXES:
+            raise ValueError(f"{value} is not a recognised sex")
+
+    combined = (
+        reference_codes.ravel() * len(unique_methods) + method_codes.ravel()
+    ) * len(unique_sexes) + sex_codes.ravel()
+    order = np.argsort(combined, kind="stable")
+    keys, starts = np.unique(combined[order], return_index=True)
+    ends = np.append(starts[1:], len(order))
+
+    for key, start, end in zip(keys, starts, ends):
+        key, sex_code = divmod(int(key), len(unique_sexes))
+        reference_code, method_code = divmod(key, len(unique_methods))
+        yield (
+            str(unique_references[reference_code]),
+            str(unique_methods[method_code]),
+            str(unique_sexes[sex_code]),
+        ), order[start:end]
+
+
+# The LMS tables are loaded once per process (see reference_data.py), so the arrays of each are only built once. They
+# are keyed by the (data file, measurement_method, sex) of the table.
+_LMS_COLUMNS = {}
+
+
+def _lms_columns(data_key: tuple, lms_value_array_for_measurement: LMSTable) -> tuple:
+    # converts an LMSTable into arrays of decimal_age, L, M, S and sigma (or None), whether each interval is cubic
+    # and the coefficients of the interpolating polynomial for each interval (see PiecewiseLMS)
+    # Some data sets have no values for some measurements (eg UK90 preterm BMI) - these are stored as NaN
+    columns = _LMS_COLUMNS.get(data_key)
+    if columns is None:
+
+        def column(values):
+            if isinstance(values, memoryview):
+                # shares the memory of the LMSTable column
+                return np.asarray(values)
+            return np.array([np.nan if value == "" else value for value in values], dtype=float)
+
+        def coefficients(parameter_coefficients):
+            # four per interval, NaN where values are missing, shared with the PiecewiseLMS
+            return np.asarray(parameter_coefficients).reshape(-1, 4)
+
+        piecewise = lms_value_array_for_measurement.piecewise
+        has_sigma = lms_value_array_for_measurement.sigma is not None
+        columns = (
+            column(lms_value_array_for_measurement.decimal_ages),
+            [
+                column(parameter_values)
+                for parameter_values in (
+                    lms_value_array_for_measurement.l,
+                    lms_value_array_for_measurement.m,
+                    lms_value_array_for_measurement.s,
+                    lms_value_array_for_measurement.sigma,
+                )
+                if parameter_values is not None
+            ],
+            # one entry per age (not per interval), so it can be indexed by nearest_lowest_index
+            np.array(piecewise.cubic + [False], dtype=bool),
+            [
+                coefficients(parameter_coefficients)
+                for parameter_coefficients in (piecewise.l, piecewise.m, piecewise.s, piecewise.sigma)
+                if parameter_coefficients is not None
+            ],
+            has_sigma,
+        )
+        _LMS_COLUMNS[data_key] = columns
+    return columns
+
+
+def _interpolate_lms(ages: np.ndarray, lms_columns: tuple) -> tuple:
+    """
+    Array version of fetch_lms. Returns l, m, s and sigma for each age. As in fetch_lms, a reference age within
+    4 decimal places is an exact match, otherwise the precomputed polynomial for the interval is evaluated: cubic
+    where there are two ages either side, linear at the fringes of the reference and always for CDC BMI (which has sigma).
+    Ages outside the reference are returned as NaN (fetch_lms raises).
+    """
+    reference_ages, parameters, cubic_intervals, coefficients, has_sigma = lms_columns
+    size = len(reference_ages)
+
+    # the index of an exact match or the lowest nearest decimal age (see nearest_lowest_index)
+    insertion = np.searchsorted(reference_ages, ages, side="left")
+    exact_match = (insertion < size) & (reference_ages[np.minimum(insertion, size - 1)] == ages)
+    index = np.clip(np.where(exact_match, insertion, insertion - 1), 0, size - 1)
+
+    values = [np.full(ages.shape, np.nan) for _ in parameters]
+
+    matched = np.round(reference_ages[index], 4) == np.round(ages, 4)
+    for value, parameter in zip(values, parameters):
+        value[matched] = parameter[index[matched]]
+
+    # linear intervals, like linear_interpolation, only accept ages within them
+    interpolated = ~matched & (index < size - 1) & (cubic_intervals[index] | (ages >= reference_ages[index]))
+    i = index[interpolated]
+    t = ages[interpolated] - reference_ages[i]
+    for value, parameter_coefficients in zip(values, coefficients):
+        c = parameter_coefficients[i]
+        value[interpolated] = c[:, 0] + t * (c[:, 1] + t * (c[:, 2] + t * c[:, 3]))
+
+    l, m, s = values[:3]
+    sigma = values[3] if has_sigma else np.full(ages.shape, np.nan)
+    return l, m, s, sigma
+
+
+def _cdc_bmi_extended_z_scores(sds, l, m, s, sigma, observation) -> np.ndarray:
+    # array version of the CDC BMI calculation above the 95th centile in sds_for_measurement
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p95 = m * (1 + l * s * 1.645) ** (1 / l)
+        above_p95 = observation > p95
+        centile = normal_cdf_array((observation[above_p95] - p95[above_p95]) / sigma[above_p95]) * 10 + 90
+    sds = sds.copy()
+    sds[above_p95] = normal_ppf_array(centile / 100)
+    return sds
+
+
+def _cdc_bmi_extended_measurements(observation_values, z, l, m, s, sigma) -> np.ndarray:
+    # array version of the CDC BMI calculation above the 95th centile in measurement_from_sds
+    above_p95 = z > 1.645
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p95 = m[above_p95] * (1 + l[above_p95] * s[above_p95] * 1.645) ** (1 / l[above_p95])
+        centile = normal_cdf_array(z[above_p95]) * 100
+        observation_values = observation_values.copy()
+        observation_values[above_p95] = normal_ppf_array((centile - 90) / 10) * sigma[above_p95] + p95
+    # measurement_from_sds raises where the youngest reference (WHO, which has no sigma) is selected at 2y
+    observation_values[np.isnan(sigma)] = np.nan
+    return observation_values
+
+
+def _epoch_days(dates) -> np.ndarray:
+    # days since 1970-01-01 as floats, NaN where the date is missing, from datetime64 (or anything that converts to
+    # it) or from integer days
+    dates = np.asarray(dates)
+    if dates.dtype.kind in "iuf":
+        return dates.astype(float)
+    dates = dates.astype("datetime64[D]")
+    return np.where(np.isnat(dates), np.nan, dates.astype(np.int64))
+
+
+def _calendar_age_years_months_days(birth_dates: np.ndarray, observation_dates: np.ndarray) -> tuple:
+    # as calendar_age_years_months_days, for datetime64[D] arrays
+    birth_months = birth_dates.astype("datetime64[M]")
+    observation_months = observation_dates.astype("datetime64[M]")
+    birth_day = (birth_dates - birth_months).astype(np.int64)  # days into the month
+    months = (observation_months - birth_months).astype(np.int64)
+    # a month fewer where the observation is earlier in its month than the birth date (or the end of the month)
+    months = months - ((observation_dates - observation_months).astype(np.int64) < np.minimum(
+        birth_day, _days_in_months(observation_months) - 1))
+    whole_months = birth_months + months
+    whole_months_date = whole_months.astype("datetime64[D]") + np.minimum(birth_day, _days_in_months(whole_months) - 1)
+    years, months = np.divmod(months, 12)
+    return years, months, (observation_dates - whole_months_date).astype(np.int64)
+
+
+def _days_in_months(months: np.ndarray) -> np.ndarray:
+    # the number of days in each datetime64[M] month
+    return ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+
+
+def _datetimes(days: np.ndarray) -> np.ndarray:
+    # days since 1970-01-01 (floats, which may be NaN) as datetime64[D], NaT where NaN
+    missing = np.isnan(days)
+    return np.where(missing, np.datetime64("NaT", "D"), np.where(missing, 0, days).astype(np.int64).astype("datetime64[D]"))
+
+
+def _prematurity_days(gestation_weeks: np.ndarray, gestation_days: np.ndarray) -> np.ndarray:
+    # days from birth to the estimated date of delivery: as estimated_date_delivery, 0 (or fewer) weeks is term
+    pregnancy_length_days = np.where(
+        gestation_weeks > 0, (gestation_weeks * 7) + gestation_days, TERM_PREGNANCY_LENGTH_DAYS
+    )
+    return np.floor(TERM_PREGNANCY_LENGTH_DAYS - pregnancy_length_days)
+
+
+def _round(values: np.ndarray, ndigits: int) -> np.ndarray:
+    # np.round scales before rounding, so can disagree with round() where the scaled value lands on a half:
+    # these few values are rounded with round() to match the scalar functions exactly
+    rounded = np.round(values, ndigits)
+    scaled = values * 10**ndigits
+    halves = np.flatnonzero(np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6)
+    rounded[halves] = [round(float(value), ndigits) for value in values[halves]]
+    return rounded
+
+
+def _select_reference_data(reference: str, ages: np.ndarray, measurement_method: str, sex: str, default_youngest_reference: np.ndarray):
+    """
+    Array version of lms_value_array_for_measurement_for_reference.
+    Returns the status of each age (see _reference_status) and a list of (boolean mask, (data file, measurement_method,
+    sex), lms_value_array_for_measurement) triples, one for each of the segments that make up the reference. Ages
+    without reference data are not in any mask.
+    As Reference.segment_for_age, each age belongs to the first segment whose upper age limit covers it.
+    Segments without any ages are not loaded (see reference_data.py).
+    """
+    status = _reference_status(reference, ages, measurement_method, sex)
+    unassigned = status == STATUS_OK
+    data_sets = []
+    for segment in reference_for(reference).segments.values():
+        upper_age = segment.upper_age(measurement_method)
+        if upper_age.age is None:
+            selected = unassigned.copy()
+        else:
+            at_limit = upper_age.inclusive or (upper_age.disjunction & default_youngest_reference)
+            selected = unassigned & ((ages < upper_age.age) | ((ages == upper_age.age) & at_limit))
+        unassigned &= ~selected
+        data_file = segment.data_file(measurement_method)
+        if selected.any() and data_file is not None:
+            data_set = REFERENCE_DATA.load(data_file)["measurement"].get(measurement_method, {}).get(sex, [])
+        else:
+            data_set = []
+        data_sets.append((selected, (data_file, measurement_method, sex), data_set))
+    return status, data_sets
+
+
+def _reference_status(reference: str, ages: np.ndarray, measurement_method: str, sex: str) -> np.ndarray:
+    """
+    Array version of Reference.reference_data_absent: the reason code (see status_constants.py) of the first absence
+    rule of the segments of the reference that applies to each age, or STATUS_OK.
+    """
+    checks = []
+    for segment in reference_for(reference).segments.values():
+        for rule in segment.absence_rules:
+            if not rule.applies_to(measurement_method, sex):
+                continue
+            if rule.below is None and rule.above is None:
+                mask = True
+            else:
+                mask = np.zeros(ages.shape, dtype=bool)
+                if rule.below is not None:
+                    mask |= ages < rule.below
+                if rule.above is not None:
+                    mask |= ages > rule.above
+            checks.append((mask, rule.status))
+    return _status(ages, checks)
+
+
+def _status(ages: np.ndarray, checks: list) -> np.ndarray:
+    # checks are (mask, code) pairs in the order the absence rules are checked: the code of the first mask that is
+    # True for an age is its status
+    return np.select(
+        [np.broadcast_to(mask, ages.shape) for mask, _ in checks],
+        [code for _, code in checks],
+        default=STATUS_OK,
+    ).astype(np.int8)
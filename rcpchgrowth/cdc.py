@@ -4,11 +4,10 @@ Handles CDC-specific reference data selection
 
 # standard imports
 import json
-from importlib import resources
-from pathlib import Path
 
 # rcpch imports
 from .constants import *
+from .reference_data import REFERENCE_DATA, returns_plain_reference_data
 
 """
 birth_date: date of birth
@@ -24,8 +23,26 @@ lms: L, M or S
 reference: reference data
 """
 
-# load the reference data
-data_directory = resources.files("rcpchgrowth.data_tables")
+# the reference data files, loaded on first use through REFERENCE_DATA (see reference_data.py)
+CDC_INFANT_FILE = "cdc_infants.json"  # CDC interpretation of WHO 0-2y
+CDC_CHILD_FILE = "cdc2-20.json"  # 2 years to 20 years
+WHO_INFANTS_FILE = "who_infants.json"  # 2 weeks to 2 years
+
+_REFERENCE_DATA_FILES = {
+    "CDC_INFANT_DATA": CDC_INFANT_FILE,
+    "CDC_CHILD_DATA": CDC_CHILD_FILE,
+    "WHO_INFANTS_DATA": WHO_INFANTS_FILE,
+}
+
+
+def __getattr__(name: str):
+    # the tables named in _REFERENCE_DATA_FILES are loaded on first access
+    try:
+        file_name = _REFERENCE_DATA_FILES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return REFERENCE_DATA.load(file_name)
+
 
 # data_path = Path(data_directory,"fenton", "fenton.json")  # 23 weeks to 50 weeks - currently not in the code base
 # with open(data_path) as json_file:
@@ -33,23 +50,8 @@ data_directory = resources.files("rcpchgrowth.data_tables")
 #     json_file.close()
 FENTON_DATA = []
 
-data_path = Path(data_directory, "cdc_infants.json")  # CDC interpretation of WHO 0-2y
-with open(data_path) as json_file:
-    CDC_INFANT_DATA = json.load(json_file)
-    json_file.close()
-
-data_path = Path(data_directory, "cdc2-20.json")  # 2 years to 20 years
-with open(data_path) as json_file:
-    CDC_CHILD_DATA = json.load(json_file)
-    json_file.close()
 # public functions
 
-data_path = Path(
-    data_directory, "who_infants.json")  # 2 weeks to 2 years
-with open(data_path) as json_file:
-    WHO_INFANTS_DATA = json.load(json_file)
-    json_file.close()
-
 
 def reference_data_absent(age: float, measurement_method: str, sex: str):
     """
@@ -60,18 +62,15 @@ def reference_data_absent(age: float, measurement_method: str, sex: str):
     Reference data is not complete for all ages/sexes/measurements.
     - WHO data is used from 0-2 years
     - CDC data is used from 2-20 years
+    These are the absence rules of the CDC segments in reference_registry.py.
     """
+    # the registry imports the data file names from this module
+    from .reference_registry import reference_for
 
-    if age < 0:
-        return True, "CDC data does not exist below 40 weeks."
-    if age > TWENTY_YEARS:  # upper threshold of UK90 data
-        return True, "CDC data does not exist above 20 years."
-    if measurement_method == HEAD_CIRCUMFERENCE and age > THREE_YEARS:
-        return True, "CDC data does not exist for head circumference above 3 years."
-    if measurement_method == BMI and age < TWO_YEARS:
-        return True, "CDC data does not exist for BMI below 2 years."
-    else:
-        return False, None
+    invalid_data, data_error = reference_for(CDC).reference_data_absent(
+        age=age, measurement_method=measurement_method, sex=sex
+    )
+    return invalid_data, data_error if invalid_data else None
 
 
 def cdc_reference(age: float, measurement_method, default_youngest_reference: bool = False) -> json:
@@ -84,30 +83,28 @@ def cdc_reference(age: float, measurement_method, default_youngest_reference: bo
     The function return the appropriate reference file as json
     """
 
-    # These conditionals are to select the correct reference
     if age < FENTON_LOWER_THRESHOLD:
         # Below the range for which we have reference data, we can't provide a calculation.
         raise ValueError(
             "There is no reference data for ages below 22 weeks gestation."
         )
-    elif age < 0:
-        # Below 40 weeks, Fenton data is always used
-        return FENTON_DATA
-    
-    if measurement_method == HEAD_CIRCUMFERENCE and age <= 3:
-        # CDC data is used for head circumference up to 3 years
-        return CDC_INFANT_DATA
-
-    elif age < 2 or (age == 2 and default_youngest_reference):
-        # Below 2 years, CDC interpretation of WHO is used
-        return WHO_INFANTS_DATA
 
-    elif age <= CDC_UPPER_THRESHOLD:
-        # CDC data is used for all children 2-20 years
-        return CDC_CHILD_DATA 
+    # the segment is selected as for every calculation (see the CDC segments in reference_registry.py):
+    # Fenton data are used below 40 weeks, CDC data for head circumference up to 3 years, the CDC interpretation
+    # of WHO data below 2 years (and at 2 years if default_youngest_reference is True) and CDC data to 20 years
+    from .reference_registry import reference_for
 
-    else:
-        return ValueError("There is no CDC reference data above the age of 20 years.")
+    try:
+        segment = reference_for(CDC).segment_for_age(
+            age=age, measurement_method=measurement_method, default_youngest_reference=default_youngest_reference
+        )
+    except LookupError:
+        raise ValueError("There is no CDC reference data above the age of 20 years.")
+    data_file = segment.data_file(measurement_method)
+    if data_file is None:
+        # Fenton data are not yet available
+        return FENTON_DATA
+    return REFERENCE_DATA.load(data_file)
 
 
 def cdc_lms_array_for_measurement_and_sex(
@@ -117,28 +114,19 @@ def cdc_lms_array_for_measurement_and_sex(
     default_youngest_reference: bool = False,
 ) -> list:
 
-    # selects the correct lms data array from the patchwork of references that make up UK-WHO
-
-    # Check that the measurement requested has reference data at that age
+    # selects the correct lms data array from the patchwork of references that make up CDC
+    # (see the CDC segments in reference_registry.py)
+    from .reference_registry import reference_for
 
-    invalid_data, data_error = reference_data_absent(
-     
-        age=age, measurement_method=measurement_method, sex=sex
+    return reference_for(CDC).lms_value_array_for_measurement(
+        age=age,
+        measurement_method=measurement_method,
+        sex=sex,
+        default_youngest_reference=default_youngest_reference,
     )
-    try:
-        selected_reference = cdc_reference(
-            age=age, measurement_method=measurement_method, default_youngest_reference=default_youngest_reference
-        )
-    except:  #  there is no reference for the age supplied
-        return LookupError("There is no CDC reference for the age supplied.")
-
-
-    if invalid_data:
-        raise LookupError(data_error)
-    else:
-        return selected_reference["measurement"][measurement_method][sex]
 
 
+@returns_plain_reference_data
 def select_reference_data_for_cdc_chart(
     cdc_reference_name: str,
     measurement_method: str,
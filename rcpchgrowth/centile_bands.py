@@ -1,5 +1,9 @@
+# standard imports
+from bisect import bisect_right
+import math
+
 # imports from rcpchgrowth
-from rcpchgrowth.constants.reference_constants import COLE_TWO_THIRDS_SDS_NINE_CENTILES, THREE_PERCENT_CENTILES, UK_WHO, CDC
+from rcpchgrowth.constants.reference_constants import COLE_TWO_THIRDS_SDS_NINE_CENTILES, THREE_PERCENT_CENTILES, UK_WHO, CDC, CENTILE_BAND_NONE, CENTILE_BAND_BELOW_NORMAL_RANGE, CENTILE_BAND_ABOVE_NORMAL_RANGE, CENTILE_BAND_OUTSIDE_NORMAL_RANGE
 from .constants import BMI, HEAD_CIRCUMFERENCE,THREE_PERCENT_CENTILE_COLLECTION,COLE_TWO_THIRDS_SDS_NINE_CENTILE_COLLECTION ,FIVE_PERCENT_CENTILES, FIVE_PERCENT_CENTILE_COLLECTION, EIGHTY_FIVE_PERCENT_CENTILES, EIGHTY_FIVE_PERCENT_CENTILE_COLLECTION, MAXIMUM_HEIGHT_WEIGHT_OFC_ADVISORY_SDS, MINIMUM_HEIGHT_WEIGHT_OFC_ADVISORY_SDS, MAXIMUM_BMI_ADVISORY_SDS, MINIMUM_BMI_ADVISORY_SDS, HEIGHT, WEIGHT, HEAD_CIRCUMFERENCE, BMI
 from .global_functions import rounded_sds_for_centile, sds_for_centile
 
@@ -110,49 +114,126 @@ def centile_band_for_centile(sds: float, measurement_method: str, centile_format
 
         These advice messages appear in the tooltips of the growth charts in the RCPCH Growth Chart and are advisory only. They do not reject data entry.
     """
-    
-    centile_collection = []
-    if centile_format == THREE_PERCENT_CENTILES:
-        centile_collection = THREE_PERCENT_CENTILE_COLLECTION
-    elif centile_format == FIVE_PERCENT_CENTILES:
-        centile_collection = FIVE_PERCENT_CENTILE_COLLECTION
-    elif centile_format == EIGHTY_FIVE_PERCENT_CENTILES:
-        centile_collection = EIGHTY_FIVE_PERCENT_CENTILE_COLLECTION
-    elif centile_format == COLE_TWO_THIRDS_SDS_NINE_CENTILES:
-        centile_collection = COLE_TWO_THIRDS_SDS_NINE_CENTILE_COLLECTION
-
-    centile_band_ranges = generate_centile_band_ranges(centile_collection)
-
-    upper_threshold = MAXIMUM_HEIGHT_WEIGHT_OFC_ADVISORY_SDS
-    lower_threshold = MINIMUM_HEIGHT_WEIGHT_OFC_ADVISORY_SDS
-    if measurement_method == BMI:
-        measurement_method = "body mass index"
-        upper_threshold = MAXIMUM_BMI_ADVISORY_SDS
-        lower_threshold = MINIMUM_BMI_ADVISORY_SDS
-    elif measurement_method == HEAD_CIRCUMFERENCE:
-        measurement_method = "head circumference"
-
-    if sds < lower_threshold:
-        return f"This {measurement_method} measurement is well outside the normal range. Please check its accuracy."
-    elif sds > upper_threshold:
-        return f"This {measurement_method} measurement is well outside the normal range. Please check its accuracy."
+    centile_bands = centile_bands_for_format(centile_format=centile_format, measurement_method=measurement_method)
+    return centile_bands.description(code=centile_bands.code(sds), measurement_method=measurement_method)
+
+
+def centile_band_code(sds: float, measurement_method: str, centile_format: str = COLE_TWO_THIRDS_SDS_NINE_CENTILES)->int:
+    """
+    returns the code of the centile band into which the sds falls (see the centile band codes in reference_constants.py)
+    centile_band_for_code words it as centile_band_for_centile does
+    """
+    return centile_bands_for_format(centile_format=centile_format, measurement_method=measurement_method).code(sds)
+
+
+def centile_band_for_code(code: int, measurement_method: str, centile_format: str = COLE_TWO_THIRDS_SDS_NINE_CENTILES)->str:
+    """
+    returns the advice string for a centile band code from centile_band_code, as centile_band_for_centile
+    """
+    return centile_bands_for_format(centile_format=centile_format, measurement_method=measurement_method).description(
+        code=code, measurement_method=measurement_method)
+
+
+class CentileBands:
+    """
+    The centile bands of a centile format. The edges of the bands (the sds of each centile +/- a quarter distance) and
+    the advisory thresholds are calculated once, so the band of an sds is found with a single bisection of the edges.
+    """
+
+    __slots__ = ("centile_collection", "suffixed_centiles", "edges", "codes")
+
+    def __init__(self, centile_collection: list, lower_threshold: float, upper_threshold: float):
+        self.centile_collection = centile_collection
+        self.suffixed_centiles = [return_suffix(centile) for centile in centile_collection]
+        centile_band_ranges = generate_centile_band_ranges(centile_collection)
+        # every test in band_code is of the form sds < edge (sds > x being sds >= the next float after x), so its
+        # code is the same for every sds from one edge up to the next: it is stored for each edge
+        self.edges = sorted({
+            lower_threshold,
+            math.nextafter(upper_threshold, math.inf),
+            math.nextafter(centile_band_ranges[0][0], math.inf),
+            math.nextafter(centile_band_ranges[-1][1], math.inf),
+            *(edge for centile_band_range in centile_band_ranges for edge in centile_band_range),
+        })
+        self.codes = [
+            _band_code(sds, centile_band_ranges, lower_threshold, upper_threshold)
+            for sds in [-math.inf] + self.edges
+        ]
+
+    def code(self, sds: float) -> int:
+        if sds != sds:
+            return CENTILE_BAND_NONE
+        return self.codes[bisect_right(self.edges, sds)]
+
+    def description(self, code: int, measurement_method: str) -> str:
+        if measurement_method == BMI:
+            measurement_method = "body mass index"
+        elif measurement_method == HEAD_CIRCUMFERENCE:
+            measurement_method = "head circumference"
+
+        if code == CENTILE_BAND_NONE:
+            return None
+        elif code == CENTILE_BAND_OUTSIDE_NORMAL_RANGE:
+            return f"This {measurement_method} measurement is well outside the normal range. Please check its accuracy."
+        elif code == CENTILE_BAND_BELOW_NORMAL_RANGE:
+            return f"This {measurement_method} measurement is below the normal range."
+        elif code == CENTILE_BAND_ABOVE_NORMAL_RANGE:
+            return f"This {measurement_method} measurement is above the normal range."
+        #even codes are always on centile
+        elif code % 2 == 0:
+            return f"This {measurement_method} measurement is on or near the {self.suffixed_centiles[code // 2]} centile."
+        #odd codes are always between centiles
+        else:
+            lower_suffixed_centile = self.suffixed_centiles[(code - 1) // 2]
+            upper_suffixed_centile = self.suffixed_centiles[(code + 1) // 2]
+            return f"This {measurement_method} measurement is between the {lower_suffixed_centile} and {upper_suffixed_centile} centiles."
+
+
+def _band_code(sds: float, centile_band_ranges: list, lower_threshold: float, upper_threshold: float) -> int:
+    """
+    returns the code of the centile band into which the sds falls, by walking the centile band ranges
+    CentileBands uses this once for each edge, so it is only called as the bands are built
+    """
+    if sds < lower_threshold or sds > upper_threshold:
+        return CENTILE_BAND_OUTSIDE_NORMAL_RANGE
     elif sds <= centile_band_ranges[0][0]:
-        return f"This {measurement_method} measurement is below the normal range."
+        return CENTILE_BAND_BELOW_NORMAL_RANGE
     elif sds > centile_band_ranges[-1][1]:
-        return f"This {measurement_method} measurement is above the normal range."        
+        return CENTILE_BAND_ABOVE_NORMAL_RANGE
+    for r in range(len(centile_band_ranges)):
+        if centile_band_ranges[r][0] <= sds < centile_band_ranges[r][1]:
+            return r
+    return CENTILE_BAND_NONE
+
+
+# centile format: its centile collection
+CENTILE_COLLECTIONS = {
+    THREE_PERCENT_CENTILES: THREE_PERCENT_CENTILE_COLLECTION,
+    FIVE_PERCENT_CENTILES: FIVE_PERCENT_CENTILE_COLLECTION,
+    EIGHTY_FIVE_PERCENT_CENTILES: EIGHTY_FIVE_PERCENT_CENTILE_COLLECTION,
+    COLE_TWO_THIRDS_SDS_NINE_CENTILES: COLE_TWO_THIRDS_SDS_NINE_CENTILE_COLLECTION,
+}
+
+# (centile format, whether the BMI thresholds apply): its CentileBands, built on first use
+_CENTILE_BANDS = {}
+
+
+def centile_bands_for_format(centile_format: str, measurement_method: str) -> CentileBands:
+    """
+    returns the CentileBands of a centile format, with the advisory thresholds for the measurement_method
+    Raises ValueError if there are no centile bands for the centile format
+    """
+    bmi = measurement_method == BMI
+    try:
+        return _CENTILE_BANDS[(centile_format, bmi)]
+    except (KeyError, TypeError):
+        pass
+    if not isinstance(centile_format, str) or centile_format not in CENTILE_COLLECTIONS:
+        raise ValueError(f"There are no centile bands for the centile format {centile_format!r}.")
+    if bmi:
+        lower_threshold, upper_threshold = MINIMUM_BMI_ADVISORY_SDS, MAXIMUM_BMI_ADVISORY_SDS
     else:
-        #even indices of centile_bands list is always on centile
-                    
-        #odd indices of centile_bands list is always between centiles
-        for r in range(len(centile_band_ranges)):
-            if centile_band_ranges[r][0] <= sds < centile_band_ranges[r][1]:
-                if r%2 == 0:
-                    centile = centile_collection[r//2]
-                    suffixed_centile = return_suffix(centile)
-                    return f"This {measurement_method} measurement is on or near the {suffixed_centile} centile."
-                else:
-                    lower_centile = centile_collection[(r-1)//2]
-                    lower_suffixed_centile = return_suffix(lower_centile)
-                    upper_centile = centile_collection[(r+1)//2]
-                    upper_suffixed_centile = return_suffix(upper_centile)
-                    return f"This {measurement_method} measurement is between the {lower_suffixed_centile} and {upper_suffixed_centile} centiles."
+        lower_threshold, upper_threshold = MINIMUM_HEIGHT_WEIGHT_OFC_ADVISORY_SDS, MAXIMUM_HEIGHT_WEIGHT_OFC_ADVISORY_SDS
+    centile_bands = CentileBands(CENTILE_COLLECTIONS[centile_format], lower_threshold, upper_threshold)
+    _CENTILE_BANDS[(centile_format, bmi)] = centile_bands
+    return centile_bands
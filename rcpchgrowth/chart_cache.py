@@ -0,0 +1,80 @@
+"""
+A bounded, thread safe, least recently used cache of charts.
+
+create_chart generates every centile line of a chart from scratch, yet a chart depends only on the reference,
+measurement_method, sex, centile_format (a name, or a list of centiles or SDS) and is_sds. Charts are cached
+here, keyed by those arguments.
+
+Each chart is stored pickled, so the cached copy cannot be changed, and every caller receives a new chart of its
+own, which it is free to modify. Unpickling a chart takes a small fraction of the time it takes to generate one.
+
+The cache is shared by the whole process. It can be resized, disabled and cleared at runtime, and reports its
+hits, misses, evictions and hit rate:
+
+    from rcpchgrowth import CHART_CACHE
+    CHART_CACHE.configure(maxsize=512)
+    CHART_CACHE.info()
+    CHART_CACHE.configure(enabled=False)
+"""
+
+# standard imports
+from collections import namedtuple
+import pickle
+
+# rcpch imports
+from .lms_tables import LMS_GRID
+from .lru_cache import LRUCache
+
+ChartCacheInfo = namedtuple(
+    "ChartCacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize", "nbytes", "enabled", "hit_rate"]
+)
+
+DEFAULT_CHART_CACHE_SIZE = 256
+
+
+def chart_cache_key(reference, measurement_method, sex, centile_format, is_sds):
+    """
+    Returns the cache key for the arguments of create_chart, or None if the chart cannot be cached.
+    The chart functions only treat centile_format as a custom collection if it is a list, and only test
+    is_sds for truth. The type of each custom value is part of the key, as a centile of 50 is labelled 50,
+    not 50.0.
+    """
+    if type(centile_format) is list:
+        centile_format_key = ("list", tuple((type(value), value) for value in centile_format))
+    elif type(centile_format) is str:
+        centile_format_key = ("str", centile_format)
+    else:
+        return None
+    key = (reference, measurement_method, sex, centile_format_key, bool(is_sds))
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+class ChartCache(LRUCache):
+    """
+    Least recently used cache of pickled charts. get returns a new copy of the chart on every call.
+    """
+
+    info_type = ChartCacheInfo
+    description = "chart cache"
+
+    def __init__(self, maxsize: int = DEFAULT_CHART_CACHE_SIZE, enabled: bool = True):
+        super().__init__(maxsize=maxsize, enabled=enabled)
+
+    def _encode(self, chart):
+        return pickle.dumps(chart, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _decode(self, pickled_chart):
+        return pickle.loads(pickled_chart)
+
+    def _nbytes_of(self, pickled_chart) -> int:
+        return len(pickled_chart)
+
+
+# the cache used by create_chart in chart_functions
+CHART_CACHE = ChartCache()
+# charts made with the previous LMS_GRID settings are discarded when they change
+LMS_GRID.register_callback(CHART_CACHE.clear)
@@ -1,5 +1,8 @@
+import logging
 from typing import Union
-from .global_functions import centile, sds_for_centile, rounded_sds_for_centile, generate_centile
+from .chart_cache import CHART_CACHE, chart_cache_key
+from .global_functions import centile, sds_for_centile, rounded_sds_for_centile, generate_centile, generate_centiles
+from .reference_registry import reference_for, register_chart
 from .constants.reference_constants import (
     CDC_REFERENCES, 
     CDC,
@@ -27,6 +30,8 @@ from .constants.reference_constants import (
     WHO_REFERENCES
 )
 
+logger = logging.getLogger(__name__)
+
 """
 Public chart functions
 """
@@ -40,44 +45,30 @@ def create_chart(
     is_sds=False):
     """
     Global method - return chart for measurement_method, sex and reference
+    Charts are cached in CHART_CACHE. Each call returns a new chart, which the caller is free to modify.
     """
     
-    if reference == UK_WHO:
-        return create_uk_who_chart(
-            measurement_method=measurement_method, 
-            sex=sex, 
-            centile_format=centile_format, 
-            is_sds=is_sds)
-    elif reference == TURNERS:
-        return create_turner_chart(
-            centile_format=centile_format, 
-            is_sds=is_sds)
-    elif reference == TRISOMY_21:
-        return create_trisomy_21_chart(
-            measurement_method=measurement_method, 
-            sex=sex, 
-            centile_format=centile_format, 
-            is_sds=is_sds)
-    elif reference == CDC:
-        return create_cdc_chart(
-            measurement_method=measurement_method, 
-            sex=sex, 
-            centile_format=centile_format, 
-            is_sds=is_sds)
-    elif reference == TRISOMY_21_AAP:
-        return create_trisomy_21_aap_chart(
-            measurement_method=measurement_method,
-            sex=sex,
-            centile_format=centile_format,
-            is_sds=is_sds)
-    elif reference == WHO:
-        return create_who_chart(
-            measurement_method=measurement_method,
-            sex=sex,
-            centile_format=centile_format,
-            is_sds=is_sds)
-    else:
-        print("No reference data returned. Is there a spelling mistake in your reference?")
+    try:
+        reference_entry = reference_for(reference)
+    except ValueError:
+        logger.warning("No reference data returned. Is there a spelling mistake in your reference?")
+        return None
+
+    cache_key = chart_cache_key(reference, measurement_method, sex, centile_format, is_sds)
+    if cache_key is not None:
+        chart = CHART_CACHE.get(cache_key)
+        if chart is not None:
+            return chart
+
+    # the chart function of each reference is registered with register_chart below
+    chart = reference_entry.create_chart(
+        measurement_method=measurement_method, 
+        sex=sex, 
+        centile_format=centile_format, 
+        is_sds=is_sds)
+    if cache_key is not None and chart is not None:
+        CHART_CACHE.put(cache_key, chart)
+    return chart
 
     """
     Return object structure
@@ -162,6 +153,46 @@ def build_centile_object(reference, measurement_method: str, sex: str, reference
     return sex_list
 
 
+def generate_centile_lines(
+    z_scores: list, centiles: list, measurement_method: str, sex: str, reference: str, reference_name: str, is_sds=False
+) -> list:
+    """
+    Returns the data of a centile line for each z score, generated together by generate_centiles.
+    Some data does not exist at all ages, so a LookupError reflects missing data. If this happens, each line is
+    generated on its own, and the data of a line that cannot be generated is None.
+    """
+    try:
+        return generate_centiles(
+            z_scores=z_scores,
+            centiles=centiles,
+            measurement_method=measurement_method,
+            sex=sex,
+            reference=reference,
+            reference_name=reference_name,
+            is_sds=is_sds,
+        )
+    except LookupError as e:
+        logger.debug("Not possible to generate centile data for %s %s in %ss. %s", reference_name, measurement_method, sex, e)
+
+    centile_lines = []
+    for z, centile_value in zip(z_scores, centiles):
+        try:
+            centile_data = generate_centile(
+                z=z,
+                centile=centile_value,
+                measurement_method=measurement_method,
+                sex=sex,
+                reference=reference,
+                reference_name=reference_name,
+                is_sds=is_sds,
+            )
+        except LookupError:
+            centile_data = None
+        centile_lines.append(centile_data)
+    return centile_lines
+
+
+@register_chart(UK_WHO)
 def create_uk_who_chart(
         measurement_method: str, 
         sex: str, 
@@ -206,6 +237,8 @@ def create_uk_who_chart(
         # as have been requested
 
         centiles = []  # all generated centiles for a selected centile collection are stored here
+        z_scores = []
+        centile_values = []
 
         for centile_index, centile_sds in enumerate(centile_sds_collection):
             # we must create a z for each requested centile
@@ -225,26 +258,22 @@ def create_uk_who_chart(
                 else:
                     z = sds_for_centile(centile_sds) # a centile was provided, so convert to z
                 centile_value=centile_sds # store the original centile value 
-            centile_data = []
-
-            try:
-                # Generate a centile. there will be nine of these if Cole method selected.
-                # Some data does not exist at all ages, so any error reflects missing data.
-                # If this happens, an empty list is returned.
-                centile_data = generate_centile(
-                    z=z,
-                    centile=centile_value,
-                    measurement_method=measurement_method,
-                    sex=sex,
-                    reference_name=reference_name,
-                    reference=UK_WHO,
-                    is_sds=is_sds
-                )
-            except:
-                print(f"Not possible to generate centile data for UK-WHO {measurement_method} in {sex}s.")
-                centile_data=None
+            z_scores.append(z)
+            centile_values.append(centile_value)
+
+        # Generate the centiles together, looking up the LMS values for each age once. there will be nine of these if Cole method selected.
+        centile_lines = generate_centile_lines(
+            z_scores=z_scores,
+            centiles=centile_values,
+            measurement_method=measurement_method,
+            sex=sex,
+            reference=UK_WHO,
+            reference_name=reference_name,
+            is_sds=is_sds,
+        )
+
+        for z, centile_value, centile_data in zip(z_scores, centile_values, centile_lines):
             # Store this centile for a given measurement
-            
             centiles.append({"sds": round(z * 100) / 100,
                         "centile": centile_value, "data": centile_data})
 
@@ -286,7 +315,8 @@ def create_uk_who_chart(
     """
 
 
-def create_turner_chart(centile_format: Union[str, list], is_sds=False):
+@register_chart(TURNERS)
+def create_turner_chart(centile_format: Union[str, list], is_sds=False, measurement_method: str = HEIGHT, sex: str = FEMALE):
    # user selects which centile collection they want
     # If the Cole method is selected, conversion between centile and SDS
     # is different as SDS is rounded to the nearest 2/3
@@ -294,6 +324,7 @@ def create_turner_chart(centile_format: Union[str, list], is_sds=False):
     # If no parameter is passed, default is the Cole method
     # NOTE: Turner's syndrome only affects girls and reference data only exists for height. This function will only return height data and
     # relies on error handling elsewhere to catch any other requests for data.
+    # measurement_method and sex are accepted so that create_chart can call every chart function the same way, but are not used.
 
     centile_sds_collection = []
     cole_method = False
@@ -324,6 +355,8 @@ def create_turner_chart(centile_format: Union[str, list], is_sds=False):
     # as have been requested
 
     centiles = []  # all generated centiles for a selected centile collection are stored here
+    z_scores = []
+    centile_values = []
 
     for centile_index, centile_sds in enumerate(centile_sds_collection):
         # we must create a z for each requested centile
@@ -340,26 +373,28 @@ def create_turner_chart(centile_format: Union[str, list], is_sds=False):
             else:
                 z = sds_for_centile(centile_sds)
                 centile_value=centile_sds
-        # Collect the LMS values from the correct reference
-        # lms_array_for_measurement = select_reference_data_for_turner(
-        #     measurement_method=HEIGHT, sex=sex)
-        # Generate a centile. there will be nine of these if Cole method selected.
-        # Some data does not exist at all ages, so any error reflects missing data.
-        # If this happens, an empty list is returned.
+        z_scores.append(z)
+        centile_values.append(centile_value)
+
+    # Generate the centiles together, looking up the LMS values for each age once. there will be nine of these if Cole method selected.
+    centile_lines = generate_centile_lines(
+        z_scores=z_scores,
+        centiles=centile_values,
+        measurement_method=HEIGHT,
+        sex=sex,
+        reference=TURNERS,
+        reference_name=TURNERS,
+        is_sds=is_sds,
+    )
+
+    for z, centile_value, centile_data in zip(z_scores, centile_values, centile_lines):
+        # Store this centile for a given measurement
         try:
-            centile_data = generate_centile(
-                z=z, 
-                centile=centile_value, 
-                measurement_method=HEIGHT,
-                sex=sex, 
-                reference_name=TURNERS, reference=TURNERS,
-                is_sds=is_sds)
-
-            # Store this centile for a given measurement
             centiles.append({"sds": round(z * 100) / 100,
                             "centile": centile_value, "data": centile_data})
         except Exception as e:
-            print(f"create_turner chart generate centile error: {e}")
+            # eg a centile of 0 or 100, whose z cannot be rounded
+            logger.debug("create_turner chart generate centile error: %s", e)
 
     # this is the end of the centile_collection for loop
     # All the centiles for this measurement, sex and reference are added to the measurements list
@@ -391,6 +426,7 @@ def create_turner_chart(centile_format: Union[str, list], is_sds=False):
     }]
     """
 
+@register_chart(TRISOMY_21)
 def create_trisomy_21_chart(measurement_method: str, sex: str, centile_format: Union[str, list], is_sds=False):
    # user selects which centile collection they want
     # If the Cole method is selected, conversion between centile and SDS
@@ -416,6 +452,8 @@ def create_trisomy_21_chart(measurement_method: str, sex: str, centile_format: U
     measurements: dict = {}  # all the data for a given measurement_method are stored here
 
     centiles = []  # all generated centiles for a selected centile collection are stored here
+    z_scores = []
+    centile_values = []
 
     for centile_index, centile_sds in enumerate(centile_sds_collection):
         # we must create a z for each requested centile
@@ -432,25 +470,28 @@ def create_trisomy_21_chart(measurement_method: str, sex: str, centile_format: U
             else:
                 z = sds_for_centile(centile_sds)
                 centile_value=centile_sds
-
-        # Generate a centile. there will be nine of these if Cole method selected.
-        # Some data does not exist at all ages, so any error reflects missing data.
-        # If this happens, an empty list is returned.
-        try:    
-            centile_data = generate_centile(
-                z=z, 
-                centile=centile_value, 
-                measurement_method=measurement_method,
-                sex=sex, 
-                reference=TRISOMY_21,
-                reference_name=TRISOMY_21,
-                is_sds=is_sds)
-
-            # Store this centile for a given measurement
+        z_scores.append(z)
+        centile_values.append(centile_value)
+
+    # Generate the centiles together, looking up the LMS values for each age once. there will be nine of these if Cole method selected.
+    centile_lines = generate_centile_lines(
+        z_scores=z_scores,
+        centiles=centile_values,
+        measurement_method=measurement_method,
+        sex=sex,
+        reference=TRISOMY_21,
+        reference_name=TRISOMY_21,
+        is_sds=is_sds,
+    )
+
+    for z, centile_value, centile_data in zip(z_scores, centile_values, centile_lines):
+        # Store this centile for a given measurement
+        try:
             centiles.append({"sds": round(z, 2),
                             "centile": centile_value, "data": centile_data})
         except Exception as e:
-            print(f"generate_centile error: {e}")
+            # eg a centile of 0 or 100, whose z cannot be rounded
+            logger.debug("generate_centile error: %s", e)
 
     # this is the end of the centile_collection for loop
     # All the centiles for this measurement, sex and reference are added to the measurements list
@@ -482,6 +523,7 @@ def create_trisomy_21_chart(measurement_method: str, sex: str, centile_format: U
     }]
     """
 
+@register_chart(CDC)
 def create_cdc_chart(
         measurement_method: str, 
         sex: str, 
@@ -522,6 +564,8 @@ def create_cdc_chart(
         measurements: dict = {}  # all the data for a given measurement_method are stored here
 
         centiles = []  # all generated centiles for a selected centile collection are stored here
+        z_scores = []
+        centile_values = []
 
         for centile_index, centile_sds in enumerate(centile_sds_collection):
             # we must create a z for each requested centile
@@ -542,26 +586,22 @@ def create_cdc_chart(
                 else:
                     z = sds_for_centile(centile_sds) # a centile was provided, so convert to z
                     centile_value=centile_sds # store the original centile value 
-            centile_data = []
-
-            try:
-                # Generate a centile. there will be nine of these if Cole method selected.
-                # Some data does not exist at all ages, so any error reflects missing data.
-                # If this happens, an empty list is returned.
-                centile_data = generate_centile(
-                    z=z,
-                    centile=centile_value,
-                    measurement_method=measurement_method,
-                    sex=sex,
-                    reference=CDC,
-                    reference_name=reference_name,
-                    is_sds=is_sds
-                )
-            except LookupError as e:
-                print(f"Not possible to generate centile data for CDC {measurement_method} in {sex}s. {e}")
-                centile_data=None
+            z_scores.append(z)
+            centile_values.append(centile_value)
+
+        # Generate the centiles together, looking up the LMS values for each age once. there will be nine of these if Cole method selected.
+        centile_lines = generate_centile_lines(
+            z_scores=z_scores,
+            centiles=centile_values,
+            measurement_method=measurement_method,
+            sex=sex,
+            reference=CDC,
+            reference_name=reference_name,
+            is_sds=is_sds,
+        )
+
+        for z, centile_value, centile_data in zip(z_scores, centile_values, centile_lines):
             # Store this centile for a given measurement
-            
             centiles.append({"sds": round(z * 100) / 100,
                         "centile": centile_value, "data": centile_data})
 
@@ -616,6 +656,7 @@ def create_cdc_chart(
     ]
     """
 
+@register_chart(TRISOMY_21_AAP)
 def create_trisomy_21_aap_chart(measurement_method: str, sex: str, centile_format: Union[str, list], is_sds=False):
     # user selects which centile collection they want, for sex and measurement_method
     # If the Cole method is selected, conversion between centile and SDS
@@ -651,6 +692,8 @@ def create_trisomy_21_aap_chart(measurement_method: str, sex: str, centile_forma
         measurements: dict = {}  # all the data for a given measurement_method are stored here
 
         centiles = []  # all generated centiles for a selected centile collection are stored here
+        z_scores = []
+        centile_values = []
 
         for centile_index, centile_sds in enumerate(centile_sds_collection):
             # we must create a z for each requested centile
@@ -671,27 +714,22 @@ def create_trisomy_21_aap_chart(measurement_method: str, sex: str, centile_forma
                 else:
                     z = sds_for_centile(centile_sds) # a centile was provided, so convert to z
                     centile_value=centile_sds # store the original centile value 
-            centile_data = []
-
-            try:
-            # Generate a centile. there will be nine of these if Cole method selected.
-            # Some data does not exist at all ages, so any error reflects missing data.
-            # If this happens, an empty list is returned.
-                centile_data = generate_centile(
-                    z=z,
-                    centile=centile_value,
-                    measurement_method=measurement_method,
-                    sex=sex,
-                    reference=TRISOMY_21_AAP,
-                    reference_name=reference_name,
-                    is_sds=is_sds,
-
-                )
-            except Exception as e:
-                print(f"Not possible to generate centile data for Trisomy 21 (AAP) for {measurement_method} in {sex}s. {e}")
-                centile_data=None
+            z_scores.append(z)
+            centile_values.append(centile_value)
+
+        # Generate the centiles together, looking up the LMS values for each age once. there will be nine of these if Cole method selected.
+        centile_lines = generate_centile_lines(
+            z_scores=z_scores,
+            centiles=centile_values,
+            measurement_method=measurement_method,
+            sex=sex,
+            reference=TRISOMY_21_AAP,
+            reference_name=reference_name,
+            is_sds=is_sds,
+        )
+
+        for z, centile_value, centile_data in zip(z_scores, centile_values, centile_lines):
             # Store this centile for a given measurement
-            
             centiles.append({"sds": round(z * 100) / 100,
                         "centile": centile_value, "data": centile_data})
 
@@ -746,6 +784,7 @@ def create_trisomy_21_aap_chart(measurement_method: str, sex: str, centile_forma
     ]
     """
 
+@register_chart(WHO)
 def create_who_chart(
         measurement_method: str, 
         sex: str, 
@@ -790,6 +829,8 @@ def create_who_chart(
         # as have been requested
 
         centiles = []  # all generated centiles for a selected centile collection are stored here
+        z_scores = []
+        centile_values = []
 
         for centile_index, centile_sds in enumerate(centile_sds_collection):
             # we must create a z for each requested centile
@@ -810,26 +851,22 @@ def create_who_chart(
                 else:
                     z = sds_for_centile(centile_sds) # a centile was provided, so convert to z
                     centile_value=centile_sds # store the original centile value 
-            centile_data = []
-
-            try:
-                # Generate a centile. there will be nine of these if Cole method selected.
-                # Some data does not exist at all ages, so any error reflects missing data.
-                # If this happens, an empty list is returned.
-                centile_data = generate_centile(
-                    z=z,
-                    centile=centile_value,
-                    measurement_method=measurement_method,
-                    sex=sex,
-                    reference=WHO,
-                    is_sds=is_sds,
-                    reference_name=reference_name
-                )
-            except LookupError as e:
-                print(f"Not possible to generate centile data for WHO {measurement_method} in {sex}s. {e}")
-                centile_data=None
+            z_scores.append(z)
+            centile_values.append(centile_value)
+
+        # Generate the centiles together, looking up the LMS values for each age once. there will be nine of these if Cole method selected.
+        centile_lines = generate_centile_lines(
+            z_scores=z_scores,
+            centiles=centile_values,
+            measurement_method=measurement_method,
+            sex=sex,
+            reference=WHO,
+            reference_name=reference_name,
+            is_sds=is_sds,
+        )
+
+        for z, centile_value, centile_data in zip(z_scores, centile_values, centile_lines):
             # Store this centile for a given measurement
-            
             centiles.append({"sds": round(z * 100) / 100,
                         "centile": centile_value, "data": centile_data})
 
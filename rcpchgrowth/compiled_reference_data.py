@@ -0,0 +1,242 @@
+"""
+A compact binary format for the reference data, memory-mapped at load time.
+
+Parsing the JSON reference data builds a dictionary for every age of every table, including fields the
+calculations never read (interval and value). The compiled format keeps only the ages, L, M, S (and sigma) of each
+table as columns of 64 bit floats. LMSTables are built directly over those columns in a read only memory map of the
+file, so nothing is parsed, and processes that map the same file (eg pre-forked workers) share its pages.
+
+Compiled files sit next to their JSON in data_tables (uk90_child.json compiles to uk90_child.lms), and are rebuilt
+from the JSON when the package is built (see setup.py). Each records the size and SHA-256 of the JSON it was compiled
+from. REFERENCE_DATA (see reference_data.py) only uses a compiled file if it is in the current format and up to date,
+and loads the JSON otherwise. A compiled file is up to date if its JSON is the size it records and is no newer than
+the compiled file, which takes a stat of each and does not read the JSON. Otherwise (or where the files cannot be
+stat'ed, eg in a zip) the JSON is hashed, once, and compared with the SHA-256. To rebuild the compiled files after
+changing the JSON, and to check them against it:
+
+    python -m rcpchgrowth.compiled_reference_data
+    python -m rcpchgrowth.compiled_reference_data --check
+
+The file layout (little endian) is:
+    8 bytes     b"RCPCHLMS"
+    4 bytes     format version (unsigned int)
+    32 bytes    SHA-256 of the source JSON
+    8 bytes     size of the source JSON in bytes (unsigned long long)
+    4 bytes     length of the header (unsigned int)
+    header      the source JSON with each LMS table replaced by {"columns": [offset, ages, has_sigma]}, padded with
+                spaces to a multiple of 8 bytes
+    columns     for each table: its ages, then L, M, S and sigma (if it has one), each as `ages` doubles, starting
+                `offset` doubles after the header
+Empty tables, tables with missing values (eg UK90 preterm BMI), and tables not indexed by decimal_age (eg weight for
+height) stay as lists in the header.
+"""
+
+# standard imports
+import argparse
+from array import array
+import hashlib
+from importlib import resources
+import io
+import json
+import logging
+import mmap
+import os
+import pathlib
+import struct
+import sys
+
+# rcpch imports
+from .lms_tables import LMSTable
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RCPCHLMS"
+FORMAT_VERSION = 2
+COMPILED_SUFFIX = ".lms"
+
+_PREAMBLE = struct.Struct("<8sI32sQI")
+_LMS_FIELDS = ("decimal_age", "L", "M", "S", "sigma")
+
+
+def compiled_file_name(file_name: str) -> str:
+    """
+    Returns the name of the compiled file for a JSON reference data file
+    """
+    return file_name.rsplit(".", 1)[0] + COMPILED_SUFFIX
+
+
+def compile_reference_data(source_json: bytes) -> bytes:
+    """
+    Returns the compiled form of the reference data in source_json (the bytes of a JSON file in data_tables)
+    """
+    reference_data = json.loads(source_json)
+    columns = []
+    offset = 0
+    for measurement_method in reference_data["measurement"].values():
+        for sex, lms_array in measurement_method.items():
+            if not all("decimal_age" in lms_element for lms_element in lms_array):
+                continue
+            fields = ["decimal_age", "L", "M", "S"]
+            has_sigma = len(lms_array) > 0 and all("sigma" in lms_element for lms_element in lms_array)
+            if has_sigma:
+                fields.append("sigma")
+            if len(lms_array) == 0 or any(isinstance(lms_element[field], str) for lms_element in lms_array for field in fields):
+                # missing values are kept as they are, without the fields the calculations do not read
+                measurement_method[sex] = [
+                    {field: lms_element[field] for field in _LMS_FIELDS if field in lms_element} for lms_element in lms_array
+                ]
+                continue
+            measurement_method[sex] = {"columns": [offset, len(lms_array), has_sigma]}
+            for field in fields:
+                columns.append(struct.pack(f"<{len(lms_array)}d", *(lms_element[field] for lms_element in lms_array)))
+                offset += len(lms_array)
+
+    header = json.dumps(reference_data, separators=(",", ":")).encode("utf-8")
+    header += b" " * (-(_PREAMBLE.size + len(header)) % 8)
+    return b"".join(
+        [
+            _PREAMBLE.pack(MAGIC, FORMAT_VERSION, _source_digest(source_json), len(source_json), len(header)),
+            header,
+        ]
+        + columns
+    )
+
+
+def _source_digest(source_json: bytes) -> bytes:
+    return hashlib.sha256(source_json).digest()
+
+
+def compiled_is_up_to_date(compiled, source, source_hash: bytes, source_size: int) -> bool:
+    """
+    Returns whether a compiled file (a path or Traversable) that records the source_hash and source_size was compiled
+    from the JSON file source as it is now. The JSON is only read if it is newer than the compiled file, or the files
+    cannot be stat'ed.
+    """
+    try:
+        source_stat = os.stat(source)
+        compiled_stat = os.stat(compiled)
+    except (TypeError, OSError):
+        # not plain files (eg the package is installed as a zip)
+        pass
+    else:
+        if source_stat.st_size != source_size:
+            return False
+        if compiled_stat.st_mtime_ns >= source_stat.st_mtime_ns:
+            return True
+    try:
+        return _source_digest(source.read_bytes()) == source_hash
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+
+def load_compiled_reference_data(compiled, source):
+    """
+    Returns the reference data in a compiled file (a path or Traversable) with its tables as LMSTables over a memory
+    map of the file, or None if it is missing, of another format version, or out of date with the JSON file source
+    it was compiled from (see compiled_is_up_to_date).
+    """
+    try:
+        with compiled.open("rb") as compiled_file:
+            try:
+                buffer = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+                # not a plain file (eg the package is installed as a zip), or empty
+                buffer = compiled_file.read()
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    if len(buffer) < _PREAMBLE.size:
+        return None
+    magic, format_version, source_hash, source_size, header_length = _PREAMBLE.unpack_from(buffer)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        logger.warning(
+            "%s is not in the current format: rebuild it with python -m rcpchgrowth.compiled_reference_data",
+            compiled.name,
+        )
+        return None
+    if not compiled_is_up_to_date(compiled, source, source_hash, source_size):
+        logger.warning(
+            "%s is out of date with %s, which is loaded instead: rebuild it with python -m rcpchgrowth.compiled_reference_data",
+            compiled.name,
+            source.name,
+        )
+        return None
+
+    header_end = _PREAMBLE.size + header_length
+    reference_data = json.loads(bytes(buffer[_PREAMBLE.size:header_end]))
+    values = memoryview(buffer)[header_end:]
+    if sys.byteorder == "little":
+        values = values.cast("d")
+    else:
+        # the columns are little endian, so are copied into native doubles
+        native_values = array("d")
+        native_values.frombytes(values)
+        native_values.byteswap()
+        values = memoryview(native_values)
+
+    for measurement_method in reference_data["measurement"].values():
+        for sex, lms_array in measurement_method.items():
+            if isinstance(lms_array, dict):
+                offset, ages, has_sigma = lms_array["columns"]
+                columns = [values[start:start + ages] for start in range(offset, offset + (5 if has_sigma else 4) * ages, ages)]
+                measurement_method[sex] = LMSTable.from_columns(*columns)
+            elif all("decimal_age" in lms_element for lms_element in lms_array):
+                measurement_method[sex] = LMSTable(lms_array)
+    return reference_data
+
+
+def reference_data_sources(package: str = "rcpchgrowth.data_tables") -> list:
+    """
+    Returns the JSON files in data_tables that hold LMS values, as Traversables
+    """
+    return [
+        source
+        for source in sorted(resources.files(package).iterdir(), key=lambda traversable: traversable.name)
+        if source.name.endswith(".json") and "measurement" in json.loads(source.read_bytes())
+    ]
+
+
+def compile_data_tables(package: str = "rcpchgrowth.data_tables", directory=None) -> list:
+    """
+    Compiles every JSON file in data_tables that holds LMS values, into data_tables unless a directory is given, and
+    returns the paths of the files written
+    """
+    written = []
+    for source in reference_data_sources(package):
+        if directory is None:
+            compiled = resources.files(package).joinpath(compiled_file_name(source.name))
+        else:
+            compiled = pathlib.Path(directory, compiled_file_name(source.name))
+        with open(compiled, "wb") as compiled_file:
+            compiled_file.write(compile_reference_data(source.read_bytes()))
+        written.append(str(compiled))
+    return written
+
+
+def check_compiled_data_tables(package: str = "rcpchgrowth.data_tables") -> list:
+    """
+    Returns the names of the compiled files in data_tables that are missing or differ from the compiled form of
+    their JSON
+    """
+    mismatched = []
+    for source in reference_data_sources(package):
+        compiled = resources.files(package).joinpath(compiled_file_name(source.name))
+        try:
+            compiled_bytes = compiled.read_bytes()
+        except (FileNotFoundError, NotADirectoryError):
+            compiled_bytes = None
+        if compiled_bytes != compile_reference_data(source.read_bytes()):
+            mismatched.append(compiled.name)
+    return mismatched
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiles, or checks, the reference data in data_tables.")
+    parser.add_argument("--check", action="store_true", help="check the compiled files against their JSON instead")
+    if parser.parse_args().check:
+        mismatched = check_compiled_data_tables()
+        for name in mismatched:
+            sys.stdout.write(f"out of date: {name}\n")
+        raise SystemExit(1 if mismatched else 0)
+    for name in compile_data_tables():
+        sys.stdout.write(f"compiled {name}\n")
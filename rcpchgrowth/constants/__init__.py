@@ -2,4 +2,6 @@ from .validation_constants import *
 from .age_constants import *
 from .reference_constants import *
 from .height_predictions_constants import *
-from .bone_age_constants import *
\ No newline at end of file
+from .bone_age_constants import *
+from .measurement_constants import *
+from .status_constants import *
\ No newline at end of file
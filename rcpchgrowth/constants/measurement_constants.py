@@ -0,0 +1,61 @@
+"""
+The profiles that select which results a Measurement (or the batch functions) calculates and returns.
+
+Measurement.measurement is made up of the sections in MEASUREMENT_SECTIONS. A profile (or a list of fields) names the
+sections wanted, or single values from measurement_calculated_values, and only the work needed for them is done:
+analytics that need only the SDS do not pay for the centile bands, the worded ages or the plottable data.
+"""
+
+MINIMAL_PROFILE = "minimal"  # the SDS and their errors
+NUMERIC_PROFILE = "numeric"  # every number in measurement_calculated_values, without the centile bands
+PLOTTABLE_PROFILE = "plottable"  # what a chart needs to plot a measurement
+FULL_PROFILE = "full"  # everything, as Measurement has always returned
+MEASUREMENT_PROFILES = [MINIMAL_PROFILE, NUMERIC_PROFILE, PLOTTABLE_PROFILE, FULL_PROFILE]
+
+# the sections of Measurement.measurement, in order
+MEASUREMENT_SECTIONS = [
+    "birth_data",
+    "measurement_dates",
+    "child_observation_value",
+    "measurement_calculated_values",
+    "plottable_data",
+    "bone_age",
+    "events_data",
+]
+
+# the values in measurement_calculated_values, in order, which can be asked for singly
+MEASUREMENT_CALCULATED_VALUES = [
+    "corrected_sds",
+    "corrected_centile",
+    "corrected_centile_band",
+    "chronological_sds",
+    "chronological_centile",
+    "chronological_centile_band",
+    "corrected_measurement_error",
+    "chronological_measurement_error",
+    "corrected_percentage_median_bmi",
+    "chronological_percentage_median_bmi",
+]
+
+MEASUREMENT_FIELDS = MEASUREMENT_SECTIONS + MEASUREMENT_CALCULATED_VALUES
+
+PROFILE_FIELDS = {
+    MINIMAL_PROFILE: [
+        "corrected_sds",
+        "chronological_sds",
+        "corrected_measurement_error",
+        "chronological_measurement_error",
+    ],
+    NUMERIC_PROFILE: [
+        "corrected_sds",
+        "corrected_centile",
+        "chronological_sds",
+        "chronological_centile",
+        "corrected_measurement_error",
+        "chronological_measurement_error",
+        "corrected_percentage_median_bmi",
+        "chronological_percentage_median_bmi",
+    ],
+    PLOTTABLE_PROFILE: ["child_observation_value", "measurement_calculated_values", "plottable_data"],
+    FULL_PROFILE: MEASUREMENT_SECTIONS,
+}
@@ -95,6 +95,11 @@ COLE_TWO_THIRDS_SDS_NINE_CENTILES = "cole-nine-centiles"
 EXTENDED_WHO_CENTILES = "extended-who-centiles"
 CENTILE_FORMATS = [THREE_PERCENT_CENTILES, FIVE_PERCENT_CENTILES, EIGHTY_FIVE_PERCENT_CENTILES, EXTENDED_WHO_CENTILES, COLE_TWO_THIRDS_SDS_NINE_CENTILES]
 
+# the encodings in which precomputed charts are returned (HTTP Content-Encoding values)
+GZIP_CHART_ENCODING = "gzip"
+IDENTITY_CHART_ENCODING = "identity"
+CHART_ENCODINGS = [GZIP_CHART_ENCODING, IDENTITY_CHART_ENCODING]
+
 THREE_PERCENT_CENTILE_COLLECTION = [3.0, 5.0, 10.0, 25.0, 50.0, 75.0, 90.0, 95.0, 97.0]
 EIGHTY_FIVE_PERCENT_CENTILE_COLLECTION = [5.0, 10.0, 25.0, 50.0, 75.0, 85.0, 90.0, 95, 98.0, 99.0, 99.9, 99.99] # use for CDC Extended BMI centiles 2022
 FIVE_PERCENT_CENTILE_COLLECTION = [5.0, 10.0, 25.0, 50.0, 75.0, 90.0, 95.0]
@@ -111,6 +116,14 @@ COLE_TWO_THIRDS_SDS_NINE_CENTILE_COLLECTION = [
 ]
 EXTENDED_WHO_CENTILES_COLLECTION = [1, 3, 5, 10, 15, 50, 85, 90, 95, 97, 99]
 
+# Centile band codes (see centile_bands.py). The centile band of an SDS is coded by its index in
+# generate_centile_band_ranges (an even index is on or near a centile, an odd index between two centiles), or by one
+# of these
+CENTILE_BAND_NONE = -1  # in no band: the SDS is not a number (or exactly the upper edge of the highest band)
+CENTILE_BAND_BELOW_NORMAL_RANGE = -2
+CENTILE_BAND_ABOVE_NORMAL_RANGE = -3
+CENTILE_BAND_OUTSIDE_NORMAL_RANGE = -4  # well outside the normal range (beyond the advisory SDS): a probable error
+
 UK_90_PRETERM_AGES = [-0.325804244, -0.306639288, -0.287474333, -0.268309377, -0.249144422, -0.229979466, -0.210814511, -0.191649555, -0.1724846, -0.153319644, -0.134154689, -0.114989733, -0.095824778, -0.076659822, -0.057494867, -0.038329911, -0.019164956, 0, 0.019164956, 0.038329911]
 WHO_2006_UNDER_TWOS_AGES = [0.038329911, 0.057494867, 0.076659822, 0.083333333, 0.095824778, 0.114989733, 0.134154689, 0.153319644, 0.166666667, 0.1724846, 0.191649555, 0.210814511, 0.229979466, 0.249144422, 0.25, 0.333333333, 0.416666667, 0.5, 0.583333333, 0.666666667, 0.75, 0.833333333, 0.916666667, 1, 1.083333333, 1.166666667, 1.25, 1.333333333, 1.416666667, 1.5, 1.583333333, 1.666666667, 1.75, 1.833333333, 1.916666667, 2]
 UK_WHO_2006_OVER_TWOS_AGES = [2, 2.083333333, 2.166666667, 2.25, 2.333333333, 2.416666667, 2.5, 2.583333333, 2.666666667, 2.75, 2.833333333, 2.916666667, 3, 3.083333333, 3.166666667, 3.25, 3.333333333, 3.416666667, 3.5, 3.583333333, 3.666666667, 3.75, 3.833333333, 3.916666667, 4]
@@ -0,0 +1,28 @@
+"""
+Reason codes for the rows the batch functions return as NaN (see batch_functions.reference_data_status).
+
+The scalar functions raise a LookupError, with a message, where a reference has no data for an age, measurement_method
+and sex (see reference_data_absent in each reference module). Scoring large datasets in which many rows fall outside
+the references, the batch functions instead return NaN for those rows with one of these codes, which are small
+integers so a column of them is cheap to store. STATUS_DESCRIPTIONS words them.
+"""
+
+STATUS_OK = 0  # reference data is present and the result was calculated
+STATUS_AGE_BELOW_REFERENCE = 1  # the age is below the youngest age of the reference
+STATUS_AGE_ABOVE_REFERENCE = 2  # the age is above the oldest age of the reference
+STATUS_AGE_BELOW_MEASUREMENT_DATA = 3  # the reference has no data for the measurement_method this young
+STATUS_AGE_ABOVE_MEASUREMENT_DATA = 4  # the reference has no data for the measurement_method (and sex) this old
+STATUS_NO_MEASUREMENT_DATA = 5  # the reference has no data for the measurement_method and sex at any age
+STATUS_MISSING_VALUE = 6  # the age or observation_value is missing (NaN)
+STATUS_NOT_CALCULABLE = 7  # there is reference data, but no result can be calculated from it for the observation_value
+
+STATUS_DESCRIPTIONS = {
+    STATUS_OK: "",
+    STATUS_AGE_BELOW_REFERENCE: "The age is below the range of the reference.",
+    STATUS_AGE_ABOVE_REFERENCE: "The age is above the range of the reference.",
+    STATUS_AGE_BELOW_MEASUREMENT_DATA: "The reference has no data for this measurement at this age.",
+    STATUS_AGE_ABOVE_MEASUREMENT_DATA: "The reference has no data for this measurement at this age.",
+    STATUS_NO_MEASUREMENT_DATA: "The reference has no data for this measurement and sex.",
+    STATUS_MISSING_VALUE: "The age or observation value is missing.",
+    STATUS_NOT_CALCULABLE: "It is not possible to calculate a result for this observation value.",
+}
@@ -1,14 +1,17 @@
+from calendar import monthrange
 from datetime import date
 from datetime import timedelta
-from dateutil import relativedelta
+from functools import lru_cache
 import math
 from .constants import TERM_PREGNANCY_LENGTH_DAYS
 
 """
-5 functions to calculate age related parameters
+Functions to calculate age related parameters
  - chronological_decimal_age: returns a decimal age from 2 dates (takes birth_date and observation_date)
  - corrected_decimal_age: returns a corrected decimal age accounting for prematurity (takes birth_date: date, observation_date: date, gestation_weeks: int, gestation_days: int, pregnancy_length_day [optional])
  - chronological_calendar_age: returns a calendar age as a string (takes birth_date or estimated_date_delivery and observation_date)
+ - calendar_age_years_months_days: returns the (years, months, days) of a calendar age (takes birth_date and observation_date)
+ - calendar_age_words: returns a calendar age as a string (takes years, months and days)
  - estimated_date_delivery: returns estimated date of delivery in a known premature infant (takes birth_date, gestation_weeks, gestation_days, pregnancy_length_days[optional])
 """
 
@@ -67,11 +70,46 @@ def chronological_calendar_age(birth_date: date, observation_date: date) -> str:
     if birth_date > observation_date:
         raise Exception("Birth date cannot be after the date of observation.")
 
+    if type(birth_date) is date and type(observation_date) is date:
+        return _calendar_age_of_dates(birth_date, observation_date)
+
+    # datetimes: relativedelta also counts the hours, so a part day is not counted
+    from dateutil import relativedelta
+
     difference = relativedelta.relativedelta(observation_date, birth_date)
-    years = difference.years
-    months = difference.months
-    weeks = difference.weeks
-    days = difference.days
+    date_string = calendar_age_words(years=difference.years, months=difference.months, days=difference.days)
+    if date_string:
+        return date_string
+    elif birth_date == observation_date:
+        return "Birth date"
+    else:
+        return ""
+
+
+def calendar_age_years_months_days(birth_date: date, observation_date: date) -> tuple:
+    """
+    returns (years, months, days) between two dates, as relativedelta does: the whole months from the birth date
+    (a birth date at the end of a month moving to the end of shorter months), then the days left over
+    """
+    months = (observation_date.year - birth_date.year) * 12 + observation_date.month - birth_date.month
+    day = min(birth_date.day, _days_in_month(birth_date.year, birth_date.month + months))
+    if observation_date.day < day:
+        # the observation is earlier in its month than the birth date: a month fewer, and the days since
+        # the same day of the month before (the end of the month, if it is shorter)
+        months -= 1
+        month_days = _days_in_month(birth_date.year, birth_date.month + months)
+        days = month_days - min(birth_date.day, month_days) + observation_date.day
+    else:
+        days = observation_date.day - day
+    years, months = divmod(months, 12)
+    return years, months, days
+
+
+def calendar_age_words(years: int, months: int, days: int) -> str:
+    """
+    returns a calendar age in years, months, weeks and days as words, or an empty string if they are all 0
+    """
+    weeks = days // 7
 
     date_string = []
 
@@ -102,12 +140,26 @@ def chronological_calendar_age(birth_date: date, observation_date: date) -> str:
         return (", ".join(date_string[:-1])) + " and " + date_string[-1]
     elif len(date_string) == 1:
         return date_string[0]
-    elif birth_date == observation_date:
-        return "Birth date"
     else:
         return ""
 
 
+# A clinic sees the same few (birth date, observation date) pairs again and again (and a Measurement of a preterm
+# baby words two calendar ages), so the worded ages of recent pairs of dates are kept
+@lru_cache(maxsize=4096)
+def _calendar_age_of_dates(birth_date: date, observation_date: date) -> str:
+    date_string = calendar_age_words(*calendar_age_years_months_days(birth_date, observation_date))
+    if date_string:
+        return date_string
+    return "Birth date"
+
+
+def _days_in_month(year: int, month: int) -> int:
+    # month can be beyond 12: it then counts on into the years after
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return monthrange(year, month)[1]
+
+
 def estimated_date_delivery(
     birth_date: date, gestation_weeks: int, gestation_days: int
 ) -> date:
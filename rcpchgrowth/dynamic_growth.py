@@ -1,5 +1,6 @@
 # standard imports
 import json
+import logging
 from typing import Literal
 import os
 import math
@@ -12,6 +13,8 @@ import math
 from rcpchgrowth.constants.reference_constants import FEMALE, MALE, UK_WHO, WEIGHT
 from rcpchgrowth.global_functions import measurement_from_sds, sds_for_centile, z_score, linear_interpolation
 
+logger = logging.getLogger(__name__)
+
 """
 These functions are experimental
 Height, weight, BMI or OFC in terms of SDS / Centile are snapshots in time and tell
@@ -262,9 +265,8 @@ def create_thrive_lines(target_centile: float, sex: str):
                     )
                     measurements.append(interpolated_measurement)
                     ages.append(interpolated_age)
-                except Exception:
-                    print("exception")
-                    pass
+                except Exception as e:
+                    logger.debug("thrive line: no interpolated point at +2.667 SDS: %s", e)
             elif (thrive_line['zs'][counter] >= -2.667 and thrive_line['zs'][counter+1] < -2.667):
                 try:
                     interpolated_age=float(linear_interpolation(-2.667, thrive_line['zs'][counter+1], thrive_line['zs'][counter], thrive_line['ages'][counter+1], thrive_line['ages'][counter]))
@@ -277,9 +279,8 @@ def create_thrive_lines(target_centile: float, sex: str):
                     )
                     measurements.append(interpolated_measurement)
                     ages.append(interpolated_age)
-                except Exception:
-                    print("another exception")
-                    pass
+                except Exception as e:
+                    logger.debug("thrive line: no interpolated point at -2.667 SDS: %s", e)
             elif thrive_line['zs'][counter] > -2.667 and thrive_line['zs'][counter] < 2.667:
                 measurements.append(thrive_line['observation_values'][counter])
                 ages.append(thrive_line['ages'][counter])
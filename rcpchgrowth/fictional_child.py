@@ -1,5 +1,6 @@
 # core imports
 from datetime import date, timedelta
+import logging
 import random
 import math
 
@@ -7,6 +8,9 @@ import math
 from rcpchgrowth.global_functions import measurement_from_sds
 from rcpchgrowth.measurement import Measurement
 
+logger = logging.getLogger(__name__)
+
+
 def generate_fictional_child_data(
     measurement_method: str,
     sex: str,
@@ -90,7 +94,7 @@ def generate_fictional_child_data(
         age=cycle_age
       )
     except Exception as e:
-      print(e)
+      logger.debug("generate_fictional_child_data: no measurement at age %s: %s", cycle_age, e)
 
     if noise and rawMeasurement is not None:
       # add measurement inaccuracy based on percentage supplied
@@ -1,47 +1,16 @@
+import logging
 import math
-import scipy.stats as stats
-from scipy.interpolate import interp1d
-from .uk_who import uk_who_lms_array_for_measurement_and_sex
-from .turner import turner_lms_array_for_measurement_and_sex
-from .trisomy_21 import trisomy_21_lms_array_for_measurement_and_sex
-from .cdc import cdc_lms_array_for_measurement_and_sex
-from .trisomy_21_aap import trisomy_21_aap_lms_array_for_measurement_and_sex
-from .who import who_lms_array_for_measurement_and_sex
+from .normal_distribution import normal_cdf, normal_ppf
+from .reference_registry import reference_for
+from .lms_cache import LMS_CACHE
+from .lms_tables import LMSTable, LMS_GRID, days_for_age
 
 # from scipy import interpolate  #see below, comment back in if swapping interpolation method
 # from scipy.interpolate import CubicSpline #see below, comment back in if swapping interpolation method
-from .constants.reference_constants import (
-    UK_WHO, TURNERS, 
-    TRISOMY_21, 
-    BMI, CDC, WEIGHT, HEIGHT, HEAD_CIRCUMFERENCE,
-    TRISOMY_21_AAP, 
-    WHO, 
-    UK90_PRETERM,
-    UK_WHO_INFANT, 
-    UK_WHO_CHILD,
-    UK90_CHILD,
-    WHO_2006_INFANT,
-    WHO_2006_CHILD,
-    WHO_2007_CHILD,
-    CDC_INFANT,
-    CDC_CHILD,
-    FENTON, 
-    TRISOMY_21_AAP_INFANT, 
-    TRISOMY_21_AAP_CHILD,
-    UK_90_PRETERM_AGES,
-    WHO_2006_UNDER_TWOS_AGES,
-    UK_WHO_2006_OVER_TWOS_AGES,
-    WHO_2006_OVER_TWOS_AGES,
-    WHO_2007_AGES,
-    UK90_AGES,
-    CDC_TO_TWO_AGE,
-    CDC_TO_THREE_AGE,
-    CDC_TWO_TWENTY,
-    TURNER_AGES,
-    TRISOMY_21_AGES,
-    TRISOMY_21_AAP_INFANT_AGES,
-    TRISOMY_21_AAP_CHILD_AGES
-    )
+from .constants.reference_constants import BMI, CDC
+
+# failures calculating single points (eg ages outside a reference) are expected, so are logged at DEBUG level
+logger = logging.getLogger(__name__)
 
 """Public functions"""
 
@@ -55,21 +24,42 @@ def measurement_from_sds(
     default_youngest_reference: bool = False,
 ) -> float:
 
-    try:
-        lms_value_array_for_measurement = lms_value_array_for_measurement_for_reference(
-            reference=reference,
-            age=age,
-            measurement_method=measurement_method,
-            sex=sex,
-            default_youngest_reference=default_youngest_reference,
-        )
-    except LookupError as err:
-        raise LookupError(err)
-
-    # get LMS values from the reference: check for age match, interpolate if none
-    lms = fetch_lms(
-        age=age, lms_value_array_for_measurement=lms_value_array_for_measurement
+    lms = lms_for_reference(
+        reference=reference,
+        age=age,
+        measurement_method=measurement_method,
+        sex=sex,
+        default_youngest_reference=default_youngest_reference,
     )
+    return measurement_for_lms(
+        reference=reference, measurement_method=measurement_method, requested_sds=requested_sds, lms=lms)
+
+
+def measurement_for_lms(reference: str, measurement_method: str, requested_sds: float, lms: dict) -> float:
+    """
+    Returns the measurement for an SDS from LMS values already looked up with lms_for_reference,
+    so that the measurements for several SDS can be calculated from one lookup (as in generate_centiles).
+    measurement_from_sds looks up the LMS values and calls this.
+    """
+    observation_value = _unrounded_measurement_for_lms(
+        reference=reference, measurement_method=measurement_method, requested_sds=requested_sds, lms=lms)
+    if observation_value is not None:
+        observation_value = round(observation_value, 4)
+    return observation_value
+
+
+def _round_centile_measurement(measurement: float) -> float:
+    """
+    Rounds a measurement on a centile line to 4 places as the centile lines always have been: when their SDS came
+    from scipy, the measurements were numpy floats, which round() rounds as numpy.round does (the measurement times
+    10**4 rounded half to even), not to the nearest 4 place decimal. The two differ at about one point in 2000, so
+    centile lines keep this rounding, and SDS lines (is_sds), whose SDS were always plain floats, keep round().
+    """
+    return round(measurement * 10000) / 10000
+
+
+def _unrounded_measurement_for_lms(reference: str, measurement_method: str, requested_sds: float, lms: dict) -> float:
+    # measurement_for_lms, before rounding
     l = lms["l"]
     m = lms["m"]
     s = lms["s"]
@@ -89,19 +79,18 @@ def measurement_from_sds(
             # inverse of the cdf applied to the bmi percentile - 90 / 10,
             # then multiplied by the sigma value and added to the 95th centile
             p95 = m * (1 + l * s * 1.645)**(1/l) # 95th centile measurement
-            centile = stats.norm.cdf(requested_sds) * 100 # convert z-score to centile
-            observation_value = stats.norm.ppf((centile - 90)/10) * sigma + p95
+            centile = normal_cdf(requested_sds) * 100 # convert z-score to centile
+            observation_value = normal_ppf((centile - 90)/10) * sigma + p95
     else:
         # all other references use the standard method
         try:
             observation_value = measurement_for_z(z=requested_sds, l=l, m=m, s=s)
         except Exception as e:
-            print(f"measurement_from_sds exception {e} - age: {age}, l: {l}, m: {m}, s: {s}, requested_sds: {requested_sds} lms: {lms}")
+            logger.debug(
+                "measurement_from_sds exception %s - l: %s, m: %s, s: %s, requested_sds: %s lms: %s",
+                e, l, m, s, requested_sds, lms)
             return None
-    
-    if observation_value is not None:
-        observation_value = round(observation_value, 4)
-    
+
     return observation_value
 
 
@@ -113,21 +102,22 @@ def sds_for_measurement(
     sex: str,
 ) -> float:
 
-    try:
-        lms_value_array_for_measurement = lms_value_array_for_measurement_for_reference(
-            reference=reference,
-            age=age,
-            measurement_method=measurement_method,
-            sex=sex,
-            default_youngest_reference=False,  # The oldest child reference should always be selected for SDS calculation
-        )
-    except LookupError as err:
-        raise LookupError(err)
-
-    # get LMS values from the reference: check for age match, interpolate if none
-    lms = fetch_lms(
-        age=age, lms_value_array_for_measurement=lms_value_array_for_measurement
+    lms = lms_for_reference(
+        reference=reference,
+        age=age,
+        measurement_method=measurement_method,
+        sex=sex,
+        default_youngest_reference=False,  # The oldest child reference should always be selected for SDS calculation
     )
+    return sds_for_lms(reference=reference, measurement_method=measurement_method, observation_value=observation_value, lms=lms)
+
+
+def sds_for_lms(reference: str, measurement_method: str, observation_value: float, lms: dict) -> float:
+    """
+    Returns the SDS of an observation from LMS values already looked up with lms_for_reference,
+    so that several results can be calculated from one lookup (as in the Measurement class).
+    sds_for_measurement looks up the LMS values and calls this.
+    """
     l = lms["l"]
     m = lms["m"]
     s = lms["s"]
@@ -140,8 +130,8 @@ def sds_for_measurement(
         if observation_value > m * (1 + l * s * 1.645)**(1/l):
             # above 95th centile
             p95 = m * (1 + l * s * 1.645)**(1/l)
-            centile = stats.norm.cdf((observation_value - p95) / sigma)*10 + 90
-            z = stats.norm.ppf(centile/100)
+            centile = normal_cdf((observation_value - p95) / sigma)*10 + 90
+            z = normal_ppf(centile/100)
             return z
 
     return z_score(l=l, m=m, s=s, observation=observation_value)
@@ -157,25 +147,19 @@ def percentage_median_bmi(
     It accepts the reference ('uk-who', 'turners-syndrome' or 'trisomy-21')
     """
 
-    # fetch the LMS values for the requested measurement
     try:
-        lms_value_array_for_measurement = lms_value_array_for_measurement_for_reference(
+        # The oldest reference should always be chosen for this calculation
+        # raises LookupError if the reference has no data for the age, measurement_method and sex
+        lms = lms_for_reference(
             reference=reference,
+            age=age,
             measurement_method=BMI,
             sex=sex,
-            age=age,
             default_youngest_reference=False,
-        )  # The oldest reference should always be chosen for this calculation
-    except LookupError as err:
-        raise LookupError(err)
-
-    # get LMS values from the reference: check for age match, interpolate if none
-    try:
-        lms = fetch_lms(
-            age=age, lms_value_array_for_measurement=lms_value_array_for_measurement
         )
-    except LookupError as err:
-        print(f"percentage median BMI lookup exception: {err}")
+    except IndexError as err:
+        # fetch_lms indexes past the end of the table
+        logger.debug("percentage median BMI lookup exception: %s", err)
         return None
 
     m = lms["m"]  # this is the median BMI
@@ -204,116 +188,74 @@ def generate_centile(
     To keep the dataset as small as possible, the function will skip non-integer ages above 3 years, but will include all ages below 3 years that are in the LMS list. 
     Paradoxically, the fewer data points, the smoother the curve, though for periods of rapid growth, more data points are needed.
     """
-
+    return generate_centiles(
+        z_scores=[z],
+        centiles=[centile],
+        measurement_method=measurement_method,
+        sex=sex,
+        reference=reference,
+        reference_name=reference_name,
+        is_sds=is_sds,
+    )[0]
+
+
+def generate_centiles(
+    z_scores: list,
+    centiles: list,
+    measurement_method: str,
+    sex: str,
+    reference: str,
+    reference_name: str,
+    is_sds: bool = False,
+) -> list:
+    """
+    Generates the centile curves for a list of z-scores (and their centiles, used as labels) together, as generate_centile
+    would for each one. Returns a list of curves in the order of z_scores.
+    Each age of the reference is checked, and its LMS values looked up, once for all the curves, rather than once per curve.
+    """
 
     # if this is an sds line, the label reflects the sds value. The default is to reflect the centile
-    label_value = centile
     if is_sds:
-        label_value = round(z, 3)
-
-    centile_measurements = []
-
-    # iterate through ages from 23 weeks to 20 years
-
-    if reference == UK_WHO:
-        if reference_name == UK90_PRETERM:
-            AGES = UK_90_PRETERM_AGES
-        elif reference_name == UK_WHO_INFANT:
-            AGES = WHO_2006_UNDER_TWOS_AGES
-        elif reference_name ==  UK_WHO_CHILD:
-            AGES = UK_WHO_2006_OVER_TWOS_AGES
-        elif reference_name == UK90_CHILD:
-            AGES = UK90_AGES
-    
-    elif reference == WHO:
-        if reference_name ==WHO_2006_INFANT:
-            AGES = WHO_2006_UNDER_TWOS_AGES
-        elif reference_name == WHO_2006_CHILD:
-            AGES = WHO_2006_OVER_TWOS_AGES
-        elif reference_name == WHO_2007_CHILD:
-            AGES = WHO_2007_AGES
-
-    elif reference == CDC:
-        if reference_name == CDC_INFANT:
-            if measurement_method == HEAD_CIRCUMFERENCE:
-                AGES = CDC_TO_THREE_AGE
-            elif measurement_method == HEIGHT or measurement_method == WEIGHT:
-                AGES = WHO_2006_UNDER_TWOS_AGES
-            else:
-                AGES = CDC_TO_TWO_AGE # should be redundant as no BMI data in CDC_INFANT
-        elif reference_name == CDC_CHILD:
-            AGES = CDC_TWO_TWENTY
-        elif reference_name == FENTON:
-            AGES = []
-    
-    elif reference == TURNERS:
-         AGES = TURNER_AGES
-    
-    elif reference == TRISOMY_21:
-        AGES = TRISOMY_21_AGES
-    
-    elif reference == TRISOMY_21_AAP:
-        if reference_name==TRISOMY_21_AAP_INFANT:
-            AGES = TRISOMY_21_AAP_INFANT_AGES
-        elif reference_name==TRISOMY_21_AAP_CHILD:
-            AGES = TRISOMY_21_AAP_CHILD_AGES
-    
-    def should_default_to_youngest_reference(age: float, reference_name: str):
-        if reference_name == UK90_PRETERM:
-            if age == 0.038329911:
-                return True
-        if reference_name == UK_WHO_INFANT:
-            if age == 2:
-                return True
-        elif reference_name == CDC_INFANT:
-            if age == 0.038329911:
-                return True
-            elif age == 2:
-                return True
-        elif reference_name == UK_WHO_CHILD:
-            if age == 4:
-                return True
-        elif reference_name == WHO_2006_INFANT:
-            if age == 0.038329911:
-                return True
-            if age == 2:
-                return True
-        elif reference_name == WHO_2006_CHILD:
-            if age == 5:
-                return True
-        elif reference_name == TRISOMY_21_AAP_INFANT:
-            if age == 3:
-                return True
-        return False
-
-    for age in AGES:
-        default_youngest_reference = False
-        if should_default_to_youngest_reference(age, reference_name):
-            default_youngest_reference = True
+        label_values = [round(z, 3) for z in z_scores]
+    else:
+        label_values = list(centiles)
+    requested_sds_values = [round(z, 4) for z in z_scores]
+
+    centile_lines = [[] for _ in z_scores]
+
+    # the ages to plot and the disjunction ages come from the segment of the reference
+    reference_segment = reference_for(reference).segment(reference_name)
+
+    for age in reference_segment.ages_for_centiles(measurement_method):
+        default_youngest_reference = reference_segment.should_default_to_youngest_reference(age)
 
         try:
-            measurement = measurement_from_sds(
+            # raises LookupError for ages without reference data, which are checked once, when their LMS are looked up
+            lms = lms_for_reference(
                 reference=reference,
+                age=age,
                 measurement_method=measurement_method,
-                requested_sds=round(z, 4),
                 sex=sex,
-                age=age,
                 default_youngest_reference=default_youngest_reference,
             )
         except Exception as err:
-            print(err)
-            measurement = None  #
+            logger.debug("generate_centile: no point at age %s: %s", age, err)
             continue
-        
-        if measurement is not None:
-            measurement = round(measurement, 4)
 
-        value = create_data_point(
-            age=age, measurement=measurement, label_value=label_value
-        )
-        centile_measurements.append(value)
+        x = round(age, 4)
+        for centile_line, requested_sds, label_value in zip(centile_lines, requested_sds_values, label_values):
+            try:
+                measurement = _unrounded_measurement_for_lms(
+                    reference=reference, measurement_method=measurement_method, requested_sds=requested_sds, lms=lms)
+            except Exception as err:
+                logger.debug("generate_centile: no point at age %s: %s", age, err)
+                continue
 
-    return centile_measurements
+            if measurement is not None:
+                measurement = round(measurement, 4) if is_sds else _round_centile_measurement(measurement)
+            centile_line.append({"l": label_value, "x": x, "y": measurement})
+
+    return centile_lines
 
 """
 *** PUBLIC FUNCTIONS THAT CONVERT BETWEEN CENTILE AND SDS
@@ -322,17 +264,17 @@ def generate_centile(
 
 def sds_for_centile(centile: float) -> float:
     """
-    converts a centile (supplied as a percentage) using the scipy package to an SDS.
+    converts a centile (supplied as a percentage) to an SDS.
     """
-    sds = stats.norm.ppf(centile / 100)
+    sds = normal_ppf(centile / 100)
     return sds
 
 
 def rounded_sds_for_centile(centile: float) -> float:
     """
-    converts a centile (supplied as a percentage) using the scipy package to the nearest 2/3 SDS.
+    converts a centile (supplied as a percentage) to the nearest 2/3 SDS.
     """
-    sds = stats.norm.ppf(centile / 100)
+    sds = normal_ppf(centile / 100)
     if sds == 0:
         return sds
     else:
@@ -342,10 +284,10 @@ def rounded_sds_for_centile(centile: float) -> float:
 
 def centile(z_score: float):
     """
-    Converts a Z Score to a p value (2-tailed) using the SciPy library, which it returns as a percentage
+    Converts a Z Score to a p value (2-tailed) using the normal cumulative distribution function, which it returns as a percentage
     """
     try:
-        centile = stats.norm.cdf(z_score) * 100
+        centile = normal_cdf(z_score) * 100
         return centile
     except Exception as err:
         raise Exception(err)
@@ -357,20 +299,6 @@ These are essential to the public functions but are not needed outside this file
 """
 
 
-def create_data_point(age: float, measurement: float, label_value: str):
-    # creates a data point
-    if measurement is not None:
-        try:
-            rounded = round(measurement, 4)
-        except Exception as e:
-            print(f"create datapoint error: {e} for {measurement}")
-            return
-    else:
-        rounded = None
-    value = {"l": label_value, "x": round(age, 4), "y": rounded}
-    return value
-
-
 """
 ***** INTERPOLATION FUNCTIONS *****
 """
@@ -455,13 +383,12 @@ def linear_interpolation(
     See sds function. This method is to do linear interpolation of L, M and S values for children whose ages are at the threshold of the reference data, making cubic interpolation impossible
     """
 
-    linear_interpolated_value = 0.0
+    if not age_one_below <= age <= age_one_above:
+        raise ValueError(f"The age {age} is outside the range {age_one_below} to {age_one_above}.")
 
-    # linear_interpolated_value = parameter_one_above + (((decimal_age - age_below)*parameter_one_above-parameter_one_below))/(age_above-age_below)
-    x_array = [age_one_below, age_one_above]
-    y_array = [parameter_one_below, parameter_one_above]
-    intermediate = interp1d(x_array, y_array)
-    linear_interpolated_value = intermediate(age)
+    # the same arithmetic as scipy interp1d, without building an interpolator for each call
+    slope = (parameter_one_above - parameter_one_below) / (age_one_above - age_one_below)
+    linear_interpolated_value = slope * (age - age_one_below) + parameter_one_below
     return linear_interpolated_value
 
 
@@ -488,7 +415,7 @@ def measurement_for_z(z: float, l: float, m: float, s: float) -> float:
         try:
             measurement_value = (first_step**exponent) * m
         except Exception as e:
-            print("measurement_for_z error: {e}")
+            logger.debug("measurement_for_z error: %s", e)
             return
     else:
         measurement_value = math.exp(s * z) * m
@@ -514,19 +441,12 @@ def z_score(l: float, m: float, s: float, observation: float):
 
 def nearest_lowest_index(lms_array: list, age: float) -> int:
     """
-    loops through the array of LMS values and returns either
-    the index of an exact match or the lowest nearest decimal age
+    returns either the index of an exact match or the lowest nearest decimal age
+    in the array of LMS values, using a binary search on the ages of the reference
     """
-    lowest_index = 0
-    for num, lms_element in enumerate(lms_array):
-        reference_age = lms_element["decimal_age"]
-        if round(reference_age, 16) == round(age, 16):
-            lowest_index = num
-            break
-        else:
-            if lms_element["decimal_age"] < age:
-                lowest_index = num
-    return lowest_index
+    if not isinstance(lms_array, LMSTable):
+        lms_array = LMSTable(lms_array)
+    return lms_array.nearest_lowest_index(age)
 
 
 def fetch_lms(age: float, lms_value_array_for_measurement: list):
@@ -534,138 +454,91 @@ def fetch_lms(age: float, lms_value_array_for_measurement: list):
     Retuns the LMS for a given age, and sigma if present (CDC BMI references). If there is no exact match in the reference
     an interpolated LMS is returned. Cubic interpolation is used except at the fringes of the
     reference where linear interpolation is used.
-    It accepts the age and a python list of the LMS values for that measurement_method and sex.
-    """
-    age_matched_index = nearest_lowest_index(
-        lms_value_array_for_measurement, age
-    )  # returns nearest LMS for age
-    if round(
-        lms_value_array_for_measurement[age_matched_index]["decimal_age"], 4
-    ) == round(age, 4):
+    It accepts the age and the LMSTable (or a python list) of the LMS values for that measurement_method and sex.
+    """
+    if not isinstance(lms_value_array_for_measurement, LMSTable):
+        lms_value_array_for_measurement = LMSTable(lms_value_array_for_measurement)
+
+    if LMS_GRID.enabled:
+        # look up the LMS on the precomputed grid for this table, if it has one and the age is within it
+        lms_grid = LMS_GRID.grid_for(lms_value_array_for_measurement)
+        if lms_grid is not None:
+            lms = lms_grid(age)
+            if lms is not None:
+                return lms
+
+    decimal_ages = lms_value_array_for_measurement.decimal_ages
+    l_values = lms_value_array_for_measurement.l
+    m_values = lms_value_array_for_measurement.m
+    s_values = lms_value_array_for_measurement.s
+    # CDC BMI references have an additional sigma value
+    sigma_values = lms_value_array_for_measurement.sigma
+
+    days = days_for_age(age)
+    if days is None:
+        age_matched_index = lms_value_array_for_measurement.nearest_lowest_index(
+            age
+        )  # returns nearest LMS for age
+        exact_match = round(decimal_ages[age_matched_index], 4) == round(age, 4)
+    else:
+        # ages worked out from dates are whole numbers of days, which are looked up with integers
+        age_matched_index, exact_match = lms_value_array_for_measurement.nearest_lowest_index_for_days(days)
+    if exact_match:
         # there is an exact match in the data with the requested age
-        l = lms_value_array_for_measurement[age_matched_index]["L"]
-        m = lms_value_array_for_measurement[age_matched_index]["M"]
-        s = lms_value_array_for_measurement[age_matched_index]["S"]
+        l = l_values[age_matched_index]
+        m = m_values[age_matched_index]
+        s = s_values[age_matched_index]
 
-        if "sigma" in lms_value_array_for_measurement[age_matched_index]:
-            # CDC BMI references have an additional sigma value
-            sigma = lms_value_array_for_measurement[age_matched_index]["sigma"]
+        if sigma_values is not None:
+            sigma = sigma_values[age_matched_index]
             return {"l": l, "m": m, "s": s, "sigma": sigma}
     else:
         # there has not been an exact match in the reference data
-        # Interpolation will be required.
-        # The age_matched_index is one below the age supplied. There
-        # needs to be a value below that, and two values above the supplied age,
-        # for cubic interpolation to be possible.
-        age_one_below = lms_value_array_for_measurement[age_matched_index][
-            "decimal_age"
-        ]
-        age_one_above = lms_value_array_for_measurement[age_matched_index + 1][
-            "decimal_age"
-        ]
-        parameter_one_below = lms_value_array_for_measurement[age_matched_index]
-        parameter_one_above = lms_value_array_for_measurement[age_matched_index + 1]
-
-        if (
-            age_matched_index >= 1
-            and age_matched_index < len(lms_value_array_for_measurement) - 2
-            and "sigma" not in lms_value_array_for_measurement[age_matched_index] # CDC BMI references have an additional sigma value
-            # and CDC only use linear interpolation
-        ):
-            # cubic interpolation is possible
-            age_two_below = lms_value_array_for_measurement[age_matched_index - 1][
-                "decimal_age"
-            ]
-            age_two_above = lms_value_array_for_measurement[age_matched_index + 2][
-                "decimal_age"
-            ]
-            parameter_two_below = lms_value_array_for_measurement[age_matched_index - 1]
-            parameter_two_above = lms_value_array_for_measurement[age_matched_index + 2]
-
-            l = cubic_interpolation(
-                age=age,
-                age_one_below=age_one_below,
-                age_two_below=age_two_below,
-                age_one_above=age_one_above,
-                age_two_above=age_two_above,
-                parameter_two_below=parameter_two_below["L"],
-                parameter_one_below=parameter_one_below["L"],
-                parameter_one_above=parameter_one_above["L"],
-                parameter_two_above=parameter_two_above["L"],
-            )
-            m = cubic_interpolation(
-                age=age,
-                age_one_below=age_one_below,
-                age_two_below=age_two_below,
-                age_one_above=age_one_above,
-                age_two_above=age_two_above,
-                parameter_two_below=parameter_two_below["M"],
-                parameter_one_below=parameter_one_below["M"],
-                parameter_one_above=parameter_one_above["M"],
-                parameter_two_above=parameter_two_above["M"],
-            )
-            s = cubic_interpolation(
-                age=age,
-                age_one_below=age_one_below,
-                age_two_below=age_two_below,
-                age_one_above=age_one_above,
-                age_two_above=age_two_above,
-                parameter_two_below=parameter_two_below["S"],
-                parameter_one_below=parameter_one_below["S"],
-                parameter_one_above=parameter_one_above["S"],
-                parameter_two_above=parameter_two_above["S"],
-            )
-            if "sigma" in lms_value_array_for_measurement[age_matched_index]:
-                # CDC BMI references have an additional sigma value
-                sigma = cubic_interpolation(
-                    age=age,
-                    age_one_below=age_one_below,
-                    age_two_below=age_two_below,
-                    age_one_above=age_one_above,
-                    age_two_above=age_two_above,
-                    parameter_two_below=parameter_two_below["sigma"],
-                    parameter_one_below=parameter_one_below["sigma"],
-                    parameter_one_above=parameter_one_above["sigma"],
-                    parameter_two_above=parameter_two_above["sigma"],
-                )
-                return {"l": l, "m": m, "s": s, "sigma": sigma}
-        else:
-            # we are at the thresholds of this reference or are using CDC. Only linear interpolation is possible
-            l = linear_interpolation(
-                age=age,
-                age_one_below=age_one_below,
-                age_one_above=age_one_above,
-                parameter_one_below=parameter_one_below["L"],
-                parameter_one_above=parameter_one_above["L"],
-            )
-            m = linear_interpolation(
-                age=age,
-                age_one_below=age_one_below,
-                age_one_above=age_one_above,
-                parameter_one_below=parameter_one_below["M"],
-                parameter_one_above=parameter_one_above["M"],
-            )
-            s = linear_interpolation(
-                age=age,
-                age_one_below=age_one_below,
-                age_one_above=age_one_above,
-                parameter_one_below=parameter_one_below["S"],
-                parameter_one_above=parameter_one_above["S"],
-            )
-            if "sigma" in lms_value_array_for_measurement[age_matched_index]:
-                # CDC BMI references have an additional sigma value
-                sigma = linear_interpolation(
-                    age=age,
-                    age_one_below=age_one_below,
-                    age_one_above=age_one_above,
-                    parameter_one_below=parameter_one_below["sigma"],
-                    parameter_one_above=parameter_one_above["sigma"],
-                )
-                return {"l": l, "m": m, "s": s, "sigma": sigma}
+        # Interpolation will be required, between the age_matched_index and the one above it.
+        # The interpolating polynomials for each interval in the reference are precomputed: cubic
+        # where there is a value below and two values above the supplied age, and linear
+        # at the fringes of the reference or for CDC (which only uses linear interpolation)
+        l, m, s, sigma = lms_value_array_for_measurement.piecewise(
+            age, interval=age_matched_index
+        )
+        if sigma is not None:
+            return {"l": l, "m": m, "s": s, "sigma": sigma}
 
     return {"l": l, "m": m, "s": s}
 
 
+def lms_for_reference(
+    reference: str,
+    age: float,
+    measurement_method: str,
+    sex: str,
+    default_youngest_reference: bool = False,
+) -> dict:
+    """
+    Returns the LMS (and sigma, for CDC BMI) for a reference, measurement_method, sex and age, as fetch_lms.
+    Results are kept in the LMS_CACHE, so repeated requests do not select the reference or interpolate again.
+    The dictionary returned is shared with the cache and must not be modified.
+    """
+    lms_cache_key = (reference, measurement_method, sex, age, default_youngest_reference)
+    lms = LMS_CACHE.get(lms_cache_key)
+    if lms is None:
+        # raises LookupError if the reference has no data for the age, measurement_method and sex
+        lms_value_array_for_measurement = lms_value_array_for_measurement_for_reference(
+            reference=reference,
+            age=age,
+            measurement_method=measurement_method,
+            sex=sex,
+            default_youngest_reference=default_youngest_reference,
+        )
+
+        # get LMS values from the reference: check for age match, interpolate if none
+        lms = fetch_lms(
+            age=age, lms_value_array_for_measurement=lms_value_array_for_measurement
+        )
+        LMS_CACHE.put(lms_cache_key, lms)
+    return lms
+
+
 def lms_value_array_for_measurement_for_reference(
     reference: str,
     age: float,
@@ -678,61 +551,14 @@ def lms_value_array_for_measurement_for_reference(
     It accepts the reference ('uk-who', 'turners-syndrome', 'trisomy-21', 'cdc')
     If the UK-WHO reference is requested, it is possible to be select the younger reference for overlap values,
     using the default_youngest_reference flag.
+    The reference is looked up in the REFERENCE_REGISTRY (see reference_registry.py).
     """
 
-    if reference == UK_WHO:
-        try:
-            lms_value_array_for_measurement = uk_who_lms_array_for_measurement_and_sex(
-                age=age,
-                measurement_method=measurement_method,
-                sex=sex,
-                default_youngest_reference=default_youngest_reference,
-            )
-        except LookupError as error:
-            raise LookupError(error)
-    elif reference == WHO:
-        try:
-            lms_value_array_for_measurement = who_lms_array_for_measurement_and_sex(
-                age=age,
-                measurement_method=measurement_method,
-                sex=sex,
-                default_youngest_reference=default_youngest_reference,
-            )
-        except LookupError as error:
-            raise LookupError(error)
-    elif reference == TURNERS:
-        try:
-            lms_value_array_for_measurement = turner_lms_array_for_measurement_and_sex(
-                measurement_method=measurement_method, sex=sex, age=age
-            )
-        except LookupError as error:
-            raise LookupError(error)
-    elif reference == TRISOMY_21:
-        try:
-            lms_value_array_for_measurement = (
-                trisomy_21_lms_array_for_measurement_and_sex(
-                    measurement_method=measurement_method, sex=sex, age=age
-                )
-            )
-        except LookupError as error:
-            raise LookupError(error)
-    elif reference == CDC:
-        try:
-            lms_value_array_for_measurement = cdc_lms_array_for_measurement_and_sex(
-                age=age,
-                measurement_method=measurement_method,
-                sex=sex,
-                default_youngest_reference=default_youngest_reference
-            )
-        except LookupError as error:
-            raise LookupError(error)
-    elif reference == TRISOMY_21_AAP:
-        try:
-            lms_value_array_for_measurement = trisomy_21_aap_lms_array_for_measurement_and_sex(
-                age=age, measurement_method=measurement_method, sex=sex, default_youngest_reference=default_youngest_reference)
-        except LookupError as error:
-            raise LookupError(error)
-    else:
-        raise ValueError("No or incorrect reference supplied")
-    return lms_value_array_for_measurement
-
+    reference_entry = reference_for(reference)  # raises ValueError if the reference is not recognised
+    # raises LookupError if the reference has no data for the age, measurement_method and sex
+    return reference_entry.lms_value_array_for_measurement(
+        age=age,
+        measurement_method=measurement_method,
+        sex=sex,
+        default_youngest_reference=default_youngest_reference,
+    )
@@ -0,0 +1,42 @@
+"""
+A bounded, thread safe, least recently used cache of LMS values.
+
+Charts and repeat views of the same patient look up the LMS values for the same reference, measurement_method,
+sex and age again and again (the Measurement class alone looks up every age twice, once chronological and
+once corrected). Each lookup selects a reference and interpolates L, M and S, so the results are cached
+here, keyed by (reference, measurement_method, sex, age, default_youngest_reference).
+
+The cache is shared by the whole process. It can be resized, disabled and cleared at runtime, and reports
+its hits, misses and evictions:
+
+    from rcpchgrowth import LMS_CACHE
+    LMS_CACHE.configure(maxsize=10000)
+    LMS_CACHE.info()
+    LMS_CACHE.configure(enabled=False)
+"""
+
+# standard imports
+from collections import namedtuple
+
+# rcpch imports
+from .lru_cache import LRUCache
+
+LMSCacheInfo = namedtuple("LMSCacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize", "enabled"])
+
+DEFAULT_LMS_CACHE_SIZE = 4096
+
+
+class LMSCache(LRUCache):
+    """
+    Least recently used cache of LMS dictionaries. Values are shared between callers, so must not be modified.
+    """
+
+    info_type = LMSCacheInfo
+    description = "LMS cache"
+
+    def __init__(self, maxsize: int = DEFAULT_LMS_CACHE_SIZE, enabled: bool = True):
+        super().__init__(maxsize=maxsize, enabled=enabled)
+
+
+# the cache used by the calculation functions in global_functions
+LMS_CACHE = LMSCache()
@@ -0,0 +1,494 @@
+"""
+Columnar LMS tables.
+
+Each reference file stores the LMS values for a measurement_method and sex as a list of dictionaries,
+one per age. Looking up an age in that list means walking it and reading each dictionary in turn.
+At load time each list is converted to an LMSTable, which is still a sequence of the same dictionaries
+(so select_reference_data functions return what they always have), but holds only the ages and
+L, M, S (and sigma for CDC BMI) as separate read only columns of doubles. The bracketing age is then found
+by binary search.
+
+Ages worked out from dates are whole numbers of days (days / 365.25 years). The reference ages are in weeks, months
+and years, so are not, but each table is also indexed by whole days: the bracketing age of a whole number of days is
+found by searching integers, and an exact match (to 4 decimal places) is an integer lookup.
+
+The interpolation between each pair of ages in a table is also fixed, so it is precomputed once per table
+as a PiecewiseLMS: a polynomial for each interval, evaluated in a few multiply-adds.
+
+Optionally (see LMS_GRID), L, M and S can instead be precomputed on a fine uniform grid of ages, so that a lookup
+is an index calculation and a linear blend between two grid points, at the cost of a small, bounded deviation
+from the exact interpolation and the memory for the grid.
+"""
+
+# standard imports
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from collections.abc import Sequence
+import math
+import threading
+from types import MappingProxyType
+
+# rcpch imports
+from .lms_cache import LMS_CACHE
+
+"""
+decimal_age: the ages in the reference, in ascending order
+l, m, s: the L, M and S values at each age
+sigma: the sigma values at each age (CDC BMI references only, otherwise None)
+"""
+
+
+def read_only_column(values) -> Sequence:
+    """
+    Returns the values as a read only memoryview of doubles, or as a tuple if some are missing (""),
+    as some data sets have no values for some measurements (eg UK90 preterm BMI)
+    """
+    values = tuple(values)
+    if any(isinstance(value, str) for value in values):
+        return values
+    return memoryview(array("d", values)).toreadonly()
+
+
+class LMSTable(Sequence):
+    """
+    The LMS values for one measurement_method and sex of a reference, as columns for fast lookup.
+    Indexing or iterating over the table gives the LMS dictionary of each age, as in the JSON reference data, but
+    without the interval and value fields. The table holds only the columns, as read only memoryviews of doubles (of
+    the compiled file for tables compiled to the binary format, see compiled_reference_data.py), and builds the
+    dictionaries, as read only MappingProxyTypes, if they are asked for. Columns with missing values (eg UK90 preterm
+    BMI) are tuples.
+    """
+
+    __slots__ = ("decimal_ages", "l", "m", "s", "sigma", "_rows", "_rounded_ages", "_piecewise", "_grid", "_day_index")
+
+    def __init__(self, lms_array: list = ()):
+        lms_array = list(lms_array)
+        self._rows = None
+        self._set_columns(
+            decimal_ages=read_only_column(lms_element["decimal_age"] for lms_element in lms_array),
+            l=read_only_column(lms_element["L"] for lms_element in lms_array),
+            m=read_only_column(lms_element["M"] for lms_element in lms_array),
+            s=read_only_column(lms_element["S"] for lms_element in lms_array),
+            # CDC BMI references have an additional sigma value
+            sigma=(
+                read_only_column(lms_element["sigma"] for lms_element in lms_array)
+                if len(lms_array) > 0 and all("sigma" in lms_element for lms_element in lms_array)
+                else None
+            ),
+        )
+
+    @classmethod
+    def from_columns(cls, decimal_ages, l, m, s, sigma=None) -> "LMSTable":
+        """
+        Returns a table of the columns supplied (sequences of floats, eg lists or memoryviews)
+        """
+        lms_table = cls.__new__(cls)
+        lms_table._rows = None
+        lms_table._set_columns(decimal_ages=decimal_ages, l=l, m=m, s=s, sigma=sigma)
+        return lms_table
+
+    def _set_columns(self, decimal_ages, l, m, s, sigma):
+        self.decimal_ages = decimal_ages
+        self.l = l
+        self.m = m
+        self.s = s
+        self.sigma = sigma
+        # exact matches are made on ages rounded to 16 places, as they always have been. These are kept as a list,
+        # which is faster to search than a column of doubles
+        self._rounded_ages = [round(decimal_age, 16) for decimal_age in decimal_ages]
+        self._piecewise = None
+        self._grid = None  # (generation of LMS_GRID settings, LMSGrid or None)
+        self._day_index = None
+
+    def __len__(self) -> int:
+        return len(self.decimal_ages)
+
+    def __getitem__(self, index):
+        return self._lms_elements()[index]
+
+    def __iter__(self):
+        return iter(self._lms_elements())
+
+    def _lms_elements(self) -> tuple:
+        # the LMS dictionaries, built from the columns on first use. They are shared by every caller, so are read only
+        if self._rows is None:
+            rows = [
+                {"decimal_age": decimal_age, "L": l, "M": m, "S": s}
+                for decimal_age, l, m, s in zip(self.decimal_ages, self.l, self.m, self.s)
+            ]
+            if self.sigma is not None:
+                for lms_element, sigma in zip(rows, self.sigma):
+                    lms_element["sigma"] = sigma
+            self._rows = tuple(MappingProxyType(lms_element) for lms_element in rows)
+        return self._rows
+
+    def __eq__(self, other) -> bool:
+        # compares as the list of LMS dictionaries it was before the columns were added
+        if isinstance(other, (list, tuple, LMSTable)):
+            return len(self) == len(other) and all(ours == theirs for ours, theirs in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"LMSTable({list(self)!r})"
+
+    @property
+    def piecewise(self) -> "PiecewiseLMS":
+        """
+        The interpolating polynomials for this table, built on first use
+        """
+        if self._piecewise is None:
+            self._piecewise = PiecewiseLMS(self)
+        return self._piecewise
+
+    def nearest_lowest_index(self, age: float) -> int:
+        """
+        Returns either the index of an exact match or of the nearest age below the age supplied.
+        If the age is below the first age in the table, 0 is returned.
+        """
+        rounded_age = round(age, 16)
+        index = bisect_left(self._rounded_ages, rounded_age)
+        if index < len(self) and self._rounded_ages[index] == rounded_age:
+            return index
+        return max(bisect_left(self.decimal_ages, age) - 1, 0)
+
+    def nearest_lowest_index_for_days(self, days: int) -> tuple:
+        """
+        Returns (index, exact_match) for an age of a whole number of days (days / 365.25 years, as the ages worked out
+        from dates are): the index nearest_lowest_index gives for the age, and whether the age matches the age at that
+        index to 4 decimal places, as in fetch_lms. They are found by integer search and integer equality (see
+        day_index).
+        """
+        if self._day_index is None:
+            self._day_index = self.day_index()
+        first_days_above, days_near_ages = self._day_index
+        near = days_near_ages.get(days)
+        if near is not None:
+            return near
+        return max(bisect_right(first_days_above, days) - 1, 0), False
+
+    def day_index(self) -> tuple:
+        """
+        Returns the table indexed by whole days, as a tuple of:
+        - for each age in the table, the first whole number of days whose age is above it, so the ages below an age of
+          days are counted by searching these integers
+        - for the few days either side of each age in the table (which can match it to 4 decimal places), their
+          (index, exact_match), worked out from the decimal age
+        The ages of the reference are in weeks, months and years, so are not whole numbers of days themselves.
+        """
+        first_days_above = []
+        days_near_ages = {}
+        for decimal_age in self.decimal_ages:
+            days = math.floor(decimal_age * 365.25)
+            while days / 365.25 > decimal_age:
+                days -= 1
+            while not days / 365.25 > decimal_age:
+                days += 1
+            first_days_above.append(days)
+            for near_days in range(days - 2, days + 2):
+                age = near_days / 365.25
+                index = self.nearest_lowest_index(age)
+                days_near_ages[near_days] = (index, round(self.decimal_ages[index], 4) == round(age, 4))
+        return first_days_above, days_near_ages
+
+
+def days_for_age(age: float):
+    """
+    Returns the age as a whole number of days if it is one (days / 365.25 years exactly, as the ages worked out from
+    dates are), otherwise None
+    """
+    try:
+        days = round(age * 365.25)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if days / 365.25 == age:
+        return days
+    return None
+
+
+_MISSING_COEFFICIENTS = (math.nan,) * 4
+
+
+class PiecewiseLMS:
+    """
+    L, M and S (and sigma) of an LMSTable as piecewise polynomials, one for each interval between consecutive ages.
+    As in fetch_lms, an interval with two ages either side is interpolated with Tim Cole's four point cubic. Intervals at
+    the fringes of the table, and all intervals in tables with sigma (CDC BMI), are interpolated linearly.
+    Each polynomial is stored as coefficients in powers of the age from the start of its interval, so is evaluated
+    with three multiply-adds. The cubic coefficients come from divided differences and agree with cubic_interpolation
+    to within 1e-12. The linear coefficients are the value and slope, which is the same arithmetic as linear_interpolation.
+    The coefficients of each parameter are a read only column of doubles, four per interval, which are NaN for
+    intervals with missing values.
+    """
+
+    __slots__ = ("decimal_ages", "cubic", "l", "m", "s", "sigma")
+
+    def __init__(self, lms_table: LMSTable):
+        self.decimal_ages = lms_table.decimal_ages
+        intervals = range(len(lms_table) - 1)
+        self.cubic = [
+            1 <= interval < len(lms_table) - 2 and lms_table.sigma is None for interval in intervals
+        ]
+        self.l, self.m, self.s = (
+            self._coefficient_column(parameter_values, intervals)
+            for parameter_values in (lms_table.l, lms_table.m, lms_table.s)
+        )
+        if lms_table.sigma is None:
+            self.sigma = None
+        else:
+            self.sigma = self._coefficient_column(lms_table.sigma, intervals)
+
+    def interval(self, age: float) -> int:
+        """
+        Returns the index of the interval containing the age. Ages beyond the ends of the table are given the
+        first or last interval.
+        """
+        return min(max(bisect_right(self.decimal_ages, age) - 1, 0), len(self.decimal_ages) - 2)
+
+    def __call__(self, age: float, interval: int = None) -> tuple:
+        """
+        Returns a tuple of L, M, S and sigma (None unless in the table) at the age supplied.
+        The interval can be passed if it is already known. Linear intervals, like linear_interpolation, raise a ValueError if
+        the age is outside them.
+        """
+        if interval is None:
+            interval = self.interval(age)
+        age_below = self.decimal_ages[interval]
+        if not self.cubic[interval] and not age_below <= age <= self.decimal_ages[interval + 1]:
+            raise ValueError(f"The age {age} is outside the range of the reference data.")
+        t = age - age_below
+        start = 4 * interval
+        values = []
+        for parameter_coefficients in (self.l, self.m, self.s, self.sigma):
+            if parameter_coefficients is None:
+                values.append(None)
+                continue
+            c0, c1, c2, c3 = parameter_coefficients[start : start + 4]
+            if math.isnan(c0):
+                raise ValueError(f"There are no LMS values in the reference data at {age}.")
+            values.append(c0 + t * (c1 + t * (c2 + t * c3)))
+        return tuple(values)
+
+    def _coefficient_column(self, parameter_values, intervals: range) -> memoryview:
+        column = array("d")
+        for interval in intervals:
+            coefficients = self._coefficients(parameter_values, interval)
+            column.extend(_MISSING_COEFFICIENTS if coefficients is None else coefficients)
+        return memoryview(column).toreadonly()
+
+    def _coefficients(self, parameter_values: list, interval: int):
+        # coefficients in powers of (age - age at the start of the interval), or None where values are missing
+        if self.cubic[interval]:
+            ages = self.decimal_ages[interval - 1 : interval + 3]
+            values = parameter_values[interval - 1 : interval + 3]
+        else:
+            ages = self.decimal_ages[interval : interval + 2]
+            values = parameter_values[interval : interval + 2]
+        if any(isinstance(value, str) for value in values):
+            # some data sets have no values for some measurements (eg UK90 preterm BMI)
+            return None
+
+        if not self.cubic[interval]:
+            age_one_below, age_one_above = ages
+            parameter_one_below, parameter_one_above = values
+            slope = (parameter_one_above - parameter_one_below) / (age_one_above - age_one_below)
+            return (float(parameter_one_below), slope, 0.0, 0.0)
+
+        # Newton divided differences, taking the ages in the order one below, one above, two below, two above
+        age_two_below, age_one_below, age_one_above, age_two_above = ages
+        parameter_two_below, parameter_one_below, parameter_one_above, parameter_two_above = values
+        first_below = (parameter_one_below - parameter_two_below) / (age_one_below - age_two_below)
+        first_within = (parameter_one_above - parameter_one_below) / (age_one_above - age_one_below)
+        first_above = (parameter_two_above - parameter_one_above) / (age_two_above - age_one_above)
+        second_below = (first_within - first_below) / (age_one_above - age_two_below)
+        second_above = (first_above - first_within) / (age_two_above - age_one_below)
+        third = (second_above - second_below) / (age_two_above - age_two_below)
+
+        # expand the Newton form about the age one below
+        one_above = age_one_above - age_one_below
+        two_below = age_two_below - age_one_below
+        return (
+            float(parameter_one_below),
+            first_within - second_below * one_above + third * one_above * two_below,
+            second_below - third * (one_above + two_below),
+            third,
+        )
+
+
+class LMSGrid:
+    """
+    L, M and S (and sigma) of an LMSTable precomputed at evenly spaced ages from the first to the last age of the
+    table, from its PiecewiseLMS. The spacing is the largest that divides the table evenly and is no more than
+    the resolution requested. Values between grid points are blended linearly.
+    """
+
+    __slots__ = ("first_age", "last_age", "step", "points", "l", "m", "s", "sigma")
+
+    def __init__(self, lms_table: LMSTable, resolution: float):
+        self.first_age = lms_table.decimal_ages[0]
+        self.last_age = lms_table.decimal_ages[-1]
+        intervals = max(math.ceil((self.last_age - self.first_age) / resolution), 1)
+        self.step = (self.last_age - self.first_age) / intervals
+        self.points = intervals + 1
+
+        piecewise = lms_table.piecewise
+        columns = [array("d"), array("d"), array("d"), None if lms_table.sigma is None else array("d")]
+        for point in range(self.points):
+            age = min(self.first_age + point * self.step, self.last_age)
+            for column, value in zip(columns, piecewise(age)):
+                if column is not None:
+                    column.append(value)
+        self.l, self.m, self.s, self.sigma = columns
+
+    @staticmethod
+    def memory(lms_table: LMSTable, resolution: float) -> int:
+        """
+        Returns the bytes of values a grid of the table at the resolution would hold
+        """
+        points = max(math.ceil((lms_table.decimal_ages[-1] - lms_table.decimal_ages[0]) / resolution), 1) + 1
+        return points * (3 if lms_table.sigma is None else 4) * array("d").itemsize
+
+    def __call__(self, age: float):
+        """
+        Returns the LMS (and sigma if in the table) at the age as a dictionary, or None if the age is outside the grid
+        """
+        if not self.first_age <= age <= self.last_age:
+            return None
+        position = (age - self.first_age) / self.step
+        point = min(int(position), self.points - 2)
+        fraction = position - point
+        l, m, s = self.l, self.m, self.s
+        lms = {
+            "l": l[point] + fraction * (l[point + 1] - l[point]),
+            "m": m[point] + fraction * (m[point + 1] - m[point]),
+            "s": s[point] + fraction * (s[point + 1] - s[point]),
+        }
+        if self.sigma is not None:
+            sigma = self.sigma
+            lms["sigma"] = sigma[point] + fraction * (sigma[point + 1] - sigma[point])
+        return lms
+
+
+LMSGridInfo = namedtuple("LMSGridInfo", ["enabled", "resolution", "max_memory", "memory", "tables", "tables_over_memory"])
+
+# one day, as a fraction of a year
+DEFAULT_LMS_GRID_RESOLUTION = 1 / 365.25
+# enough for every reference at the default resolution
+DEFAULT_LMS_GRID_MAX_MEMORY = 16 * 1024 * 1024
+
+
+class LMSGridMode:
+    """
+    Settings for looking up LMS values on precomputed grids instead of interpolating each time (off by default).
+
+    The grid for each table is built on first use, until the memory used by grids reaches max_memory; tables after
+    that, tables with missing values (eg UK90 preterm BMI), and ages outside a table, are interpolated exactly.
+    Linear blending between grid points deviates from the exact interpolation by an amount that grows with the
+    square of the resolution. At the default resolution of one day, SDS for the UK-WHO validation data
+    (sds_age_validation_2021.json) are within MAX_SDS_DEVIATION of the exact values.
+    """
+
+    MAX_SDS_DEVIATION = 1e-4
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.enabled = False
+        self.resolution = DEFAULT_LMS_GRID_RESOLUTION
+        self.max_memory = DEFAULT_LMS_GRID_MAX_MEMORY
+        self._generation = 0
+        self._callbacks = []
+        self._memory = 0
+        self._tables = 0
+        self._tables_over_memory = 0
+
+    def configure(self, enabled: bool = None, resolution: float = None, max_memory: int = None):
+        """
+        Enables or disables grid lookups and sets the resolution (in years) and the maximum bytes of values held in grids.
+        Grids already built are discarded, and the callbacks registered with register_callback are called, so that caches
+        of values that may have come from the previous settings (LMS_CACHE, CHART_CACHE) are cleared.
+        """
+        if resolution is not None and not resolution > 0:
+            raise ValueError("The LMS grid resolution must be greater than 0 years.")
+        if max_memory is not None and max_memory < 0:
+            raise ValueError("The LMS grid memory cannot be negative.")
+        with self._lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if resolution is not None:
+                self.resolution = resolution
+            if max_memory is not None:
+                self.max_memory = max_memory
+            self._generation += 1
+            self._memory = 0
+            self._tables = 0
+            self._tables_over_memory = 0
+        for callback in list(self._callbacks):
+            callback()
+
+    def register_callback(self, callback):
+        """
+        Registers a function, called without arguments whenever the settings change
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def info(self) -> LMSGridInfo:
+        """
+        Returns the settings, the bytes of values held in grids, the number of tables with grids and the number of
+        tables for which there was not enough memory
+        """
+        with self._lock:
+            return LMSGridInfo(
+                enabled=self.enabled,
+                resolution=self.resolution,
+                max_memory=self.max_memory,
+                memory=self._memory,
+                tables=self._tables,
+                tables_over_memory=self._tables_over_memory,
+            )
+
+    def grid_for(self, lms_table: LMSTable):
+        """
+        Returns the LMSGrid for the table at the current settings, building it if need be, or None if it has no grid
+        """
+        built = lms_table._grid
+        if built is not None and built[0] == self._generation:
+            return built[1]
+        with self._lock:
+            built = lms_table._grid
+            if built is not None and built[0] == self._generation:
+                return built[1]
+            lms_grid = None
+            parameters = [lms_table.l, lms_table.m, lms_table.s] + ([lms_table.sigma] if lms_table.sigma is not None else [])
+            if len(lms_table) > 1 and not any(
+                isinstance(value, str) for parameter_values in parameters for value in parameter_values
+            ):
+                memory = LMSGrid.memory(lms_table, self.resolution)
+                if self._memory + memory <= self.max_memory:
+                    lms_grid = LMSGrid(lms_table, self.resolution)
+                    self._memory += memory
+                    self._tables += 1
+                else:
+                    self._tables_over_memory += 1
+            lms_table._grid = (self._generation, lms_grid)
+            return lms_grid
+
+
+# the grid settings used by fetch_lms
+LMS_GRID = LMSGridMode()
+LMS_GRID.register_callback(LMS_CACHE.clear)
+
+
+def columnar_reference_data(reference_data: dict) -> dict:
+    """
+    Converts each list of LMS values in a reference (as loaded from JSON) into an LMSTable, in place.
+    Lists not indexed by decimal_age (eg weight for height) are left as they are.
+    Returns the reference data.
+    """
+    for measurement_method in reference_data["measurement"].values():
+        for sex, lms_array in measurement_method.items():
+            if all("decimal_age" in lms_element for lms_element in lms_array):
+                measurement_method[sex] = LMSTable(lms_array)
+    return reference_data
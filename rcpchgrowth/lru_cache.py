@@ -0,0 +1,134 @@
+"""
+The bounded, thread safe, least recently used cache that LMS_CACHE (lms_cache.py) and CHART_CACHE (chart_cache.py)
+are built on.
+
+Each cache can be resized, disabled and cleared at runtime, and reports its hits, misses and evictions. Subclasses
+choose how values are stored (_encode), returned (_decode) and counted towards nbytes (_nbytes_of), and the
+namedtuple info returns.
+"""
+
+# standard imports
+from collections import OrderedDict, namedtuple
+import threading
+
+LRUCacheInfo = namedtuple(
+    "LRUCacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize", "nbytes", "enabled", "hit_rate"]
+)
+
+
+class LRUCache:
+    """
+    Least recently used cache. Values are stored as returned by _encode, and get returns them as returned by _decode.
+    """
+
+    # the namedtuple returned by info: any of the fields of LRUCacheInfo
+    info_type = LRUCacheInfo
+    # the name of the cache in error messages
+    description = "cache"
+
+    def __init__(self, maxsize: int, enabled: bool = True):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._maxsize = maxsize
+        self._enabled = enabled
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _encode(self, value):
+        # the form in which a value is stored
+        return value
+
+    def _decode(self, stored):
+        # the value returned for a stored value: called outside the lock
+        return stored
+
+    def _nbytes_of(self, stored) -> int:
+        # the bytes counted towards nbytes for a stored value
+        return 0
+
+    def get(self, key: tuple):
+        """
+        Returns the value for the key, or None if it is not in the cache (or the cache is disabled)
+        """
+        if not self._enabled:
+            return None
+        with self._lock:
+            stored = self._entries.get(key)
+            if stored is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+        # decoded outside the lock, so callers do not wait for each other's copies
+        return self._decode(stored)
+
+    def put(self, key: tuple, value):
+        """
+        Stores the value for the key, evicting the least recently used entries if the cache is full
+        """
+        if not self._enabled:
+            return
+        stored = self._encode(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= self._nbytes_of(previous)
+            self._entries[key] = stored
+            self._nbytes += self._nbytes_of(stored)
+            self._evict()
+
+    def _evict(self):
+        # called with the lock held
+        while len(self._entries) > self._maxsize:
+            _, stored = self._entries.popitem(last=False)
+            self._nbytes -= self._nbytes_of(stored)
+            self._evictions += 1
+
+    def configure(self, maxsize: int = None, enabled: bool = None):
+        """
+        Changes the maximum number of entries and/or enables or disables the cache.
+        Shrinking the cache evicts the least recently used entries, and disabling it empties it.
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError(f"The {self.description} size must be at least 1. Use enabled=False to disable it.")
+        with self._lock:
+            if maxsize is not None:
+                self._maxsize = maxsize
+                self._evict()
+            if enabled is not None:
+                self._enabled = enabled
+                if not enabled:
+                    self._entries.clear()
+                    self._nbytes = 0
+
+    def clear(self):
+        """
+        Empties the cache and resets its statistics
+        """
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def info(self):
+        """
+        Returns the statistics of the cache as an info_type: the hits, misses, evictions, maximum size, current size,
+        bytes held, whether the cache is enabled and the proportion of lookups that were hits (0.0 before any lookup)
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            statistics = dict(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                maxsize=self._maxsize,
+                currsize=len(self._entries),
+                nbytes=self._nbytes,
+                enabled=self._enabled,
+                hit_rate=self._hits / lookups if lookups else 0.0,
+            )
+        return self.info_type(**{field: statistics[field] for field in self.info_type._fields})
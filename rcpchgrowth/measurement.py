@@ -1,14 +1,18 @@
 # standard imports
 from datetime import date
-from typing import Literal
+from functools import cached_property
+from typing import Literal, Union
 
 # rcpch imports
-from .centile_bands import centile_band_for_centile
+from .centile_bands import centile_band_code, centile_band_for_code
 from .constants import *
 from .date_calculations import (chronological_decimal_age, corrected_decimal_age,
                                 chronological_calendar_age, estimated_date_delivery, corrected_gestational_age)
-from .global_functions import sds_for_measurement, centile, percentage_median_bmi
+from .global_functions import sds_for_measurement, centile, lms_for_reference, sds_for_lms
 from .age_advice_strings import comment_prematurity_correction
+from .measurement_result import DeferredValue, MeasurementResult, measurement_fields
+
+
 class Measurement:
 
     def __init__(
@@ -26,7 +30,9 @@ class Measurement:
         bone_age_type: str = None,
         bone_age_sds: float = None,
         bone_age_centile: float = None,
-        bone_age_text: str = None
+        bone_age_text: str = None,
+        profile: str = FULL_PROFILE,
+        fields: list = None
     ):
         """
         The Measurement Class is the gatekeeper to all the functions in the RCPCHGrowth package, although the public
@@ -51,6 +57,12 @@ class Measurement:
         `bone_age_sds`: an SDS for the bone age, based on references
         `bone_age_centile`: a centile for the bone age, based on references
         `bone_age_reference`: enum ['greulich-pyle', 'tanner-whitehouse-ii', 'tanner-whitehouse-iii', 'fels', 'bonexpert']
+        `profile`: which results to calculate: 'minimal' (the SDS), 'numeric' (the SDS, centiles and percentage median BMI),
+        'plottable' (what a chart needs) or 'full' (everything, the default). See measurement_constants.py.
+        `fields`: a list of sections of `measurement`, or of values in measurement_calculated_values, used instead of the profile.
+        The results are stored in `result` (a MeasurementResult). The `measurement` dictionary (and the
+        `plottable_centile_data`, `plottable_sds_data`, `ages_object` and `calculated_measurements_object` it is made of)
+        are built from it when first read. Results that were not asked for are None, and are left out of `measurement`.
         """
 
         self.birth_date = birth_date
@@ -71,152 +83,136 @@ class Measurement:
         # self.height_prediction_centile = height_prediction_centile
         # self.height_prediction_reference = height_prediction_reference
         self.events_text = events_text
+        self.fields = measurement_fields(profile=profile, fields=fields)
+
+        # only the work needed for the fields asked for is done
+        plottable = "plottable_data" in self.fields
+        calculated_values = "measurement_calculated_values" in self.fields
 
+        self.result = MeasurementResult(
+            measurement_method=self.measurement_method,
+            observation_value=self.observation_value,
+            bone_age=self.bone_age,
+            bone_age_type=self.bone_age_type,
+            bone_age_sds=self.bone_age_sds,
+            bone_age_centile=self.bone_age_centile,
+            bone_age_text=self.bone_age_text,
+            events_text=self.events_text,
+        )
 
-        # the ages_object receives birth_data and measurement_dates objects
-        self.ages_object = self.__calculate_ages(
+        # calculates the ages into the result (its birth_data and measurement_dates)
+        self.__calculate_ages(
             sex=self.sex,
             birth_date=self.birth_date,
             observation_date=self.observation_date,
             gestation_weeks=self.gestation_weeks,
-            gestation_days=self.gestation_days)
+            gestation_days=self.gestation_days,
+            word_ages=plottable or "measurement_dates" in self.fields)
         
         # validate the measurement method to ensure that the observation value is within the expected range - changed to SDS-based cutoffs - issue #32
-        try:
-            self.__validate_measurement_method(
-                measurement_method=measurement_method, observation_value=observation_value, corrected_decimal_age=self.ages_object['measurement_dates']['corrected_decimal_age'], reference=reference, sex=sex)
-            observation_value_error = None
-        except Exception as err:
-            observation_value_error = f"{err}"
-        
-        # the calculate_measurements_object receives the child_observation_value and measurement_calculated_values objects
-        self.calculated_measurements_object = self.sds_and_centile_for_measurement_method(
+        if plottable or "child_observation_value" in self.fields:
+            try:
+                self.__validate_measurement_method(
+                    measurement_method=measurement_method, observation_value=observation_value, corrected_decimal_age=self.result.corrected_decimal_age, reference=reference, sex=sex)
+                observation_value_error = None
+            except Exception as err:
+                observation_value_error = f"{err}"
+            self.result.observation_value_error = observation_value_error
+
+        # the SDS, centiles and errors for each age (its measurement_calculated_values)
+        corrected_scores, chronological_scores = self.__scores(
             sex=self.sex,
-            corrected_age=self.ages_object['measurement_dates']['corrected_decimal_age'],
-            chronological_age=self.ages_object['measurement_dates']['chronological_decimal_age'],
+            corrected_age=self.result.corrected_decimal_age,
+            chronological_age=self.result.chronological_decimal_age,
             measurement_method=self.measurement_method,
             observation_value=self.observation_value,
-            observation_value_error=observation_value_error,
-            reference=self.reference
+            reference=self.reference,
+            centiles=plottable or calculated_values or not self.fields.isdisjoint(
+                ["corrected_centile", "chronological_centile"]),
+            centile_bands=plottable or calculated_values or not self.fields.isdisjoint(
+                ["corrected_centile_band", "chronological_centile_band"]),
+            percentage_median_bmi=calculated_values or not self.fields.isdisjoint(
+                ["corrected_percentage_median_bmi", "chronological_percentage_median_bmi"])
         )
+        self.result.corrected_sds = corrected_scores["sds"]
+        self.result.corrected_centile = corrected_scores["centile"]
+        self.result.corrected_centile_band = corrected_scores["centile_band"]
+        self.result.corrected_measurement_error = corrected_scores["measurement_error"]
+        self.result.corrected_percentage_median_bmi = corrected_scores["percentage_median_bmi"]
+        self.result.chronological_sds = chronological_scores["sds"]
+        self.result.chronological_centile = chronological_scores["centile"]
+        self.result.chronological_centile_band = chronological_scores["centile_band"]
+        self.result.chronological_measurement_error = chronological_scores["measurement_error"]
+        self.result.chronological_percentage_median_bmi = chronological_scores["percentage_median_bmi"]
 
-        corrected_gestational_age = ""
-        if (self.ages_object["measurement_dates"]["corrected_gestational_age"]["corrected_gestation_weeks"] is not None):
-            corrected_gestational_age = f'{ self.ages_object["measurement_dates"]["corrected_gestational_age"]["corrected_gestation_weeks"] } + { self.ages_object["measurement_dates"]["corrected_gestational_age"]["corrected_gestation_days"]} weeks'
-
-        self.plottable_centile_data = {
-            "chronological_decimal_age_data": {
-                "x": self.ages_object['measurement_dates']['chronological_decimal_age'],
-                "y": self.observation_value,
-                "b": self.bone_age,
-                "centile": self.calculated_measurements_object["measurement_calculated_values"]["chronological_centile"],
-                "sds": self.calculated_measurements_object["measurement_calculated_values"]["chronological_sds"],
-                "events_text": self.events_text,
-                "bone_age_label": self.bone_age_text,
-                "bone_age_type": self.bone_age_type,
-                "bone_age_sds": self.bone_age_sds,
-                "bone_age_centile": self.bone_age_centile,
-                "observation_error": self.calculated_measurements_object['child_observation_value']["observation_value_error"],
-                "age_type": "chronological_age",
-                "calendar_age": self.ages_object["measurement_dates"]["chronological_calendar_age"],
-                "lay_comment": self.ages_object["measurement_dates"]["comments"]["lay_chronological_decimal_age_comment"],
-                "clinician_comment": self.ages_object["measurement_dates"]["comments"]["clinician_chronological_decimal_age_comment"],
-                "age_error": self.ages_object["measurement_dates"]["corrected_decimal_age_error"],
-                "centile_band": self.calculated_measurements_object['measurement_calculated_values']["chronological_centile_band"],
-                "observation_value_error": self.calculated_measurements_object["measurement_calculated_values"]["chronological_measurement_error"]
-
-            },
-            "corrected_decimal_age_data": {
-                "x": self.ages_object['measurement_dates']['corrected_decimal_age'],
-                "y": self.observation_value,
-                "b": self.bone_age,
-                "centile": self.calculated_measurements_object["measurement_calculated_values"]["corrected_centile"],
-                "sds": self.calculated_measurements_object["measurement_calculated_values"]["corrected_sds"],
-                "events_text": self.events_text,
-                "bone_age_label": self.bone_age_text,
-                "bone_age_type": self.bone_age_type,
-                "bone_age_sds": self.bone_age_sds,
-                "bone_age_centile": self.bone_age_centile,
-                "observation_error": self.calculated_measurements_object['child_observation_value']["observation_value_error"],
-                "age_type": "corrected_age",
-                "corrected_gestational_age": corrected_gestational_age,
-                "calendar_age": self.ages_object["measurement_dates"]["corrected_calendar_age"],
-                "lay_comment": self.ages_object["measurement_dates"]["comments"]["lay_corrected_decimal_age_comment"],
-                "clinician_comment": self.ages_object["measurement_dates"]["comments"]["clinician_corrected_decimal_age_comment"],
-                "age_error": self.ages_object["measurement_dates"]["corrected_decimal_age_error"],
-                "centile_band": self.calculated_measurements_object['measurement_calculated_values']["corrected_centile_band"],
-                "observation_value_error": self.calculated_measurements_object["measurement_calculated_values"]["corrected_measurement_error"]
-            }
-        }
+    """
+    The dictionaries Measurement has always returned, built from the result when first read
+    """
+
+    @cached_property
+    def measurement(self) -> dict:
+        # the final object is made up of these components: birth_data, measurement_dates, child_observation_value,
+        # measurement_calculated_values, plottable_data, bone_age and events_data - or those of them asked for
+        return self.result.to_dict(self.fields)
+
+    # the parts of measurement below are None if they were not asked for
+
+    @cached_property
+    def plottable_centile_data(self) -> dict:
+        plottable_data = self.measurement.get("plottable_data")
+        return None if plottable_data is None else plottable_data["centile_data"]
 
-        self.plottable_sds_data = {
-            "chronological_decimal_age_data": {
-                "x": self.ages_object['measurement_dates']['chronological_decimal_age'],
-                "y": self.calculated_measurements_object['measurement_calculated_values']["chronological_sds"],
-                "b": self.bone_age,
-                "centile": self.calculated_measurements_object["measurement_calculated_values"]["chronological_centile"],
-                "events_text": self.events_text,
-                "bone_age_label": self.bone_age_text,
-                "bone_age_type": self.bone_age_type,
-                "bone_age_sds": self.bone_age_sds,
-                "bone_age_centile": self.bone_age_centile,
-                "age_type": "chronological_age",
-                "calendar_age": self.ages_object["measurement_dates"]["chronological_calendar_age"],
-                "lay_comment": self.ages_object["measurement_dates"]["comments"]["lay_chronological_decimal_age_comment"],
-                "clinician_comment": self.ages_object["measurement_dates"]["comments"]["clinician_chronological_decimal_age_comment"],
-                "age_error": self.ages_object["measurement_dates"]["corrected_decimal_age_error"],
-                "centile_band": self.calculated_measurements_object['measurement_calculated_values']["chronological_centile_band"],
-                "observation_value_error": self.calculated_measurements_object["measurement_calculated_values"]["chronological_measurement_error"]
-            },
-            "corrected_decimal_age_data": {
-                "x": self.ages_object['measurement_dates']['corrected_decimal_age'],
-                "y": self.calculated_measurements_object['measurement_calculated_values']["corrected_sds"],
-                "b": self.bone_age,
-                "centile": self.calculated_measurements_object["measurement_calculated_values"]["corrected_centile"],
-                "events_text": self.events_text,
-                "bone_age_label": self.bone_age_text,
-                "bone_age_type": self.bone_age_type,
-                "bone_age_sds": self.bone_age_sds,
-                "bone_age_centile": self.bone_age_centile,
-                "age_type": "corrected_age",
-                "corrected_gestational_age": corrected_gestational_age,
-                "calendar_age": self.ages_object["measurement_dates"]["corrected_calendar_age"],
-                "lay_comment": self.ages_object["measurement_dates"]["comments"]["lay_corrected_decimal_age_comment"],
-                "clinician_comment": self.ages_object["measurement_dates"]["comments"]["clinician_corrected_decimal_age_comment"],
-                "age_error": self.ages_object["measurement_dates"]["corrected_decimal_age_error"],
-                "centile_band": self.calculated_measurements_object['measurement_calculated_values']["corrected_centile_band"],
-                "observation_value_error": self.calculated_measurements_object["measurement_calculated_values"]["corrected_measurement_error"]
-            },
+    @cached_property
+    def plottable_sds_data(self) -> dict:
+        plottable_data = self.measurement.get("plottable_data")
+        return None if plottable_data is None else plottable_data["sds_data"]
+
+    @cached_property
+    def ages_object(self) -> dict:
+        return {
+            "birth_data": self.measurement.get("birth_data"),
+            "measurement_dates": self.measurement.get("measurement_dates")
         }
 
-        # the final object is made up of these five components
-        self.measurement = {
-            'birth_data': self.ages_object['birth_data'],
-            'measurement_dates': self.ages_object['measurement_dates'],
-            'child_observation_value': self.calculated_measurements_object['child_observation_value'],
-            'measurement_calculated_values': self.calculated_measurements_object['measurement_calculated_values'],
-            'plottable_data': {
-                "centile_data": self.plottable_centile_data,
-                "sds_data": self.plottable_sds_data
-            },
-            # 'height_prediction_data':{
-            #     "height_prediction": self.height_prediction,
-            #     "height_prediction_sds": self.height_prediction_sds,
-            #     "height_prediction_centile": self.height_prediction_centile,
-            #     "height_prediction_reference": self.height_prediction_reference
-            # },
-            'bone_age': {
-                "bone_age": self.bone_age,
-                "bone_age_type": self.bone_age_type,
-                "bone_age_sds": self.bone_age_sds,
-                "bone_age_centile": self.bone_age_centile,
-                "bone_age_text": self.bone_age_text,
-            },
-            'events_data': {
-                'events_text': self.events_text
-            }
+    @cached_property
+    def calculated_measurements_object(self) -> dict:
+        return {
+            "child_observation_value": self.measurement.get("child_observation_value"),
+            "measurement_calculated_values": self.measurement.get("measurement_calculated_values")
         }
 
+    @cached_property
+    def return_measurement_object(self) -> dict:
+        return self.calculated_measurements_object
+
+    """
+    The calendar ages and comments, kept in the result
+    """
+
+    @property
+    def chronological_calendar_age(self) -> str:
+        return self.result.chronological_calendar_age
+
+    @property
+    def corrected_calendar_age(self) -> str:
+        return self.result.corrected_calendar_age
+
+    @property
+    def lay_corrected_decimal_age_comment(self) -> str:
+        return self.result.lay_corrected_decimal_age_comment
+
+    @property
+    def clinician_corrected_decimal_age_comment(self) -> str:
+        return self.result.clinician_corrected_decimal_age_comment
+
+    @property
+    def lay_chronological_decimal_age_comment(self) -> str:
+        return self.result.lay_chronological_decimal_age_comment
+
+    @property
+    def clinician_chronological_decimal_age_comment(self) -> str:
+        return self.result.clinician_chronological_decimal_age_comment
+
     """
     These are 2 public class methods
     """
@@ -235,160 +231,169 @@ class Measurement:
         # returns sds for given measurement
         # bmi must be supplied precalculated
 
+        corrected_scores, chronological_scores = self.__scores(
+            sex=sex,
+            corrected_age=corrected_age,
+            chronological_age=chronological_age,
+            measurement_method=measurement_method,
+            observation_value=observation_value,
+            reference=reference
+        )
+
+        self.return_measurement_object = self.__create_measurement_object(
+            reference=reference,
+            measurement_method=measurement_method,
+            observation_value=observation_value,
+            observation_value_error=observation_value_error,
+            corrected_sds_value=corrected_scores["sds"],
+            corrected_centile_value=corrected_scores["centile"],
+            corrected_centile_band=corrected_scores["centile_band"],
+            chronological_sds_value=chronological_scores["sds"],
+            chronological_centile_value=chronological_scores["centile"],
+            chronological_centile_band=chronological_scores["centile_band"],
+            chronological_measurement_error=chronological_scores["measurement_error"],
+            corrected_measurement_error=corrected_scores["measurement_error"],
+            corrected_percentage_median_bmi=corrected_scores["percentage_median_bmi"],
+            chronological_percentage_median_bmi=chronological_scores["percentage_median_bmi"]
+        )
+
+        return self.return_measurement_object
+
+    """
+    These are all private class methods and are only accessed by this class on initialisation
+    """
+
+    def __scores(
+        self,
+        sex: str,
+        corrected_age: float,
+        chronological_age: float,
+        measurement_method: str,
+        observation_value: float,
+        reference: str,
+        centiles: bool = True,
+        centile_bands: bool = True,
+        percentage_median_bmi: bool = True
+    ) -> tuple:
+        # Private method which returns the scores (see __no_scores) for the corrected and chronological ages
         # calculate sds based on reference, age, measurement, sex and prematurity
+        # The centiles, centile bands and percentage median BMI are only calculated if asked for.
 
         if corrected_age is None or chronological_age is None:
             # there has been an age calculation error. Further calculation impossible - this may be due to a date error or because CDC reference data is not available in preterm infants
 
-            self.return_measurement_object = self.__create_measurement_object(
-                reference=reference,
-                measurement_method=measurement_method,
-                observation_value=observation_value,
-                observation_value_error=observation_value_error,
-                corrected_sds_value=None,
-                corrected_centile_value=None,
-                corrected_centile_band=None,
-                chronological_sds_value=None,
-                chronological_centile_value=None,
-                chronological_centile_band=None,
-                chronological_measurement_error="Dates error. Calculations impossible.",
-                corrected_measurement_error="Dates error. Calculations impossible.",
-                corrected_percentage_median_bmi=None,
-                chronological_percentage_median_bmi=None
+            return (
+                self.__no_scores(measurement_error="Dates error. Calculations impossible."),
+                self.__no_scores(measurement_error="Dates error. Calculations impossible.")
             )
-            return self.return_measurement_object
         
-            # CDC data cannot be used for preterm infants who are not yet term. We will not be able to calculate SDS scores and centiles so will return none, but signpost to the user that this is what we are doing.
-        if corrected_age < 0 and reference == "cdc":
-            corrected_measurement_error = "This baby is born premature. CDC data is not available for preterm infants."
-            corrected_measurement_sds = None
+        if reference == CDC:
+            if measurement_method == BMI:
+                centile_format = EIGHTY_FIVE_PERCENT_CENTILES
+            else:
+                centile_format = THREE_PERCENT_CENTILES
+        else:
+            centile_format = COLE_TWO_THIRDS_SDS_NINE_CENTILES
+
+        # The LMS values are looked up once for each age, and the SDS, centile, centile band and percentage median BMI are all calculated from them.
+        # CDC data cannot be used for preterm infants who are not yet term. We will not be able to calculate SDS scores and centiles so will return none, but signpost to the user that this is what we are doing.
+        # Without correction for prematurity the chronological results are the corrected ones, so are not calculated again
+        # (unless the corrected calculation failed other than for lack of reference data, which raises on the chronological age).
+        reuse_corrected_scores = chronological_age == corrected_age
+        if corrected_age < 0 and reference == CDC:
+            corrected_scores = self.__no_scores(
+                measurement_error="This baby is born premature. CDC data is not available for preterm infants.")
+            reuse_corrected_scores = False
         else:
             try:
-                corrected_measurement_sds = sds_for_measurement(reference=reference, age=corrected_age, measurement_method=measurement_method,
-                                                                observation_value=observation_value, sex=sex)
+                corrected_scores = self.__scores_for_age(
+                    reference=reference, age=corrected_age, measurement_method=measurement_method,
+                    observation_value=observation_value, sex=sex, centile_format=centile_format, centiles=centiles,
+                    centile_bands=centile_bands, percentage_median_bmi=percentage_median_bmi)
             except Exception as err:
-                corrected_measurement_error = f"{err}"
-                corrected_measurement_sds = None
+                corrected_scores = self.__no_scores(measurement_error=f"{err}")
+                reuse_corrected_scores = reuse_corrected_scores and isinstance(err, LookupError)
 
-        try:
-            chronological_measurement_sds = sds_for_measurement(reference=reference, age=chronological_age, measurement_method=measurement_method,
-                                                                observation_value=observation_value, sex=sex)
-        except LookupError as err:
-            chronological_measurement_error = f"{err}"
-            chronological_measurement_sds = None
-
-        if chronological_measurement_sds is None:
-            chronological_measurement_centile = None
-            chronological_centile_band = None
+        if reuse_corrected_scores:
+            chronological_scores = corrected_scores
         else:
-            chronological_measurement_error = None
             try:
-                chronological_measurement_centile = centile(
-                    z_score=chronological_measurement_sds)
-            except Exception as err:
-                chronological_measurement_error = "Not possible to calculate centile"
-                chronological_measurement_centile = None
-            try:
-                if reference == CDC:
-                    if measurement_method == BMI:
-                        centile_format = EIGHTY_FIVE_PERCENT_CENTILES
-                    else:
-                        centile_format = THREE_PERCENT_CENTILES
-                else:
-                    centile_format = COLE_TWO_THIRDS_SDS_NINE_CENTILES
-                chronological_centile_band = centile_band_for_centile(
-                    sds=chronological_measurement_sds, 
-                    measurement_method=measurement_method,
-                    centile_format=centile_format
-                    )
-            except Exception as err:
-                chronological_measurement_error = "Not possible to calculate centile"
-                chronological_centile_band = None
+                chronological_scores = self.__scores_for_age(
+                    reference=reference, age=chronological_age, measurement_method=measurement_method,
+                    observation_value=observation_value, sex=sex, centile_format=centile_format, centiles=centiles,
+                    centile_bands=centile_bands, percentage_median_bmi=percentage_median_bmi)
+            except LookupError as err:
+                chronological_scores = self.__no_scores(measurement_error=f"{err}")
 
-        if corrected_measurement_sds is None:
-            corrected_measurement_centile = None
-            corrected_centile_band = None
-        else:
-            corrected_measurement_error = None
+        return corrected_scores, chronological_scores
+
+    def __scores_for_age(
+        self,
+        reference: str,
+        age: float,
+        measurement_method: str,
+        observation_value: float,
+        sex: str,
+        centile_format: Union[str, list],
+        centiles: bool = True,
+        centile_bands: bool = True,
+        percentage_median_bmi: bool = True
+    ) -> dict:
+        # Private method which looks up the LMS values for an age once, and returns the SDS, centile, centile band
+        # and (for BMI) percentage median BMI calculated from them, with any error.
+        # A centile or centile band not asked for is None, unless the SDS is not a number, when it is calculated
+        # anyway for the measurement_error it gives.
+        # Raises LookupError if there are no reference data for the age.
+
+        lms = lms_for_reference(
+            reference=reference, age=age, measurement_method=measurement_method, sex=sex)
+        scores = self.__no_scores(
+            sds=sds_for_lms(reference=reference, measurement_method=measurement_method, observation_value=observation_value, lms=lms))
+
+        real_sds = isinstance(scores["sds"], float)
+        if centiles or not real_sds:
             try:
-                corrected_measurement_centile = centile(
-                    z_score=corrected_measurement_sds)
+                scores["centile"] = centile(z_score=scores["sds"])
             except Exception as err:
-                corrected_measurement_error = "Not possible to calculate centile"
-                corrected_measurement_centile = None
-
+                scores["measurement_error"] = "Not possible to calculate centile"
+        if centile_bands or not real_sds:
+            # the band is found now, so any error is reported with the scores, and only worded when it is read
             try:
-                if reference == CDC:
-                    if measurement_method == BMI:
-                        centile_format = EIGHTY_FIVE_PERCENT_CENTILES
-                    else:
-                        centile_format = THREE_PERCENT_CENTILES
-                else:
-                    centile_format = COLE_TWO_THIRDS_SDS_NINE_CENTILES
-                corrected_centile_band = centile_band_for_centile(
-                    sds=corrected_measurement_sds, 
+                centile_band = centile_band_code(
+                    sds=scores["sds"],
                     measurement_method=measurement_method,
                     centile_format=centile_format
                 )
             except Exception as err:
-                corrected_measurement_error = "Not possible to calculate centile"
-                corrected_centile_band = None
-
-        # calculate BMI centiles and percentage median BMI
-        corrected_percentage_median_bmi = None
-        chronological_percentage_median_bmi = None
-        if measurement_method == BMI and corrected_age is not None and chronological_age is not None:
-            try: 
-                corrected_percentage_median_bmi = percentage_median_bmi(
-                reference=reference,
-                age=corrected_age,
-                actual_bmi=observation_value,
-                sex=sex
-            )
-            except Exception as err:
-                print(err)
-                corrected_percentage_median_bmi = None
-            
-            try:
-                chronological_percentage_median_bmi = percentage_median_bmi(
-                    reference=reference,
-                    age=corrected_age,
-                    actual_bmi=observation_value,
-                    sex=sex
-                )
-            except Exception as err:
-                print(err)
-                chronological_percentage_median_bmi = None
+                scores["measurement_error"] = "Not possible to calculate centile"
+            else:
+                scores["centile_band"] = DeferredValue(
+                    centile_band_for_code, centile_band, measurement_method, centile_format)
 
-        self.return_measurement_object = self.__create_measurement_object(
-            reference=reference,
-            measurement_method=measurement_method,
-            observation_value=observation_value,
-            observation_value_error=observation_value_error,
-            corrected_sds_value=corrected_measurement_sds,
-            corrected_centile_value=corrected_measurement_centile,
-            corrected_centile_band=corrected_centile_band,
-            chronological_sds_value=chronological_measurement_sds,
-            chronological_centile_value=chronological_measurement_centile,
-            chronological_centile_band=chronological_centile_band,
-            chronological_measurement_error=chronological_measurement_error,
-            corrected_measurement_error=corrected_measurement_error,
-            corrected_percentage_median_bmi=corrected_percentage_median_bmi,
-            chronological_percentage_median_bmi=chronological_percentage_median_bmi
-        )
+        if measurement_method == BMI and percentage_median_bmi:
+            # as percentage_median_bmi: m is the median BMI
+            scores["percentage_median_bmi"] = (observation_value / lms["m"]) * 100.0
 
-        return self.return_measurement_object
+        return scores
+
+    def __no_scores(self, sds: float = None, measurement_error: str = None) -> dict:
+        return {
+            "sds": sds,
+            "centile": None,
+            "centile_band": None,
+            "measurement_error": measurement_error,
+            "percentage_median_bmi": None
+        }
 
-    """
-    These are all private class methods and are only accessed by this class on initialisation
-    """
     def __calculate_ages(
             self,
             sex: str,
             birth_date: date,
             observation_date: date,
             gestation_weeks: int = 0,
-            gestation_days=0):
+            gestation_days=0,
+            word_ages: bool = True):
+        # The calendar ages and comments are left as None unless word_ages is True
 
         if gestation_weeks == 0:
             # if gestation not specified, set to 40 weeks
@@ -419,135 +424,92 @@ class Measurement:
             if (self.corrected_decimal_age >= 2 and gestation_weeks < 37) or (gestation_weeks >= 37 and gestation_weeks <= 42):
                 self.corrected_decimal_age = self.chronological_decimal_age
 
-        if self.corrected_decimal_age is None:
-            self._age_comments = None
-            self.lay_corrected_decimal_age_comment = None
-            self.clinician_corrected_decimal_age_comment = None
-        else:
+        self.age_comments = None
+        if self.corrected_decimal_age is not None:
             corrected_decimal_age_error = None
-            try:
-                self.age_comments = comment_prematurity_correction(
-                    chronological_decimal_age=self.chronological_decimal_age,
-                    corrected_decimal_age=self.corrected_decimal_age,
-                    gestation_weeks=gestation_weeks,
-                    gestation_days=gestation_days,
-                    reference=self.reference)
-            except:
-                self.age_comments = None
-                corrected_decimal_age_error = "Error in comment on prematurity."
-
-            try:
-                self.lay_corrected_decimal_age_comment = self.age_comments['lay_corrected_comment']
-            except:
-                self.lay_corrected_decimal_age_comment = None
-                corrected_decimal_age_error = "Error in comment on corrected decimal age."
-
-            try:
-                self.clinician_corrected_decimal_age_comment = self.age_comments[
-                    'clinician_corrected_comment']
-            except:
-                self.clinician_corrected_decimal_age_comment = None
-                corrected_decimal_age_error = "Error in comment on corrected decimal age."
-
-        if chronological_decimal_age is None:
-            self.chronological_calendar_age = None
-            self.lay_chronological_decimal_age_comment = None
-            self.clinician_chronological_decimal_age_comment = None
-            self.corrected_gestational_age = None
-            self.estimated_date_delivery = None
-            self.estimated_date_delivery_string = None
-        else:
-            chronological_decimal_age_error = None
-            try:
-                self.chronological_calendar_age = chronological_calendar_age(
+            if word_ages:
+                try:
+                    self.age_comments = comment_prematurity_correction(
+                        chronological_decimal_age=self.chronological_decimal_age,
+                        corrected_decimal_age=self.corrected_decimal_age,
+                        gestation_weeks=gestation_weeks,
+                        gestation_days=gestation_days,
+                        reference=self.reference)
+                except:
+                    corrected_decimal_age_error = "Error in comment on corrected decimal age."
+        age_comments = self.age_comments or {}
+
+        chronological_decimal_age_error = None
+        chronological_calendar_age_value = None
+        corrected_calendar_age_value = None
+        try:
+            if word_ages:
+                chronological_calendar_age_value = chronological_calendar_age(
                     birth_date=birth_date,
                     observation_date=observation_date)
-            except:
-                self.chronological_calendar_age = None
-                chronological_decimal_age_error = "Chronological age calculation error."
-
-            try:
-                self.lay_chronological_decimal_age_comment = self.age_comments[
-                    'lay_chronological_comment']
-            except:
-                self.lay_chronological_decimal_age_comment = None
-                chronological_decimal_age_error = "Chronological age calculation error."
-
-            try:
-                self.clinician_chronological_decimal_age_comment = self.age_comments[
-                    'clinician_chronological_comment']
-            except:
-                self.clinician_chronological_decimal_age_comment = None
-                chronological_decimal_age_error = "Chronological age calculation error."
+        except:
+            chronological_decimal_age_error = "Chronological age calculation error."
 
-            try:
-                self.corrected_gestational_age = corrected_gestational_age(
-                    birth_date=birth_date,
-                    observation_date=observation_date,
-                    gestation_weeks=gestation_weeks,
-                    gestation_days=gestation_days)
-            except:
-                self.corrected_gestational_age = None
-                chronological_decimal_age_error = "Corrected gestational age calculation error."
+        if self.corrected_decimal_age is None or (word_ages and self.age_comments is None):
+            # there are no comments on the ages
+            chronological_decimal_age_error = "Chronological age calculation error."
 
-            try:
-                self.estimated_date_delivery = estimated_date_delivery(
-                    birth_date, gestation_weeks, gestation_days)
-            except:
-                self.estimated_date_delivery = None
-                self.estimated_date_delivery_string = None
-                chronological_decimal_age_error = "Estimated date of delivery calculation error."
-
-            try:
-                self.corrected_calendar_age = chronological_calendar_age(
-                    self.estimated_date_delivery, observation_date)
-            except Exception as err:
-                # The EDD is still in the future as this preterm baby is not yet term. The error returned is not useful as the function is expecting a birth date in the past but is being passed an EDD in the future.
-                # It is not really an error, but a limitation of the function. The calendar age really is the same as the corrected gestational age here.
-                self.corrected_calendar_age = None
-                chronological_decimal_age_error = None
+        try:
+            self.corrected_gestational_age = corrected_gestational_age(
+                birth_date=birth_date,
+                observation_date=observation_date,
+                gestation_weeks=gestation_weeks,
+                gestation_days=gestation_days)
+        except:
+            self.corrected_gestational_age = None
+            chronological_decimal_age_error = "Corrected gestational age calculation error."
 
-            try:
-                self.estimated_date_delivery_string = self.estimated_date_delivery.strftime(
-                    '%a %d %B, %Y')
-            except:
-                self.estimated_date_delivery_string = None
-                chronological_decimal_age_error = "Estimated date of delivery calculation error."
-
-        birth_data = {
-            "birth_date": birth_date,
-            "gestation_weeks": gestation_weeks,
-            "gestation_days": gestation_days,
-            "estimated_date_delivery": self.estimated_date_delivery,
-            "estimated_date_delivery_string": self.estimated_date_delivery_string,
-            "sex": sex
-        }
+        try:
+            self.estimated_date_delivery = estimated_date_delivery(
+                birth_date, gestation_weeks, gestation_days)
+        except:
+            self.estimated_date_delivery = None
+            self.estimated_date_delivery_string = None
+            chronological_decimal_age_error = "Estimated date of delivery calculation error."
 
-        measurement_dates = {
-            "observation_date": observation_date,
-            "chronological_decimal_age": self.chronological_decimal_age,
-            "corrected_decimal_age": self.corrected_decimal_age,
-            "chronological_calendar_age": self.chronological_calendar_age,
-            "corrected_calendar_age": self.corrected_calendar_age,
-            "corrected_gestational_age": {
-                "corrected_gestation_weeks": self.corrected_gestational_age["corrected_gestation_weeks"],
-                "corrected_gestation_days": self.corrected_gestational_age["corrected_gestation_days"],
-            },
-            "comments": {
-                "clinician_corrected_decimal_age_comment": self.clinician_corrected_decimal_age_comment,
-                "lay_corrected_decimal_age_comment": self.lay_corrected_decimal_age_comment,
-                "clinician_chronological_decimal_age_comment": self.clinician_chronological_decimal_age_comment,
-                "lay_chronological_decimal_age_comment": self.lay_chronological_decimal_age_comment
-            },
-            "corrected_decimal_age_error": corrected_decimal_age_error,
-            "chronological_decimal_age_error": chronological_decimal_age_error
-        }
+        try:
+            if word_ages:
+                corrected_calendar_age_value = chronological_calendar_age(
+                    birth_date=self.estimated_date_delivery,
+                    observation_date=observation_date)
+        except Exception as err:
+            # The EDD is still in the future as this preterm baby is not yet term. The error returned is not useful as the function is expecting a birth date in the past but is being passed an EDD in the future.
+            # It is not really an error, but a limitation of the function. The calendar age really is the same as the corrected gestational age here.
+            corrected_calendar_age_value = None
+            chronological_decimal_age_error = None
 
-        child_age_calculations = {
-            "birth_data": birth_data,
-            "measurement_dates": measurement_dates
-        }
-        return child_age_calculations
+        try:
+            self.estimated_date_delivery_string = self.estimated_date_delivery.strftime(
+                '%a %d %B, %Y')
+        except:
+            self.estimated_date_delivery_string = None
+            chronological_decimal_age_error = "Estimated date of delivery calculation error."
+
+        # the birth_data and measurement_dates of the result
+        self.result.birth_date = birth_date
+        self.result.gestation_weeks = gestation_weeks
+        self.result.gestation_days = gestation_days
+        self.result.estimated_date_delivery = self.estimated_date_delivery
+        self.result.estimated_date_delivery_string = self.estimated_date_delivery_string
+        self.result.sex = sex
+        self.result.observation_date = observation_date
+        self.result.chronological_decimal_age = self.chronological_decimal_age
+        self.result.corrected_decimal_age = self.corrected_decimal_age
+        self.result.chronological_calendar_age = chronological_calendar_age_value
+        self.result.corrected_calendar_age = corrected_calendar_age_value
+        self.result.corrected_gestation_weeks = self.corrected_gestational_age["corrected_gestation_weeks"]
+        self.result.corrected_gestation_days = self.corrected_gestational_age["corrected_gestation_days"]
+        self.result.clinician_corrected_decimal_age_comment = age_comments.get('clinician_corrected_comment')
+        self.result.lay_corrected_decimal_age_comment = age_comments.get('lay_corrected_comment')
+        self.result.clinician_chronological_decimal_age_comment = age_comments.get('clinician_chronological_comment')
+        self.result.lay_chronological_decimal_age_comment = age_comments.get('lay_chronological_comment')
+        self.result.corrected_decimal_age_error = corrected_decimal_age_error
+        self.result.chronological_decimal_age_error = chronological_decimal_age_error
 
     def __create_measurement_object(
         self,
@@ -568,39 +530,30 @@ class Measurement:
     ):
         """
         private class method
-        This is the end step, having calculated dates, SDS/Centiles and selected appropriate clinical advice,
-        to then create a bespoke json Measurement object with values relevant only to the measurement_method requested
+        This is the end step of sds_and_centile_for_measurement_method, having calculated SDS/Centiles,
+        to then create the child_observation_value and measurement_calculated_values of a Measurement object
         @params: measurement_method: string accepting only 'height', 'weight', 'bmi', 'ofc' lowercase only
         """
 
-        # Measurement object is made up of 4 JSON elements: "birth_data", "measurement_dates",
-        #  "child_observation_value" and "measurement_calculated_values"
-        # All Measurement objects return the "birth_data" and "measurement_dates" elements
-        # Only those calculations relevant to the measurement_method requested populate the final JSON
-        # object.
-
-        measurement_calculated_values = {
-            "corrected_sds": corrected_sds_value,
-            "corrected_centile": corrected_centile_value,
-            "corrected_centile_band": corrected_centile_band,
-            "chronological_sds": chronological_sds_value,
-            "chronological_centile": chronological_centile_value,
-            "chronological_centile_band": chronological_centile_band,
-            "corrected_measurement_error": corrected_measurement_error,
-            "chronological_measurement_error": chronological_measurement_error,
-            "corrected_percentage_median_bmi": corrected_percentage_median_bmi,
-            "chronological_percentage_median_bmi":chronological_percentage_median_bmi
-        }
-
-        child_observation_value = {
-            "measurement_method": measurement_method,
-            "observation_value": observation_value,
-            "observation_value_error": observation_value_error
-        }
+        result = MeasurementResult(
+            measurement_method=measurement_method,
+            observation_value=observation_value,
+            observation_value_error=observation_value_error,
+            corrected_sds=corrected_sds_value,
+            corrected_centile=corrected_centile_value,
+            corrected_centile_band=corrected_centile_band,
+            chronological_sds=chronological_sds_value,
+            chronological_centile=chronological_centile_value,
+            chronological_centile_band=chronological_centile_band,
+            corrected_measurement_error=corrected_measurement_error,
+            chronological_measurement_error=chronological_measurement_error,
+            corrected_percentage_median_bmi=corrected_percentage_median_bmi,
+            chronological_percentage_median_bmi=chronological_percentage_median_bmi
+        )
 
         return {
-            "child_observation_value": child_observation_value,
-            "measurement_calculated_values": measurement_calculated_values,
+            "child_observation_value": result.child_observation_value(),
+            "measurement_calculated_values": result.measurement_calculated_values(),
         }
 
     def __validate_measurement_method(
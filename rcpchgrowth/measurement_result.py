@@ -0,0 +1,383 @@
+"""
+The results of a Measurement, each stored once as a plain value.
+
+Measurement.measurement has always been a nested dictionary of about 100 keys, in which the ages, SDS and centiles
+appear several times (in measurement_calculated_values and in the centile and SDS plottable data, for each of the
+chronological and corrected ages). Measurement now keeps its results in a MeasurementResult, a slotted object with
+one attribute per value, and builds that dictionary with to_dict() only when Measurement.measurement is first read.
+Callers scoring many measurements that need only the SDS and centiles can read them from Measurement.result:
+
+    result = Measurement(...).result
+    result.corrected_sds, result.corrected_centile
+
+The centile bands are not needed to score a measurement. Measurement finds the band of each SDS when it is made (so
+any error is reported with the other errors), and stores its wording as a DeferredValue, which is only calculated
+when the value is first read. Wording a band cannot fail.
+
+A Measurement can also be asked for a profile or a list of fields (see measurement_constants.py), when it calculates
+only those values and to_dict() returns only those sections.
+"""
+
+# rcpch imports
+from .constants import (
+    FULL_PROFILE,
+    MEASUREMENT_CALCULATED_VALUES,
+    MEASUREMENT_FIELDS,
+    MEASUREMENT_PROFILES,
+    MEASUREMENT_SECTIONS,
+    PROFILE_FIELDS,
+)
+
+
+def measurement_fields(profile: str = FULL_PROFILE, fields: list = None) -> frozenset:
+    """
+    Returns the fields asked for: the fields given if there are any, otherwise those of the profile.
+    Raises ValueError for an unknown profile or field.
+    """
+    if fields is None:
+        if profile not in MEASUREMENT_PROFILES:
+            raise ValueError(f"{profile} is not a recognised profile. Choose from {', '.join(MEASUREMENT_PROFILES)}.")
+        fields = PROFILE_FIELDS[profile]
+    elif isinstance(fields, str):
+        fields = [fields]
+    for field in fields:
+        if field not in MEASUREMENT_FIELDS:
+            raise ValueError(f"{field} is not a recognised Measurement field.")
+    return frozenset(fields)
+
+
+class DeferredValue:
+    """
+    A value calculated by calling function(*args) when it is first needed, then kept. The function must not raise:
+    anything that can fail is calculated before the DeferredValue is made.
+    """
+
+    __slots__ = ("function", "args", "value")
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+        self.value = None
+
+    def __call__(self):
+        if self.function is not None:
+            self.value = self.function(*self.args)
+            self.function = self.args = None
+        return self.value
+
+
+def _deferred_field(name: str) -> property:
+    # a field that may be stored as a DeferredValue, which is calculated (and replaced by its value) when read
+    private_name = f"_{name}"
+
+    def get(self):
+        value = getattr(self, private_name)
+        if isinstance(value, DeferredValue):
+            value = value()
+            setattr(self, private_name, value)
+        return value
+
+    def set(self, value):
+        setattr(self, private_name, value)
+
+    return property(get, set)
+
+
+class MeasurementResult:
+    """
+    The values calculated by a Measurement. Any value not supplied is None. The centile bands may be given as
+    DeferredValues.
+    """
+
+    __slots__ = (
+        # birth_data
+        "birth_date",
+        "gestation_weeks",
+        "gestation_days",
+        "estimated_date_delivery",
+        "estimated_date_delivery_string",
+        "sex",
+        # measurement_dates
+        "observation_date",
+        "chronological_decimal_age",
+        "corrected_decimal_age",
+        "chronological_calendar_age",
+        "corrected_calendar_age",
+        "corrected_gestation_weeks",
+        "corrected_gestation_days",
+        "clinician_corrected_decimal_age_comment",
+        "lay_corrected_decimal_age_comment",
+        "clinician_chronological_decimal_age_comment",
+        "lay_chronological_decimal_age_comment",
+        "corrected_decimal_age_error",
+        "chronological_decimal_age_error",
+        # child_observation_value
+        "measurement_method",
+        "observation_value",
+        "observation_value_error",
+        # measurement_calculated_values
+        "corrected_sds",
+        "corrected_centile",
+        "_corrected_centile_band",
+        "chronological_sds",
+        "chronological_centile",
+        "_chronological_centile_band",
+        "corrected_measurement_error",
+        "chronological_measurement_error",
+        "corrected_percentage_median_bmi",
+        "chronological_percentage_median_bmi",
+        # bone_age
+        "bone_age",
+        "bone_age_type",
+        "bone_age_sds",
+        "bone_age_centile",
+        "bone_age_text",
+        # events_data
+        "events_text",
+    )
+
+    corrected_centile_band = _deferred_field("corrected_centile_band")
+    chronological_centile_band = _deferred_field("chronological_centile_band")
+
+    def __init__(
+        self,
+        *,
+        birth_date=None,
+        gestation_weeks=None,
+        gestation_days=None,
+        estimated_date_delivery=None,
+        estimated_date_delivery_string=None,
+        sex=None,
+        observation_date=None,
+        chronological_decimal_age=None,
+        corrected_decimal_age=None,
+        chronological_calendar_age=None,
+        corrected_calendar_age=None,
+        corrected_gestation_weeks=None,
+        corrected_gestation_days=None,
+        clinician_corrected_decimal_age_comment=None,
+        lay_corrected_decimal_age_comment=None,
+        clinician_chronological_decimal_age_comment=None,
+        lay_chronological_decimal_age_comment=None,
+        corrected_decimal_age_error=None,
+        chronological_decimal_age_error=None,
+        measurement_method=None,
+        observation_value=None,
+        observation_value_error=None,
+        corrected_sds=None,
+        corrected_centile=None,
+        corrected_centile_band=None,
+        chronological_sds=None,
+        chronological_centile=None,
+        chronological_centile_band=None,
+        corrected_measurement_error=None,
+        chronological_measurement_error=None,
+        corrected_percentage_median_bmi=None,
+        chronological_percentage_median_bmi=None,
+        bone_age=None,
+        bone_age_type=None,
+        bone_age_sds=None,
+        bone_age_centile=None,
+        bone_age_text=None,
+        events_text=None,
+    ):
+        self.birth_date = birth_date
+        self.gestation_weeks = gestation_weeks
+        self.gestation_days = gestation_days
+        self.estimated_date_delivery = estimated_date_delivery
+        self.estimated_date_delivery_string = estimated_date_delivery_string
+        self.sex = sex
+        self.observation_date = observation_date
+        self.chronological_decimal_age = chronological_decimal_age
+        self.corrected_decimal_age = corrected_decimal_age
+        self.chronological_calendar_age = chronological_calendar_age
+        self.corrected_calendar_age = corrected_calendar_age
+        self.corrected_gestation_weeks = corrected_gestation_weeks
+        self.corrected_gestation_days = corrected_gestation_days
+        self.clinician_corrected_decimal_age_comment = clinician_corrected_decimal_age_comment
+        self.lay_corrected_decimal_age_comment = lay_corrected_decimal_age_comment
+        self.clinician_chronological_decimal_age_comment = clinician_chronological_decimal_age_comment
+        self.lay_chronological_decimal_age_comment = lay_chronological_decimal_age_comment
+        self.corrected_decimal_age_error = corrected_decimal_age_error
+        self.chronological_decimal_age_error = chronological_decimal_age_error
+        self.measurement_method = measurement_method
+        self.observation_value = observation_value
+        self.observation_value_error = observation_value_error
+        self.corrected_sds = corrected_sds
+        self.corrected_centile = corrected_centile
+        self.corrected_centile_band = corrected_centile_band
+        self.chronological_sds = chronological_sds
+        self.chronological_centile = chronological_centile
+        self.chronological_centile_band = chronological_centile_band
+        self.corrected_measurement_error = corrected_measurement_error
+        self.chronological_measurement_error = chronological_measurement_error
+        self.corrected_percentage_median_bmi = corrected_percentage_median_bmi
+        self.chronological_percentage_median_bmi = chronological_percentage_median_bmi
+        self.bone_age = bone_age
+        self.bone_age_type = bone_age_type
+        self.bone_age_sds = bone_age_sds
+        self.bone_age_centile = bone_age_centile
+        self.bone_age_text = bone_age_text
+        self.events_text = events_text
+
+    def __repr__(self) -> str:
+        return (
+            f"MeasurementResult(measurement_method={self.measurement_method!r}, "
+            f"observation_value={self.observation_value!r}, corrected_sds={self.corrected_sds!r}, "
+            f"chronological_sds={self.chronological_sds!r})"
+        )
+
+    def birth_data(self) -> dict:
+        return {
+            "birth_date": self.birth_date,
+            "gestation_weeks": self.gestation_weeks,
+            "gestation_days": self.gestation_days,
+            "estimated_date_delivery": self.estimated_date_delivery,
+            "estimated_date_delivery_string": self.estimated_date_delivery_string,
+            "sex": self.sex,
+        }
+
+    def measurement_dates(self) -> dict:
+        return {
+            "observation_date": self.observation_date,
+            "chronological_decimal_age": self.chronological_decimal_age,
+            "corrected_decimal_age": self.corrected_decimal_age,
+            "chronological_calendar_age": self.chronological_calendar_age,
+            "corrected_calendar_age": self.corrected_calendar_age,
+            "corrected_gestational_age": {
+                "corrected_gestation_weeks": self.corrected_gestation_weeks,
+                "corrected_gestation_days": self.corrected_gestation_days,
+            },
+            "comments": {
+                "clinician_corrected_decimal_age_comment": self.clinician_corrected_decimal_age_comment,
+                "lay_corrected_decimal_age_comment": self.lay_corrected_decimal_age_comment,
+                "clinician_chronological_decimal_age_comment": self.clinician_chronological_decimal_age_comment,
+                "lay_chronological_decimal_age_comment": self.lay_chronological_decimal_age_comment,
+            },
+            "corrected_decimal_age_error": self.corrected_decimal_age_error,
+            "chronological_decimal_age_error": self.chronological_decimal_age_error,
+        }
+
+    def child_observation_value(self) -> dict:
+        return {
+            "measurement_method": self.measurement_method,
+            "observation_value": self.observation_value,
+            "observation_value_error": self.observation_value_error,
+        }
+
+    def measurement_calculated_values(self) -> dict:
+        return {
+            "corrected_sds": self.corrected_sds,
+            "corrected_centile": self.corrected_centile,
+            "corrected_centile_band": self.corrected_centile_band,
+            "chronological_sds": self.chronological_sds,
+            "chronological_centile": self.chronological_centile,
+            "chronological_centile_band": self.chronological_centile_band,
+            "corrected_measurement_error": self.corrected_measurement_error,
+            "chronological_measurement_error": self.chronological_measurement_error,
+            "corrected_percentage_median_bmi": self.corrected_percentage_median_bmi,
+            "chronological_percentage_median_bmi": self.chronological_percentage_median_bmi,
+        }
+
+    def plottable_centile_data(self) -> dict:
+        """
+        Returns the observation value at the chronological and corrected ages, with their centiles and SDS
+        """
+        return {
+            "chronological_decimal_age_data": self.__plottable_data("chronological", sds_data=False),
+            "corrected_decimal_age_data": self.__plottable_data("corrected", sds_data=False),
+        }
+
+    def plottable_sds_data(self) -> dict:
+        """
+        Returns the SDS at the chronological and corrected ages, with their centiles
+        """
+        return {
+            "chronological_decimal_age_data": self.__plottable_data("chronological", sds_data=True),
+            "corrected_decimal_age_data": self.__plottable_data("corrected", sds_data=True),
+        }
+
+    def plottable_data(self) -> dict:
+        return {
+            "centile_data": self.plottable_centile_data(),
+            "sds_data": self.plottable_sds_data(),
+        }
+
+    def bone_age_data(self) -> dict:
+        return {
+            "bone_age": self.bone_age,
+            "bone_age_type": self.bone_age_type,
+            "bone_age_sds": self.bone_age_sds,
+            "bone_age_centile": self.bone_age_centile,
+            "bone_age_text": self.bone_age_text,
+        }
+
+    def events_data(self) -> dict:
+        return {"events_text": self.events_text}
+
+    def to_dict(self, fields: frozenset = None) -> dict:
+        """
+        Returns the results in the nested dictionary of Measurement.measurement. Each call builds a new dictionary.
+        Given fields (see measurement_fields), it has only those sections, and measurement_calculated_values has only
+        the values asked for.
+        """
+        sections = {
+            "birth_data": self.birth_data,
+            "measurement_dates": self.measurement_dates,
+            "child_observation_value": self.child_observation_value,
+            "measurement_calculated_values": self.measurement_calculated_values,
+            "plottable_data": self.plottable_data,
+            "bone_age": self.bone_age_data,
+            "events_data": self.events_data,
+        }
+        if fields is None:
+            return {section: values() for section, values in sections.items()}
+
+        measurement = {}
+        for section in MEASUREMENT_SECTIONS:
+            if section in fields:
+                measurement[section] = sections[section]()
+            elif section == "measurement_calculated_values" and not fields.isdisjoint(MEASUREMENT_CALCULATED_VALUES):
+                measurement[section] = {name: getattr(self, name) for name in MEASUREMENT_CALCULATED_VALUES if name in fields}
+        return measurement
+
+    def __plottable_data(self, age_type: str, sds_data: bool) -> dict:
+        # the keys (and their order) of the centile and SDS plottable data for the "chronological" or "corrected" age
+        sds = getattr(self, f"{age_type}_sds")
+        plottable_data = {
+            "x": getattr(self, f"{age_type}_decimal_age"),
+            "y": sds if sds_data else self.observation_value,
+            "b": self.bone_age,
+            "centile": getattr(self, f"{age_type}_centile"),
+        }
+        if not sds_data:
+            plottable_data["sds"] = sds
+        plottable_data.update(
+            {
+                "events_text": self.events_text,
+                "bone_age_label": self.bone_age_text,
+                "bone_age_type": self.bone_age_type,
+                "bone_age_sds": self.bone_age_sds,
+                "bone_age_centile": self.bone_age_centile,
+            }
+        )
+        if not sds_data:
+            plottable_data["observation_error"] = self.observation_value_error
+        plottable_data["age_type"] = f"{age_type}_age"
+        if age_type == "corrected":
+            corrected_gestational_age = ""
+            if self.corrected_gestation_weeks is not None:
+                corrected_gestational_age = f"{self.corrected_gestation_weeks} + {self.corrected_gestation_days} weeks"
+            plottable_data["corrected_gestational_age"] = corrected_gestational_age
+        plottable_data.update(
+            {
+                "calendar_age": getattr(self, f"{age_type}_calendar_age"),
+                "lay_comment": getattr(self, f"lay_{age_type}_decimal_age_comment"),
+                "clinician_comment": getattr(self, f"clinician_{age_type}_decimal_age_comment"),
+                # both ages have always reported the corrected age error
+                "age_error": self.corrected_decimal_age_error,
+                "centile_band": getattr(self, f"{age_type}_centile_band"),
+                "observation_value_error": getattr(self, f"{age_type}_measurement_error"),
+            }
+        )
+        return plottable_data
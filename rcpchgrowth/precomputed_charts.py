@@ -0,0 +1,280 @@
+"""
+Every standard chart, precomputed as gzipped JSON and shipped in data_tables.
+
+A chart with a named centile format depends only on the reference, measurement_method, sex and centile_format (the
+chart functions ignore is_sds for named formats), so there are 240 standard charts. Each is generated once, encoded
+as compact JSON (encode_chart) and gzipped, and all are stored in data_tables/standard_charts.bin. chart_bytes
+returns the stored bytes, ready to send as an HTTP response body with Content-Encoding: gzip, so serving a standard
+chart needs no calculation or JSON encoding:
+
+    from rcpchgrowth.precomputed_charts import chart_bytes
+    body = chart_bytes(reference="uk-who", measurement_method="height", sex="female")
+    json_body = chart_bytes(reference="uk-who", measurement_method="height", sex="female", encoding="identity")
+
+chart_bytes returns None for a chart that is not precomputed (a custom centile list, an unknown format), and for
+every chart if the file is missing, so callers must always be ready to fall back to create_chart:
+
+    body = chart_bytes(reference="uk-who", measurement_method="height", sex="female")
+    if body is None:
+        body = gzip.compress(encode_chart(create_chart(reference="uk-who", measurement_method="height", sex="female")))
+
+The file is not kept in the repository. It is only made when the package is built (see setup.py), by the package
+being built, so it always matches the reference data and chart functions it ships with. A source checkout or an
+editable install (pip install -e .) has no file until it is built there with the command below, so chart_bytes
+returns None for every chart in them. The file records the SHA-256 of the reference data and the code of the package
+it was built from (see source_hash), which is computed when the file is built and by --check, not when the file is
+loaded. Continuous integration builds the wheel and runs --check on it. To build the file in a source tree, and to
+check it against the charts create_chart makes:
+
+    python -m rcpchgrowth.precomputed_charts
+    python -m rcpchgrowth.precomputed_charts --check
+
+The file layout (little endian) is:
+    8 bytes     b"RCPCHCHT"
+    4 bytes     format version (unsigned int)
+    32 bytes    SHA-256 of the reference data and code it was built from (see source_hash)
+    4 bytes     length of the header (unsigned int)
+    header      JSON index: header[reference][measurement_method][sex][centile_format] = [offset, length]
+    charts      each chart as a gzip member, `offset` bytes after the header
+"""
+
+# standard imports
+import argparse
+import gzip
+import hashlib
+from importlib import resources
+import io
+import json
+import mmap
+import pathlib
+import struct
+import sys
+import threading
+
+# rcpch imports
+from .constants.reference_constants import (
+    CENTILE_FORMATS,
+    CHART_ENCODINGS,
+    COLE_TWO_THIRDS_SDS_NINE_CENTILES,
+    FEMALE,
+    GZIP_CHART_ENCODING,
+    HEIGHT,
+    IDENTITY_CHART_ENCODING,
+    MEASUREMENT_METHODS,
+    SEXES,
+)
+
+MAGIC = b"RCPCHCHT"
+FORMAT_VERSION = 2
+PRECOMPUTED_CHARTS_FILE = "standard_charts.bin"
+
+_PREAMBLE = struct.Struct("<8sI32sI")
+
+
+def encode_chart(chart) -> bytes:
+    """
+    Returns the chart (as returned by create_chart) encoded as compact UTF-8 JSON
+    """
+    return json.dumps(chart, separators=(",", ":")).encode("utf-8")
+
+
+def source_hash(package: str = "rcpchgrowth") -> bytes:
+    """
+    Returns the SHA-256 of the names and contents of the reference data (the JSON files in data_tables) and of the
+    modules of the package (including the constants), which between them determine every chart
+    """
+    digest = hashlib.sha256()
+    sources = [
+        (f"data_tables/{source.name}", source)
+        for source in resources.files(f"{package}.data_tables").iterdir() if source.name.endswith(".json")
+    ]
+    for directory in ["", "constants/"]:
+        sources += [
+            (directory + source.name, source)
+            for source in resources.files(package).joinpath(directory).iterdir() if source.name.endswith(".py")
+        ]
+    for name, source in sorted(sources, key=lambda named_source: named_source[0]):
+        digest.update(name.encode("utf-8"))
+        digest.update(hashlib.sha256(source.read_bytes()).digest())
+    return digest.digest()
+
+
+def standard_charts():
+    """
+    Yields the reference, measurement_method, sex and centile_format of every standard chart
+    """
+    from .reference_registry import REFERENCE_REGISTRY
+
+    for reference in REFERENCE_REGISTRY:
+        for measurement_method in MEASUREMENT_METHODS:
+            for sex in SEXES:
+                for centile_format in CENTILE_FORMATS:
+                    yield reference, measurement_method, sex, centile_format
+
+
+def compile_charts() -> bytes:
+    """
+    Returns the contents of the precomputed charts file: every standard chart, made by create_chart
+    """
+    from .chart_functions import create_chart
+
+    index = {}
+    charts = []
+    offset = 0
+    for reference, measurement_method, sex, centile_format in standard_charts():
+        chart = create_chart(reference, centile_format=centile_format, measurement_method=measurement_method, sex=sex)
+        # mtime=0 so that the same chart always compresses to the same bytes
+        compressed = gzip.compress(encode_chart(chart), compresslevel=9, mtime=0)
+        index.setdefault(reference, {}).setdefault(measurement_method, {}).setdefault(sex, {})[centile_format] = [
+            offset,
+            len(compressed),
+        ]
+        charts.append(compressed)
+        offset += len(compressed)
+
+    header = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    return b"".join(
+        [_PREAMBLE.pack(MAGIC, FORMAT_VERSION, source_hash(), len(header)), header] + charts
+    )
+
+
+def write_precomputed_charts(file_path=None) -> str:
+    """
+    Writes the precomputed charts file, to data_tables unless a file_path is given, and returns its path
+    """
+    if file_path is None:
+        file_path = resources.files("rcpchgrowth.data_tables").joinpath(PRECOMPUTED_CHARTS_FILE)
+    with open(file_path, "wb") as compiled_file:
+        compiled_file.write(compile_charts())
+    return str(file_path)
+
+
+class PrecomputedCharts:
+    """
+    Reads the precomputed charts file on first use. The file is memory-mapped where possible.
+    file_path reads a file other than the one in the package (file_name in package).
+    """
+
+    def __init__(
+        self, package: str = "rcpchgrowth.data_tables", file_name: str = PRECOMPUTED_CHARTS_FILE, file_path=None
+    ):
+        self._package = package
+        self._file_name = file_name
+        self._file_path = file_path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._source_hash = None
+        self._index = None
+        self._charts = None
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            if self._file_path is None:
+                compiled = resources.files(self._package).joinpath(self._file_name)
+            else:
+                compiled = pathlib.Path(self._file_path)
+            try:
+                with compiled.open("rb") as compiled_file:
+                    try:
+                        buffer = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+                        # not a plain file (eg the package is installed as a zip), or empty
+                        buffer = compiled_file.read()
+            except (FileNotFoundError, NotADirectoryError):
+                buffer = b""
+
+            if len(buffer) >= _PREAMBLE.size:
+                magic, format_version, built_from, header_length = _PREAMBLE.unpack_from(buffer)
+                if magic == MAGIC and format_version == FORMAT_VERSION:
+                    self._source_hash = built_from
+                    header_end = _PREAMBLE.size + header_length
+                    self._index = json.loads(bytes(buffer[_PREAMBLE.size:header_end]))
+                    self._charts = memoryview(buffer)[header_end:]
+            self._loaded = True
+
+    def available(self) -> bool:
+        """
+        Returns whether the file exists and is in the current format
+        """
+        if not self._loaded:
+            self._load()
+        return self._index is not None
+
+    def source_hash(self) -> bytes:
+        """
+        Returns the source_hash recorded when the file was built, or None if it is not available
+        """
+        if not self._loaded:
+            self._load()
+        return self._source_hash
+
+    def get(self, reference: str, measurement_method: str, sex: str, centile_format) -> bytes:
+        """
+        Returns the gzipped JSON of the chart, or None if it is not precomputed
+        """
+        if not self._loaded:
+            self._load()
+        if self._index is None or type(centile_format) is not str:
+            return None
+        try:
+            offset, length = self._index[reference][measurement_method][sex][centile_format]
+        except (KeyError, TypeError):
+            return None
+        return bytes(self._charts[offset:offset + length])
+
+
+# the charts returned by chart_bytes
+PRECOMPUTED_CHARTS = PrecomputedCharts()
+
+
+def chart_bytes(
+    reference: str,
+    centile_format=COLE_TWO_THIRDS_SDS_NINE_CENTILES,
+    measurement_method: str = HEIGHT,
+    sex: str = FEMALE,
+    is_sds=False,
+    encoding: str = GZIP_CHART_ENCODING,
+) -> bytes:
+    """
+    Returns the chart create_chart would return for these arguments as JSON (encode_chart), gzipped by default or
+    uncompressed with encoding="identity". Returns None if the chart is not precomputed, which is every chart where
+    the precomputed charts file has not been built (a source checkout or editable install, see above).
+    is_sds is accepted for symmetry with create_chart: it makes no difference to a chart with a named centile format.
+    """
+    if encoding not in CHART_ENCODINGS:
+        raise ValueError(f"The chart encoding must be one of {', '.join(CHART_ENCODINGS)}.")
+    compressed = PRECOMPUTED_CHARTS.get(reference, measurement_method, sex, centile_format)
+    if compressed is None or encoding != IDENTITY_CHART_ENCODING:
+        return compressed
+    return gzip.decompress(compressed)
+
+
+def check_precomputed_charts(precomputed_charts: PrecomputedCharts = PRECOMPUTED_CHARTS) -> list:
+    """
+    Returns the (reference, measurement_method, sex, centile_format) of every standard chart whose precomputed
+    bytes are missing or differ from the encoded output of create_chart
+    """
+    from .chart_functions import create_chart
+
+    mismatched = []
+    for reference, measurement_method, sex, centile_format in standard_charts():
+        compressed = precomputed_charts.get(reference, measurement_method, sex, centile_format)
+        chart = create_chart(reference, centile_format=centile_format, measurement_method=measurement_method, sex=sex)
+        if compressed is None or gzip.decompress(compressed) != encode_chart(chart):
+            mismatched.append((reference, measurement_method, sex, centile_format))
+    return mismatched
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds, or checks, the precomputed standard charts.")
+    parser.add_argument("--check", action="store_true", help="check the charts against create_chart instead")
+    if parser.parse_args().check:
+        mismatched = check_precomputed_charts()
+        for chart in mismatched:
+            sys.stdout.write("out of date: " + " ".join(chart) + "\n")
+        if PRECOMPUTED_CHARTS.source_hash() != source_hash():
+            sys.stdout.write("built from other reference data or code: rebuild to record the current sources\n")
+        raise SystemExit(1 if mismatched else 0)
+    sys.stdout.write(f"compiled {write_precomputed_charts()}\n")
@@ -0,0 +1,116 @@
+"""
+Loads the reference data tables in rcpchgrowth/data_tables on first use.
+
+Each reference module used to parse its JSON files on import, so importing anything from rcpchgrowth parsed every
+table (about 4.4 MB of JSON), and who_infants.json was parsed three times (by uk_who, who and cdc). The tables are
+now loaded through REFERENCE_DATA when a calculation first needs them. Each file is parsed at most once per process
+and then shared by every module, and threads asking for the same table at the same time wait for a single parse:
+
+    from rcpchgrowth.reference_data import REFERENCE_DATA
+    uk90_child_data = REFERENCE_DATA.load("uk90_child.json")
+    REFERENCE_DATA.loaded()  # the names of the files parsed so far
+
+Where data_tables holds an up to date compiled copy of a file (see compiled_reference_data.py), the compiled copy is
+memory-mapped instead of parsing the JSON.
+
+The data loaded is read only: its dictionaries are wrapped in MappingProxyType and its LMSTables hold read only
+columns, so the single copy shared by every module (and with the LMS cache) cannot be changed by any of them.
+The public select_reference_data_for_* functions return a copy as plain lists and dictionaries, as they did when the
+JSON was parsed for each module, so their results can still be serialised, copied and changed by the caller.
+"""
+
+# standard imports
+from collections.abc import Mapping
+import functools
+from importlib import resources
+import json
+import threading
+from types import MappingProxyType
+
+# rcpch imports
+from .compiled_reference_data import compiled_file_name, load_compiled_reference_data
+from .lms_tables import LMSTable, columnar_reference_data
+
+
+class ReferenceDataLoader:
+    """
+    Parses reference data files on first use and keeps them, read only, for the life of the process.
+    """
+
+    def __init__(self, package: str = "rcpchgrowth.data_tables", use_compiled: bool = True):
+        self._package = package
+        self._use_compiled = use_compiled
+        self._lock = threading.Lock()
+        self._tables = {}
+
+    def load(self, file_name: str) -> dict:
+        """
+        Returns the reference data in file_name, with its LMS values in columnar tables (see lms_tables.py).
+        The dictionaries are read only mappings.
+        """
+        reference_data = self._tables.get(file_name)
+        if reference_data is None:
+            with self._lock:
+                # another thread may have loaded the file while this one waited
+                reference_data = self._tables.get(file_name)
+                if reference_data is None:
+                    data_tables = resources.files(self._package)
+                    if self._use_compiled:
+                        # falls back to the JSON if the compiled file is missing, of another format version or out of date
+                        reference_data = load_compiled_reference_data(
+                            data_tables.joinpath(compiled_file_name(file_name)), data_tables.joinpath(file_name)
+                        )
+                    if reference_data is None:
+                        reference_data = columnar_reference_data(
+                            json.loads(data_tables.joinpath(file_name).read_bytes())
+                        )
+                    reference_data = read_only(reference_data)
+                    self._tables[file_name] = reference_data
+        return reference_data
+
+    def loaded(self) -> list:
+        """
+        Returns the names of the files loaded so far
+        """
+        with self._lock:
+            return list(self._tables)
+
+
+def read_only(reference_data):
+    """
+    Returns the reference data with each dictionary (at any depth) replaced by a read only MappingProxyType, and each
+    list by a tuple
+    """
+    if isinstance(reference_data, dict):
+        return MappingProxyType({key: read_only(value) for key, value in reference_data.items()})
+    if isinstance(reference_data, list):
+        return tuple(read_only(value) for value in reference_data)
+    return reference_data
+
+
+def plain_reference_data(reference_data):
+    """
+    Returns a copy of read only reference data as plain dictionaries and lists (an LMSTable becomes the list of its
+    LMS dictionaries)
+    """
+    if isinstance(reference_data, Mapping):
+        return {key: plain_reference_data(value) for key, value in reference_data.items()}
+    if isinstance(reference_data, (list, tuple, LMSTable)):
+        return [plain_reference_data(value) for value in reference_data]
+    return reference_data
+
+
+def returns_plain_reference_data(function):
+    """
+    Decorates a public function that returns reference data to return it as plain_reference_data
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return plain_reference_data(function(*args, **kwargs))
+
+    return wrapper
+
+
+# the loader used by the reference modules
+REFERENCE_DATA = ReferenceDataLoader()
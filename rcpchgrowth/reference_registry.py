@@ -0,0 +1,659 @@
+"""
+The growth references rcpchgrowth supports, and everything the calculation and chart functions need to know about
+each of them.
+
+A reference (eg UK-WHO) is made up of one or more segments - the data sets named in the reference constants
+(eg UK90 preterm, UK-WHO infant, UK-WHO child and UK90 child). Each ReferenceSegment holds, as data:
+    - the reference data file its LMS values come from
+    - the oldest age it covers (an AgeLimit), after which the next segment takes over
+    - the ages, measurement_methods and sexes for which it has no data (its AbsenceRules)
+    - the ages at which to plot its centile lines, and the ages at which those lines must take the LMS values of the
+        younger of two overlapping segments (the disjunction ages)
+A Reference selects LMS values, and tests whether reference data exist, from its segments. The batch functions
+read the same segments, so the scalar and batch paths cannot disagree. The function that draws the chart of a
+reference is registered by chart_functions with register_chart.
+
+The calculation and chart functions look references up here with reference_for, so adding a reference is a matter of
+adding its data files and an entry below.
+"""
+
+# rcpch imports
+from .reference_data import REFERENCE_DATA
+from .uk_who import UK90_PRETERM_FILE, WHO_INFANTS_FILE, WHO_CHILD_FILE, UK90_CHILD_FILE
+from .who import WHO_2007_FILE
+from .cdc import CDC_INFANT_FILE, CDC_CHILD_FILE
+from .turner import TURNER_FILE
+from .trisomy_21 import TRISOMY_21_FILE
+from .trisomy_21_aap import TRISOMY_21_AAP_INFANT_FILE, TRISOMY_21_AAP_CHILD_FILE
+from .constants.age_constants import (
+    TWENTY_THREE_WEEKS_GESTATION,
+    TWENTY_FIVE_WEEKS_GESTATION,
+    FORTY_TWO_WEEKS_GESTATION,
+    ZERO_YEARS,
+    TWO_YEARS,
+    THREE_YEARS,
+    FIVE_YEARS,
+    TEN_YEARS,
+    SEVENTEEN_YEARS,
+    EIGHTEEN_YEARS,
+    NINETEEN_YEARS,
+    TWENTY_YEARS,
+)
+from .constants.reference_constants import (
+    UK_WHO,
+    WHO,
+    CDC,
+    TURNERS,
+    TRISOMY_21,
+    TRISOMY_21_AAP,
+    HEIGHT,
+    WEIGHT,
+    BMI,
+    HEAD_CIRCUMFERENCE,
+    MALE,
+    FEMALE,
+    MEASUREMENT_METHODS,
+    SEXES,
+    UK90_PRETERM,
+    UK_WHO_INFANT,
+    UK_WHO_CHILD,
+    UK90_CHILD,
+    WHO_2006_INFANT,
+    WHO_2006_CHILD,
+    WHO_2007_CHILD,
+    FENTON,
+    CDC_INFANT,
+    CDC_CHILD,
+    TRISOMY_21_AAP_INFANT,
+    TRISOMY_21_AAP_CHILD,
+    UK_WHO_INFANT_LOWER_THRESHOLD,
+    WHO_CHILD_LOWER_THRESHOLD,
+    WHO_CHILDREN_UPPER_THRESHOLD,
+    UK90_UPPER_THRESHOLD,
+    WHO_2006_REFERENCE_UPPER_THRESHOLD,
+    WHO_2007_REFERENCE_UPPER_THRESHOLD,
+    CDC_UPPER_THRESHOLD,
+    UK_90_PRETERM_AGES,
+    WHO_2006_UNDER_TWOS_AGES,
+    UK_WHO_2006_OVER_TWOS_AGES,
+    WHO_2006_OVER_TWOS_AGES,
+    WHO_2007_AGES,
+    UK90_AGES,
+    CDC_TO_TWO_AGE,
+    CDC_TO_THREE_AGE,
+    CDC_TWO_TWENTY,
+    TURNER_AGES,
+    TRISOMY_21_AGES,
+    TRISOMY_21_AAP_INFANT_AGES,
+    TRISOMY_21_AAP_CHILD_AGES,
+)
+from .constants.status_constants import (
+    STATUS_AGE_BELOW_REFERENCE,
+    STATUS_AGE_ABOVE_REFERENCE,
+    STATUS_AGE_BELOW_MEASUREMENT_DATA,
+    STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+    STATUS_NO_MEASUREMENT_DATA,
+)
+
+# 42 weeks as decimal age, where the preterm and term data sets meet
+FORTY_TWO_WEEKS = 0.038329911
+
+
+class AgeLimit:
+    """
+    The oldest age a segment covers: ages below age, and age itself if inclusive (every age if age is None). Where the
+    segment meets the next at a disjunction, age itself is covered only if the younger reference is asked for
+    (default_youngest_reference), so that a centile line runs up to the disjunction.
+    """
+
+    __slots__ = ("age", "inclusive", "disjunction")
+
+    def __init__(self, age: float, inclusive: bool = False, disjunction: bool = False):
+        self.age = age
+        self.inclusive = inclusive
+        self.disjunction = disjunction
+
+    def covers(self, age: float, default_youngest_reference: bool = False) -> bool:
+        """
+        Returns True if the age is within the limit
+        """
+        if self.age is None or age < self.age:
+            return True
+        return age == self.age and (self.inclusive or (self.disjunction and default_youngest_reference))
+
+    def __repr__(self):
+        return f"AgeLimit({self.age!r}, inclusive={self.inclusive!r}, disjunction={self.disjunction!r})"
+
+
+# a segment with no upper age limit, and one which covers no ages at all
+ALL_AGES = AgeLimit(None)
+NO_AGES = AgeLimit(float("-inf"))
+
+
+class AbsenceRule:
+    """
+    Ages, measurement_methods and sexes for which a reference has no data: ages below `below` or above `above` (every
+    age if neither is given), for the measurement_methods and sexes listed (all of them if None).
+    status is the reason code returned by the batch functions (see status_constants.py), reason the message the scalar
+    functions raise.
+    """
+
+    __slots__ = ("status", "reason", "below", "above", "measurement_methods", "sexes")
+
+    def __init__(
+        self, status: int, reason: str, below: float = None, above: float = None, measurement_methods=None, sexes=None
+    ):
+        self.status = status
+        self.reason = reason
+        self.below = below
+        self.above = above
+        self.measurement_methods = None if measurement_methods is None else frozenset(measurement_methods)
+        self.sexes = None if sexes is None else frozenset(sexes)
+
+    def applies_to(self, measurement_method: str, sex: str) -> bool:
+        """
+        Returns True if the rule applies to the measurement_method and sex, at some age
+        """
+        return (self.measurement_methods is None or measurement_method in self.measurement_methods) and (
+            self.sexes is None or sex in self.sexes
+        )
+
+    def applies_at(self, age: float) -> bool:
+        """
+        Returns True if the rule applies at the age, to the measurement_methods and sexes it applies to
+        """
+        if self.below is None and self.above is None:
+            return True
+        return (self.below is not None and age < self.below) or (self.above is not None and age > self.above)
+
+    def applies(self, age: float, measurement_method: str, sex: str) -> bool:
+        """
+        Returns True if the reference has no data for the age, measurement_method and sex under this rule
+        """
+        return self.applies_to(measurement_method, sex) and self.applies_at(age)
+
+    def __repr__(self):
+        return f"AbsenceRule({self.reason!r})"
+
+
+def _by_measurement_method(value) -> dict:
+    # a value that is the same for every measurement_method is stored under None
+    if isinstance(value, dict):
+        return value
+    return {None: value}
+
+
+class ReferenceSegment:
+    """
+    One of the data sets that make up a reference.
+    centile_ages maps measurement_method to the ages at which centile lines are plotted.
+    youngest_reference_ages are the ages at which a centile line takes the LMS values of the younger segment, so that
+    the line runs up to the disjunction.
+    data_file is the reference data file of the segment (None if its data are not available) and upper_age its
+    AgeLimit: a segment covers the ages within its limit that no earlier segment of the reference covers.
+    data_file, upper_age and centile_ages may be given for each measurement_method: the entry under None is used
+    for any measurement_method not listed, and a segment without one for a measurement_method covers no ages for it.
+    absence_rules are checked in order, after those of the earlier segments of the reference.
+    """
+
+    __slots__ = ("name", "centile_ages", "youngest_reference_ages", "data_files", "upper_ages", "absence_rules")
+
+    def __init__(
+        self,
+        name: str,
+        centile_ages,
+        youngest_reference_ages=(),
+        data_file=None,
+        upper_age: AgeLimit = ALL_AGES,
+        absence_rules=(),
+    ):
+        self.name = name
+        self.centile_ages = _by_measurement_method(centile_ages)
+        self.youngest_reference_ages = frozenset(youngest_reference_ages)
+        self.data_files = _by_measurement_method(data_file)
+        self.upper_ages = _by_measurement_method(upper_age)
+        self.absence_rules = tuple(absence_rules)
+
+    def ages_for_centiles(self, measurement_method: str) -> list:
+        """
+        Returns the ages at which to plot centile lines for a measurement_method
+        """
+        return self.centile_ages.get(measurement_method, self.centile_ages[None])
+
+    def should_default_to_youngest_reference(self, age: float) -> bool:
+        """
+        Returns True if a centile line at this age must take its LMS values from the younger of two overlapping segments
+        """
+        return age in self.youngest_reference_ages
+
+    def data_file(self, measurement_method: str) -> str:
+        """
+        Returns the reference data file for a measurement_method, or None if its data are not available
+        """
+        return self.data_files.get(measurement_method, self.data_files.get(None))
+
+    def upper_age(self, measurement_method: str) -> AgeLimit:
+        """
+        Returns the AgeLimit of the segment for a measurement_method
+        """
+        return self.upper_ages.get(measurement_method, self.upper_ages.get(None, NO_AGES))
+
+    def __repr__(self):
+        return f"ReferenceSegment({self.name!r})"
+
+
+class Reference:
+    """
+    A growth reference: its segments, which hold the data that select LMS values and test whether reference data exist,
+    and the function that draws its chart. title names the reference in error messages.
+    """
+
+    __slots__ = (
+        "name",
+        "title",
+        "segments",
+        "absence_rules",
+        "_absence_rules_by_measurement",
+        "_upper_ages_by_measurement",
+        "create_chart",
+    )
+
+    def __init__(self, name: str, title: str, segments: list):
+        self.name = name
+        self.title = title
+        self.segments = {segment.name: segment for segment in segments}
+        self.absence_rules = tuple(rule for segment in segments for rule in segment.absence_rules)
+        # the rules that apply to each measurement_method and sex, so that only their ages are checked for each lookup
+        self._absence_rules_by_measurement = {
+            (measurement_method, sex): self._absence_rules_for(measurement_method, sex)
+            for measurement_method in MEASUREMENT_METHODS
+            for sex in SEXES
+        }
+        self._upper_ages_by_measurement = {
+            measurement_method: self._upper_ages_for(measurement_method) for measurement_method in MEASUREMENT_METHODS
+        }
+        self.create_chart = None
+
+    def _absence_rules_for(self, measurement_method: str, sex: str) -> tuple:
+        return tuple(rule for rule in self.absence_rules if rule.applies_to(measurement_method, sex))
+
+    def _upper_ages_for(self, measurement_method: str) -> tuple:
+        return tuple((segment.upper_age(measurement_method), segment) for segment in self.segments.values())
+
+    def segment(self, reference_name: str) -> ReferenceSegment:
+        """
+        Returns the segment called reference_name. Raises a LookupError if it is not part of this reference.
+        """
+        try:
+            return self.segments[reference_name]
+        except KeyError:
+            raise LookupError(f"{reference_name} is not part of the {self.name} reference.")
+
+    def reference_data_absent(self, age: float, measurement_method: str, sex: str) -> tuple:
+        """
+        Returns (True, reason) for the first absence rule of the segments that applies to the age, measurement_method
+        and sex, otherwise (False, "")
+        """
+        rules = self._absence_rules_by_measurement.get((measurement_method, sex))
+        if rules is None:
+            rules = self._absence_rules_for(measurement_method, sex)
+        for rule in rules:
+            if rule.applies_at(age):
+                return True, rule.reason
+        return False, ""
+
+    def segment_for_age(
+        self, age: float, measurement_method: str, default_youngest_reference: bool = False
+    ) -> ReferenceSegment:
+        """
+        Returns the first segment whose upper age limit covers the age for the measurement_method.
+        Raises a LookupError if none does.
+        """
+        upper_ages = self._upper_ages_by_measurement.get(measurement_method)
+        if upper_ages is None:
+            upper_ages = self._upper_ages_for(measurement_method)
+        for upper_age, segment in upper_ages:
+            if upper_age.covers(age, default_youngest_reference):
+                return segment
+        raise LookupError(f"There is no {self.title} reference for the age supplied.")
+
+    def lms_value_array_for_measurement(
+        self, age: float, measurement_method: str, sex: str, default_youngest_reference: bool = False
+    ) -> list:
+        """
+        Returns the LMS array for the segment of this reference that covers the age, measurement_method and sex.
+        Raises a LookupError if the reference has no data for them.
+        """
+        try:
+            absent, reason = self.reference_data_absent(age=age, measurement_method=measurement_method, sex=sex)
+            if absent:
+                raise LookupError(reason)
+            data_file = self.segment_for_age(age, measurement_method, default_youngest_reference).data_file(
+                measurement_method
+            )
+        except TypeError:  # the age is not a number
+            raise LookupError(f"There is no {self.title} reference for the age supplied.")
+        if data_file is None:
+            raise LookupError(f"There is no {self.title} reference for the age supplied.")
+        return REFERENCE_DATA.load(data_file)["measurement"][measurement_method][sex]
+
+    def __repr__(self):
+        return f"Reference({self.name!r})"
+
+
+REFERENCE_REGISTRY = {
+    reference.name: reference
+    for reference in [
+        Reference(
+            name=UK_WHO,
+            title="UK-WHO",
+            segments=[
+                ReferenceSegment(
+                    UK90_PRETERM,
+                    UK_90_PRETERM_AGES,
+                    youngest_reference_ages=[FORTY_TWO_WEEKS],
+                    data_file=UK90_PRETERM_FILE,
+                    upper_age=AgeLimit(UK_WHO_INFANT_LOWER_THRESHOLD, disjunction=True),
+                    absence_rules=[
+                        AbsenceRule(
+                            STATUS_AGE_BELOW_REFERENCE,
+                            "UK-WHO data does not exist below 23 weeks gestation.",
+                            below=TWENTY_THREE_WEEKS_GESTATION,
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_BELOW_MEASUREMENT_DATA,
+                            "UK-WHO length data does not exist in infants below 25 weeks gestation.",
+                            below=TWENTY_FIVE_WEEKS_GESTATION,
+                            measurement_methods=[HEIGHT],
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_BELOW_MEASUREMENT_DATA,
+                            "UK-WHO BMI data does not exist below 2 weeks of age.",
+                            below=FORTY_TWO_WEEKS_GESTATION,
+                            measurement_methods=[BMI],
+                        ),
+                    ],
+                ),
+                ReferenceSegment(
+                    UK_WHO_INFANT,
+                    WHO_2006_UNDER_TWOS_AGES,
+                    youngest_reference_ages=[2],
+                    data_file=WHO_INFANTS_FILE,
+                    upper_age=AgeLimit(WHO_CHILD_LOWER_THRESHOLD, disjunction=True),
+                ),
+                ReferenceSegment(
+                    UK_WHO_CHILD,
+                    UK_WHO_2006_OVER_TWOS_AGES,
+                    youngest_reference_ages=[4],
+                    data_file=WHO_CHILD_FILE,
+                    upper_age=AgeLimit(WHO_CHILDREN_UPPER_THRESHOLD, disjunction=True),
+                ),
+                ReferenceSegment(
+                    UK90_CHILD,
+                    UK90_AGES,
+                    data_file=UK90_CHILD_FILE,
+                    upper_age=AgeLimit(UK90_UPPER_THRESHOLD, inclusive=True),
+                    absence_rules=[
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_REFERENCE,
+                            "UK-WHO data does not exist above 20 years.",
+                            above=TWENTY_YEARS,
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+                            "UK-WHO head circumference data does not exist in boys over 18 y of age.",
+                            above=EIGHTEEN_YEARS,
+                            measurement_methods=[HEAD_CIRCUMFERENCE],
+                            sexes=[MALE],
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+                            "UK-WHO head circumference data does not exist in girls over 17 y of age.",
+                            above=SEVENTEEN_YEARS,
+                            measurement_methods=[HEAD_CIRCUMFERENCE],
+                            sexes=[FEMALE],
+                        ),
+                    ],
+                ),
+            ],
+        ),
+        Reference(
+            name=WHO,
+            title="WHO",
+            segments=[
+                ReferenceSegment(
+                    WHO_2006_INFANT,
+                    WHO_2006_UNDER_TWOS_AGES,
+                    youngest_reference_ages=[FORTY_TWO_WEEKS, 2],
+                    data_file=WHO_INFANTS_FILE,
+                    upper_age=AgeLimit(WHO_CHILD_LOWER_THRESHOLD, disjunction=True),
+                    absence_rules=[
+                        AbsenceRule(STATUS_AGE_BELOW_REFERENCE, "WHO data does not exist below term.", below=ZERO_YEARS),
+                    ],
+                ),
+                ReferenceSegment(
+                    WHO_2006_CHILD,
+                    WHO_2006_OVER_TWOS_AGES,
+                    youngest_reference_ages=[5],
+                    data_file=WHO_CHILD_FILE,
+                    upper_age=AgeLimit(WHO_2006_REFERENCE_UPPER_THRESHOLD, disjunction=True),
+                ),
+                ReferenceSegment(
+                    WHO_2007_CHILD,
+                    WHO_2007_AGES,
+                    data_file=WHO_2007_FILE,
+                    upper_age=AgeLimit(WHO_2007_REFERENCE_UPPER_THRESHOLD, inclusive=True),
+                    absence_rules=[
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_REFERENCE, "WHO data does not exist above 19 years.", above=NINETEEN_YEARS
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+                            "WHO weight data does not exist in children over 10 y of age.",
+                            above=TEN_YEARS,
+                            measurement_methods=[WEIGHT],
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+                            "WHO head circumference data does not exist in children over 5 y of age.",
+                            above=FIVE_YEARS,
+                            measurement_methods=[HEAD_CIRCUMFERENCE],
+                        ),
+                    ],
+                ),
+            ],
+        ),
+        Reference(
+            name=CDC,
+            title="CDC",
+            segments=[
+                # Fenton has no centile lines of its own, and its data are not yet available
+                ReferenceSegment(
+                    FENTON,
+                    [],
+                    upper_age=AgeLimit(ZERO_YEARS),
+                    absence_rules=[
+                        AbsenceRule(STATUS_AGE_BELOW_REFERENCE, "CDC data does not exist below 40 weeks.", below=0),
+                    ],
+                ),
+                ReferenceSegment(
+                    CDC_INFANT,
+                    {
+                        HEAD_CIRCUMFERENCE: CDC_TO_THREE_AGE,
+                        HEIGHT: WHO_2006_UNDER_TWOS_AGES,
+                        WEIGHT: WHO_2006_UNDER_TWOS_AGES,
+                        None: CDC_TO_TWO_AGE,  # should be redundant as no BMI data in CDC_INFANT
+                    },
+                    youngest_reference_ages=[FORTY_TWO_WEEKS, 2],
+                    # CDC head circumference data run to 3 years, the CDC interpretation of WHO data to 2 years
+                    data_file={HEAD_CIRCUMFERENCE: CDC_INFANT_FILE, None: WHO_INFANTS_FILE},
+                    upper_age={
+                        HEAD_CIRCUMFERENCE: AgeLimit(THREE_YEARS, inclusive=True),
+                        None: AgeLimit(TWO_YEARS, disjunction=True),
+                    },
+                    absence_rules=[
+                        AbsenceRule(
+                            STATUS_AGE_BELOW_MEASUREMENT_DATA,
+                            "CDC data does not exist for BMI below 2 years.",
+                            below=TWO_YEARS,
+                            measurement_methods=[BMI],
+                        ),
+                    ],
+                ),
+                ReferenceSegment(
+                    CDC_CHILD,
+                    CDC_TWO_TWENTY,
+                    data_file=CDC_CHILD_FILE,
+                    upper_age=AgeLimit(CDC_UPPER_THRESHOLD, inclusive=True),
+                    absence_rules=[
+                        AbsenceRule(STATUS_AGE_ABOVE_REFERENCE, "CDC data does not exist above 20 years.", above=TWENTY_YEARS),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+                            "CDC data does not exist for head circumference above 3 years.",
+                            above=THREE_YEARS,
+                            measurement_methods=[HEAD_CIRCUMFERENCE],
+                        ),
+                    ],
+                ),
+            ],
+        ),
+        Reference(
+            name=TURNERS,
+            title="Turner's syndrome",
+            segments=[
+                # data are available for girls' heights at year intervals from 1-20y
+                ReferenceSegment(
+                    TURNERS,
+                    TURNER_AGES,
+                    data_file=TURNER_FILE,
+                    absence_rules=[
+                        AbsenceRule(STATUS_AGE_BELOW_REFERENCE, "There is no reference data below 1 year.", below=1),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_REFERENCE, "There is no reference data above 20 years.", above=TWENTY_YEARS
+                        ),
+                        AbsenceRule(
+                            STATUS_NO_MEASUREMENT_DATA, "There is no reference data for weight.", measurement_methods=[WEIGHT]
+                        ),
+                        AbsenceRule(
+                            STATUS_NO_MEASUREMENT_DATA,
+                            "There is no reference data for BMI (body mass index).",
+                            measurement_methods=[BMI],
+                        ),
+                        AbsenceRule(
+                            STATUS_NO_MEASUREMENT_DATA,
+                            "There is no reference data for head circumference.",
+                            measurement_methods=[HEAD_CIRCUMFERENCE],
+                        ),
+                        AbsenceRule(STATUS_NO_MEASUREMENT_DATA, "Turner's syndrome only affects girls and women.", sexes=[MALE]),
+                    ],
+                ),
+            ],
+        ),
+        Reference(
+            name=TRISOMY_21,
+            title="Trisomy 21",
+            segments=[
+                ReferenceSegment(
+                    TRISOMY_21,
+                    TRISOMY_21_AGES,
+                    data_file=TRISOMY_21_FILE,
+                    absence_rules=[
+                        AbsenceRule(
+                            STATUS_AGE_BELOW_REFERENCE, "No reference data exists below 40 weeks gestation", below=0
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_REFERENCE,
+                            "Trisomy 21 reference data does not exist over the age of 20y.",
+                            above=TWENTY_YEARS,
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+                            "Trisomy BMI reference data does not exist > 18.82 y.",
+                            above=18.82,
+                            measurement_methods=[BMI],
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+                            "Trisomy head circumference reference data does not exist > 18 y",
+                            above=EIGHTEEN_YEARS,
+                            measurement_methods=[HEAD_CIRCUMFERENCE],
+                        ),
+                    ],
+                ),
+            ],
+        ),
+        Reference(
+            name=TRISOMY_21_AAP,
+            title="Trisomy 21 (AAP)",
+            segments=[
+                # the infant data (below 36 months) are more granular: there are no infant BMI data
+                ReferenceSegment(
+                    TRISOMY_21_AAP_INFANT,
+                    TRISOMY_21_AAP_INFANT_AGES,
+                    youngest_reference_ages=[3],
+                    data_file=TRISOMY_21_AAP_INFANT_FILE,
+                    upper_age={
+                        HEIGHT: AgeLimit(THREE_YEARS, inclusive=True),
+                        WEIGHT: AgeLimit(THREE_YEARS, inclusive=True),
+                        HEAD_CIRCUMFERENCE: AgeLimit(THREE_YEARS, disjunction=True),
+                    },
+                    absence_rules=[
+                        AbsenceRule(
+                            STATUS_AGE_BELOW_REFERENCE,
+                            "No Trisomy 21 (AAP) reference data exists below 40 weeks gestation",
+                            below=0,
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_BELOW_MEASUREMENT_DATA,
+                            "No Trisomy 21 (AAP) reference data exists below 1 month of age for height or head circumference.",
+                            below=0.083,
+                            measurement_methods=[HEIGHT, HEAD_CIRCUMFERENCE],
+                        ),
+                    ],
+                ),
+                ReferenceSegment(
+                    TRISOMY_21_AAP_CHILD,
+                    TRISOMY_21_AAP_CHILD_AGES,
+                    data_file=TRISOMY_21_AAP_CHILD_FILE,
+                    absence_rules=[
+                        AbsenceRule(
+                            STATUS_AGE_BELOW_MEASUREMENT_DATA,
+                            "No Trisomy 21 (AAP) reference data exists below 2 years of age for BMI.",
+                            below=2,
+                            measurement_methods=[BMI],
+                        ),
+                        AbsenceRule(
+                            STATUS_AGE_ABOVE_REFERENCE,
+                            "Trisomy 21 reference data does not exist over the age of 20y.",
+                            above=TWENTY_YEARS,
+                        ),
+                    ],
+                ),
+            ],
+        ),
+    ]
+}
+
+
+def reference_for(reference: str) -> Reference:
+    """
+    Returns the Reference for a reference constant ('uk-who', 'who', 'cdc', 'turners-syndrome', 'trisomy-21',
+    'trisomy-21-aap'). Raises a ValueError for any other value.
+    """
+    try:
+        return REFERENCE_REGISTRY[reference]
+    except (KeyError, TypeError):
+        raise ValueError("No or incorrect reference supplied")
+
+
+def register_chart(reference: str):
+    """
+    Decorator which registers the function that creates the chart for a reference.
+    The function is called with measurement_method, sex, centile_format and is_sds.
+    """
+
+    def register(create_chart):
+        reference_for(reference).create_chart = create_chart
+        return create_chart
+
+    return register
@@ -0,0 +1,349 @@
+"""
+Tests for the vectorised batch functions, which must agree with the scalar functions in global_functions
+"""
+
+# standard imports
+import datetime
+import json
+import math
+import os
+import random
+
+# third-party imports
+import numpy as np
+import pytest
+
+# rcpch imports
+from rcpchgrowth import date_calculations, global_functions
+from rcpchgrowth import cdc, trisomy_21, trisomy_21_aap, turner, uk_who, who
+from rcpchgrowth.batch_functions import (
+    sds_and_centile_for_measurements, measurements_from_sds, lms_for_ages, reference_data_status, centile_band_codes,
+    centile_bands_for_codes, chronological_decimal_ages, corrected_decimal_ages, estimated_dates_delivery,
+    corrected_gestational_ages, chronological_calendar_ages
+)
+from rcpchgrowth.centile_bands import centile_band_for_centile
+from rcpchgrowth.reference_registry import reference_for
+from rcpchgrowth.constants import (
+    REFERENCES, MEASUREMENT_METHODS, SEXES, HEIGHT, WEIGHT, BMI, HEAD_CIRCUMFERENCE, UK_WHO, CDC, WHO, TURNERS,
+    TRISOMY_21, TRISOMY_21_AAP, FORTY_TWO_WEEKS_GESTATION, STATUS_OK, STATUS_AGE_BELOW_MEASUREMENT_DATA,
+    STATUS_AGE_ABOVE_MEASUREMENT_DATA, STATUS_AGE_ABOVE_REFERENCE, STATUS_NO_MEASUREMENT_DATA, STATUS_MISSING_VALUE,
+    STATUS_NOT_CALCULABLE, STATUS_DESCRIPTIONS, CENTILE_FORMATS, EXTENDED_WHO_CENTILES
+)
+
+# The batch functions do the same arithmetic as the scalar functions, so agreement should be far
+# closer than the ACCURACY used against Tim Cole's R output elsewhere
+ACCURACY = 1e-9
+
+
+def load_valid_data_set():
+    """
+    Loads in the testing data from JSON file
+    """
+    with open(os.path.abspath(os.path.dirname(__file__)) + "/sds_age_validation_2021.json") as f:
+        return json.load(f)
+
+
+def scalar_sds(reference, age, measurement_method, observation_value, sex):
+    # the scalar result, with NaN wherever the scalar function raises
+    try:
+        sds = global_functions.sds_for_measurement(
+            reference=reference, age=age, measurement_method=measurement_method, observation_value=observation_value, sex=sex)
+    except Exception:
+        return math.nan
+    if isinstance(sds, complex):
+        return math.nan
+    return float(sds)
+
+
+def assert_matches_scalar(rows):
+    references, ages, measurement_methods, observation_values, sexes = (np.array(column) for column in zip(*rows))
+    expected = np.array([scalar_sds(*row) for row in rows])
+
+    sds, centiles = sds_and_centile_for_measurements(
+        reference=references, age=ages, measurement_method=measurement_methods, observation_value=observation_values, sex=sexes)
+
+    assert np.array_equal(np.isnan(sds), np.isnan(expected))
+    finite = np.isfinite(expected)
+    assert np.array_equal(sds[~finite & ~np.isnan(expected)], expected[~finite & ~np.isnan(expected)])
+    assert sds[finite] == pytest.approx(expected[finite], abs=ACCURACY)
+    assert centiles[finite] == pytest.approx(
+        [global_functions.centile(z) for z in expected[finite]], abs=ACCURACY)
+
+
+@pytest.mark.parametrize("age_type", ["chronological_age", "corrected_age"])
+def test_batch_sds_matches_scalar_uk_who_validation_data(age_type):
+    rows = [
+        (UK_WHO, float(line[age_type]), line["measurement_method"], float(line["observation_value"]), line["sex"])
+        for line in load_valid_data_set()
+    ]
+    assert_matches_scalar(rows)
+
+
+def test_batch_sds_matches_scalar_all_references():
+    """
+    Scores random observations at random ages (including the disjunction ages) in every reference, measurement_method and sex
+    """
+    random.seed(2021)
+    typical_values = {HEIGHT: (30, 190), WEIGHT: (0.5, 90), BMI: (9, 40), HEAD_CIRCUMFERENCE: (20, 60)}
+    disjunction_ages = [0.0, FORTY_TWO_WEEKS_GESTATION, 1.0, 2.0, 3.0, 4.0, 5.0, 10.0, 19.0, 20.0]
+    rows = []
+    for reference in REFERENCES:
+        for measurement_method in MEASUREMENT_METHODS:
+            for sex in SEXES:
+                for _ in range(100):
+                    age = random.choice([
+                        random.uniform(-0.4, 21),
+                        round(random.uniform(-0.4, 21), 2),
+                        random.choice(disjunction_ages)
+                    ])
+                    rows.append((reference, age, measurement_method, random.uniform(*typical_values[measurement_method]), sex))
+    assert_matches_scalar(rows)
+
+
+def test_batch_sds_broadcasts_scalars():
+    ages = np.array([0.5, 4.0, 12.25])
+    sds, centiles = sds_and_centile_for_measurements(
+        reference=CDC, age=ages, measurement_method=HEIGHT, observation_value=[68.0, 102.0, 150.0], sex="female")
+    for age, observation_value, expected in zip(ages, [68.0, 102.0, 150.0], sds):
+        assert expected == pytest.approx(global_functions.sds_for_measurement(
+            reference=CDC, age=age, measurement_method=HEIGHT, observation_value=observation_value, sex="female"), abs=ACCURACY)
+    assert centiles.shape == ages.shape
+
+
+def test_lms_columns_are_built_once_per_table(monkeypatch):
+    from rcpchgrowth import batch_functions
+
+    monkeypatch.setattr(batch_functions, "_LMS_COLUMNS", {})
+    ages = np.array([0.5, 3.0, 12.25])
+    for _ in range(2):
+        sds_and_centile_for_measurements(
+            reference=UK_WHO, age=ages, measurement_method=HEIGHT, observation_value=[68.0, 95.0, 150.0], sex="male")
+    assert sorted(batch_functions._LMS_COLUMNS) == [
+        ("uk90_child.json", HEIGHT, "male"), ("who_children.json", HEIGHT, "male"), ("who_infants.json", HEIGHT, "male")]
+    columns = batch_functions._LMS_COLUMNS[("uk90_child.json", HEIGHT, "male")]
+    sds_and_centile_for_measurements(
+        reference=UK_WHO, age=12.25, measurement_method=HEIGHT, observation_value=150.0, sex="male")
+    assert batch_functions._LMS_COLUMNS[("uk90_child.json", HEIGHT, "male")] is columns
+
+
+def test_batch_sds_returns_nan_without_reference_data():
+    # BMI below 2 weeks and head circumference in girls over 17y have no UK-WHO reference data
+    sds, centiles = sds_and_centile_for_measurements(
+        reference=UK_WHO, age=[0.01, 17.5], measurement_method=[BMI, HEAD_CIRCUMFERENCE], observation_value=[13.0, 55.0], sex="female")
+    assert np.isnan(sds).all()
+    assert np.isnan(centiles).all()
+
+
+def test_batch_profiles():
+    arguments = dict(reference=UK_WHO, age=[1.0, 8.0], measurement_method=HEIGHT, observation_value=[75.0, 128.0], sex="male")
+    sds, centiles = sds_and_centile_for_measurements(**arguments)
+    minimal_sds, minimal_centiles = sds_and_centile_for_measurements(**arguments, profile="minimal")
+    assert minimal_centiles is None
+    np.testing.assert_array_equal(minimal_sds, sds)
+    for fields in [["chronological_centile"], ["corrected_sds", "measurement_calculated_values"]]:
+        np.testing.assert_array_equal(sds_and_centile_for_measurements(**arguments, fields=fields)[1], centiles)
+    with pytest.raises(ValueError):
+        sds_and_centile_for_measurements(**arguments, profile="analytics")
+
+
+def test_reference_data_status_matches_reference_data_absent():
+    modules = {UK_WHO: uk_who, WHO: who, CDC: cdc, TURNERS: turner, TRISOMY_21: trisomy_21, TRISOMY_21_AAP: trisomy_21_aap}
+    ages = [-0.4, -0.3, -0.1, 0.0, 0.03, 0.05, 0.5, 1.0, 1.9, 3.0, 4.0, 5.5, 10.5, 17.5, 18.5, 18.9, 19.5, 20.5]
+    rows = [
+        (reference, age, measurement_method, sex)
+        for reference in REFERENCES for age in ages for measurement_method in MEASUREMENT_METHODS for sex in SEXES
+    ]
+    status = reference_data_status(*zip(*rows))
+    for (reference, age, measurement_method, sex), code in zip(rows, status):
+        absent, _ = modules[reference].reference_data_absent(age=age, measurement_method=measurement_method, sex=sex)
+        assert absent == (code != STATUS_OK), (reference, age, measurement_method, sex)
+
+
+def registry_boundary_ages(reference):
+    """
+    Returns the ages at which the registry entry for the reference changes segment or absence rule, and either side
+    """
+    reference_entry = reference_for(reference)
+    boundaries = set()
+    for segment in reference_entry.segments.values():
+        boundaries.update(upper_age.age for upper_age in segment.upper_ages.values())
+    for rule in reference_entry.absence_rules:
+        boundaries.update([rule.below, rule.above])
+    boundaries = {age for age in boundaries if age is not None and math.isfinite(age)}
+    return sorted({age + offset for age in boundaries for offset in (-1e-6, 0.0, 1e-6)})
+
+
+@pytest.mark.parametrize("reference", REFERENCES)
+def test_batch_selection_matches_scalar_at_registry_boundaries(reference):
+    ages = registry_boundary_ages(reference)
+    for measurement_method in MEASUREMENT_METHODS:
+        for sex in SEXES:
+            status = reference_data_status(reference, ages, measurement_method, sex)
+            for default_youngest_reference in (False, True):
+                batch_lms = lms_for_ages(reference, ages, measurement_method, sex, default_youngest_reference)
+                for index, age in enumerate(ages):
+                    case = (reference, age, measurement_method, sex, default_youngest_reference)
+                    absent, _ = reference_for(reference).reference_data_absent(age, measurement_method, sex)
+                    assert absent == (status[index] != STATUS_OK), case
+                    try:
+                        lms = global_functions.lms_for_reference(
+                            reference, age, measurement_method, sex, default_youngest_reference
+                        )
+                    except (LookupError, ValueError):
+                        # no reference data, or an age outside the rows of the table
+                        assert np.isnan(batch_lms[1][index]), case
+                        continue
+                    if lms["m"] == "":
+                        # blank rows in the table (UK90 preterm BMI) are NaN in the batch
+                        assert np.isnan(batch_lms[1][index]), case
+                    else:
+                        assert batch_lms[1][index] == pytest.approx(lms["m"], abs=ACCURACY), case
+                        assert batch_lms[2][index] == pytest.approx(lms["s"], abs=ACCURACY), case
+
+
+def test_batch_sds_status():
+    sds, centiles, status = sds_and_centile_for_measurements(
+        reference=[UK_WHO, UK_WHO, UK_WHO, TURNERS, UK_WHO, UK_WHO, UK_WHO],
+        age=[0.01, 17.5, 21.0, 8.0, np.nan, 8.0, 8.0],
+        measurement_method=[BMI, HEAD_CIRCUMFERENCE, HEIGHT, WEIGHT, HEIGHT, WEIGHT, HEIGHT],
+        observation_value=[13.0, 55.0, 170.0, 25.0, 120.0, -1.0, 128.0],
+        sex="female",
+        return_status=True,
+    )
+    assert status.tolist() == [
+        STATUS_AGE_BELOW_MEASUREMENT_DATA,
+        STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+        STATUS_AGE_ABOVE_REFERENCE,
+        STATUS_NO_MEASUREMENT_DATA,
+        STATUS_MISSING_VALUE,
+        STATUS_NOT_CALCULABLE,
+        STATUS_OK,
+    ]
+    assert np.isnan(sds[:-1]).all() and not np.isnan(sds[-1])
+    assert all(STATUS_DESCRIPTIONS[code] for code in status[:-1])
+
+
+def test_batch_centile_bands_match_scalar():
+    rng = np.random.default_rng(19)
+    sds = np.concatenate([rng.uniform(-6.0, 6.0, 2000), [np.nan, -np.inf, np.inf, -4.0, 4.0]])
+    measurement_methods = rng.choice(MEASUREMENT_METHODS, sds.size)
+    for centile_format in CENTILE_FORMATS:
+        if centile_format == EXTENDED_WHO_CENTILES:
+            continue
+        centile_bands = centile_bands_for_codes(
+            codes=centile_band_codes(sds=sds, measurement_method=measurement_methods, centile_format=centile_format),
+            measurement_method=measurement_methods,
+            centile_format=centile_format,
+        )
+        assert centile_bands.tolist() == [
+            centile_band_for_centile(sds=float(value), measurement_method=str(measurement_method), centile_format=centile_format)
+            for value, measurement_method in zip(sds, measurement_methods)
+        ]
+
+
+def test_batch_sds_rejects_unknown_reference():
+    with pytest.raises(ValueError):
+        sds_and_centile_for_measurements(reference="uk90", age=[1.0], measurement_method=HEIGHT, observation_value=[75.0], sex="male")
+
+
+def scalar_measurement(reference, requested_sds, measurement_method, sex, age, default_youngest_reference):
+    # the scalar result, with NaN wherever the scalar function raises or returns None
+    try:
+        observation_value = global_functions.measurement_from_sds(
+            reference=reference, requested_sds=requested_sds, measurement_method=measurement_method, sex=sex, age=age,
+            default_youngest_reference=default_youngest_reference)
+    except Exception:
+        return math.nan
+    return math.nan if observation_value is None else float(observation_value)
+
+
+def test_batch_measurements_match_scalar_all_references():
+    """
+    Measurements for random SDS at random ages in every reference, measurement_method and sex, from both the
+    youngest and the oldest reference at the disjunction ages. Both are rounded to 4 decimal places so must be equal.
+    """
+    random.seed(2022)
+    disjunction_ages = [0.0, FORTY_TWO_WEEKS_GESTATION, 1.0, 2.0, 3.0, 4.0, 5.0, 10.0, 19.0, 20.0]
+    rows = []
+    for reference in REFERENCES:
+        for measurement_method in MEASUREMENT_METHODS:
+            for sex in SEXES:
+                for _ in range(100):
+                    age = random.choice([random.uniform(-0.4, 21), random.choice(disjunction_ages)])
+                    requested_sds = random.choice([random.uniform(-8, 8), random.choice([-2.67, 0, 1.645, 2.67, 3.5])])
+                    rows.append((reference, requested_sds, measurement_method, sex, age, random.random() < 0.5))
+    expected = np.array([scalar_measurement(*row) for row in rows])
+
+    references, requested_sds, measurement_methods, sexes, ages, default_youngest_reference = (
+        np.array(column) for column in zip(*rows))
+    observation_values = measurements_from_sds(
+        reference=references, requested_sds=requested_sds, measurement_method=measurement_methods, sex=sexes, age=ages,
+        default_youngest_reference=default_youngest_reference)
+
+    assert np.array_equal(observation_values, expected, equal_nan=True)
+
+
+def test_batch_measurements_cdc_bmi_above_95th_centile():
+    requested_sds = [1.0, 1.645, 2.0, 3.0]
+    observation_values = measurements_from_sds(
+        reference=CDC, requested_sds=requested_sds, measurement_method=BMI, sex="male", age=10.0)
+    for z, observation_value in zip(requested_sds, observation_values):
+        assert observation_value == global_functions.measurement_from_sds(
+            reference=CDC, requested_sds=z, measurement_method=BMI, sex="male", age=10.0)
+    # the extended method is monotonic through the 95th centile
+    assert np.all(np.diff(observation_values) > 0)
+
+
+def test_batch_measurements_return_nan_where_no_power():
+    # where 1 + L * S * z is negative there is no real power, so no measurement
+    l, _, s, _ = lms_for_ages(reference=UK_WHO, age=[10.0], measurement_method=BMI, sex="female")
+    requested_sds = -2.0 / (l[0] * s[0])
+    observation_values = measurements_from_sds(
+        reference=UK_WHO, requested_sds=[requested_sds, 0.0], measurement_method=BMI, sex="female", age=10.0)
+    assert np.isnan(observation_values[0])
+    assert observation_values[1] == global_functions.measurement_from_sds(
+        reference=UK_WHO, requested_sds=0.0, measurement_method=BMI, sex="female", age=10.0)
+
+
+def test_batch_dates_match_scalar():
+    random.seed(20)
+    rows = []
+    for _ in range(2000):
+        birth_date = datetime.date(2000, 1, 1) + datetime.timedelta(days=random.randint(0, 8000))
+        observation_date = birth_date + datetime.timedelta(days=random.choice([random.randint(-10, 100), random.randint(0, 7000)]))
+        gestation_weeks = random.choice([0, 40, random.randint(22, 44)])
+        rows.append((birth_date, observation_date, gestation_weeks, random.randint(0, 6)))
+    birth_dates, observation_dates, gestation_weeks, gestation_days = (list(column) for column in zip(*rows))
+    birth_days = np.array(birth_dates, dtype="datetime64[D]")
+    observation_days = np.array(observation_dates, dtype="datetime64[D]")
+
+    chronological_ages = chronological_decimal_ages(birth_days, observation_days)
+    assert np.array_equal(chronological_ages, chronological_decimal_ages(birth_days.astype(np.int64), observation_days.astype(np.int64)))
+    corrected_ages = corrected_decimal_ages(birth_days, observation_days, gestation_weeks, gestation_days)
+    edds = estimated_dates_delivery(birth_dates, gestation_weeks, gestation_days)
+    corrected_weeks, corrected_days = corrected_gestational_ages(birth_days, observation_days, gestation_weeks, gestation_days)
+    calendar_ages = chronological_calendar_ages(birth_days, observation_days)
+
+    for row, (birth_date, observation_date, weeks, days) in enumerate(rows):
+        assert chronological_ages[row] == date_calculations.chronological_decimal_age(birth_date, observation_date)
+        if birth_date > observation_date:
+            assert np.isnan(corrected_ages[row])
+            assert calendar_ages[row] is None
+        else:
+            assert corrected_ages[row] == date_calculations.corrected_decimal_age(birth_date, observation_date, weeks, days)
+            assert calendar_ages[row] == date_calculations.chronological_calendar_age(birth_date, observation_date)
+        assert edds[row] == np.datetime64(date_calculations.estimated_date_delivery(birth_date, weeks, days))
+        corrected_gestation = date_calculations.corrected_gestational_age(birth_date, observation_date, weeks, days)
+        for expected, value in (
+            (corrected_gestation["corrected_gestation_weeks"], corrected_weeks[row]),
+            (corrected_gestation["corrected_gestation_days"], corrected_days[row]),
+        ):
+            assert np.isnan(value) if expected is None else value == expected
+
+
+def test_batch_dates_missing_values():
+    assert np.isnan(chronological_decimal_ages(np.datetime64("NaT"), "2020-01-01"))
+    assert np.isnan(corrected_decimal_ages("2020-01-01", ["2020-03-01", "NaT"], 0, 0)).tolist() == [False, True]
+    assert np.isnat(estimated_dates_delivery([np.nan], 30, 2)[0])
+    assert chronological_calendar_ages(["2020-01-31", "NaT"], "2020-01-31").tolist() == ["Birth date", None]
+
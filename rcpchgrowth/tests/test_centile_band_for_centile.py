@@ -1,8 +1,12 @@
+import math
+
+import pytest
 from scipy.stats import norm
-from ..centile_bands import centile_band_for_centile
+from ..centile_bands import centile_band_for_centile, centile_band_code, centile_band_for_code, generate_centile_band_ranges
 from ..global_functions import sds_for_centile
 from ..constants.reference_constants import HEIGHT, WEIGHT, HEAD_CIRCUMFERENCE, BMI
-from ..constants.reference_constants import THREE_PERCENT_CENTILES, FIVE_PERCENT_CENTILES, EIGHTY_FIVE_PERCENT_CENTILES, COLE_TWO_THIRDS_SDS_NINE_CENTILES
+from ..constants.reference_constants import THREE_PERCENT_CENTILES, FIVE_PERCENT_CENTILES, EIGHTY_FIVE_PERCENT_CENTILES, COLE_TWO_THIRDS_SDS_NINE_CENTILES, EXTENDED_WHO_CENTILES
+from ..constants.reference_constants import THREE_PERCENT_CENTILE_COLLECTION, CENTILE_BAND_NONE, CENTILE_BAND_BELOW_NORMAL_RANGE, CENTILE_BAND_OUTSIDE_NORMAL_RANGE
 
 measurements = [HEIGHT, WEIGHT, HEAD_CIRCUMFERENCE, BMI]
 measurement_texts = ["height", "weight", "head circumference", "body mass index"]
@@ -381,4 +385,26 @@ def test_advisory_thresholds():
             sds = 5 # above 4 and less than 8
             if measurement == BMI:
                 sds = 10
-            assert centile_band_for_centile(sds=sds, measurement_method=measurement, centile_format=COLE_TWO_THIRDS_SDS_NINE_CENTILES) == f"This {measurement_texts[measurements.index(measurement)]} measurement is well outside the normal range. Please check its accuracy."
\ No newline at end of file
+            assert centile_band_for_centile(sds=sds, measurement_method=measurement, centile_format=COLE_TWO_THIRDS_SDS_NINE_CENTILES) == f"This {measurement_texts[measurements.index(measurement)]} measurement is well outside the normal range. Please check its accuracy."
+
+def test_centile_band_codes():
+    # the 3rd and 5th centiles are closer than two quarter distances, so their bands overlap: the first band wins
+    ranges = generate_centile_band_ranges(THREE_PERCENT_CENTILE_COLLECTION)
+    edges = [edge for centile_band_range in ranges for edge in centile_band_range]
+    values = [-math.inf, -4.5, -4, 0.0, 4, 4.5, math.inf, math.nan]
+    for edge in edges:
+        values.extend([edge, math.nextafter(edge, math.inf), math.nextafter(edge, -math.inf)])
+    for measurement in measurements:
+        for sds in values:
+            code = centile_band_code(sds=sds, measurement_method=measurement, centile_format=THREE_PERCENT_CENTILES)
+            assert centile_band_for_code(code=code, measurement_method=measurement, centile_format=THREE_PERCENT_CENTILES) == centile_band_for_centile(sds=sds, measurement_method=measurement, centile_format=THREE_PERCENT_CENTILES)
+
+    assert centile_band_code(sds=math.nan, measurement_method=HEIGHT) == CENTILE_BAND_NONE
+    assert centile_band_code(sds=ranges[0][0], measurement_method=HEIGHT, centile_format=THREE_PERCENT_CENTILES) == CENTILE_BAND_BELOW_NORMAL_RANGE
+    assert centile_band_code(sds=-4.5, measurement_method=BMI) == CENTILE_BAND_OUTSIDE_NORMAL_RANGE
+    assert centile_band_code(sds=sds_for_centile(50.0), measurement_method=WEIGHT) == 8 # the 50th is the fifth Cole centile
+    assert centile_band_code(sds=sds_for_centile(5.0), measurement_method=WEIGHT) == 3 # between the 2nd and 9th
+
+def test_centile_band_for_unknown_format():
+    with pytest.raises(ValueError):
+        centile_band_for_centile(sds=0.0, measurement_method=HEIGHT, centile_format=EXTENDED_WHO_CENTILES)
@@ -0,0 +1,116 @@
+"""
+Tests for the chart cache in front of create_chart
+"""
+
+# standard imports
+import pickle
+
+# third-party imports
+import pytest
+
+# rcpch imports
+from rcpchgrowth import create_chart, CHART_CACHE, LMS_GRID
+from rcpchgrowth.chart_cache import ChartCache, DEFAULT_CHART_CACHE_SIZE, chart_cache_key
+from rcpchgrowth.constants import (
+    UK_WHO, TURNERS, HEIGHT, WEIGHT, FEMALE, MALE, COLE_TWO_THIRDS_SDS_NINE_CENTILES, THREE_PERCENT_CENTILES
+)
+
+
+@pytest.fixture
+def chart_cache():
+    # the cache is shared by the process, so is emptied and restored around each test
+    CHART_CACHE.configure(maxsize=DEFAULT_CHART_CACHE_SIZE, enabled=True)
+    CHART_CACHE.clear()
+    yield CHART_CACHE
+    CHART_CACHE.configure(maxsize=DEFAULT_CHART_CACHE_SIZE, enabled=True)
+    CHART_CACHE.clear()
+
+
+def test_repeated_charts_hit_cache(chart_cache):
+    charts = [create_chart(reference=TURNERS, measurement_method=HEIGHT, sex=FEMALE) for _ in range(3)]
+    info = chart_cache.info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+    assert info.hit_rate == pytest.approx(2 / 3)
+    assert info.nbytes > 0
+    assert charts[0] == charts[1] == charts[2]
+    # every caller has its own copy
+    assert charts[1] is not charts[2]
+
+    create_chart(reference=TURNERS, measurement_method=HEIGHT, sex=FEMALE, centile_format=THREE_PERCENT_CENTILES)
+    create_chart(reference=TURNERS, measurement_method=HEIGHT, sex=FEMALE, centile_format=[50, 91])
+    create_chart(reference=TURNERS, measurement_method=HEIGHT, sex=FEMALE, centile_format=[50.0, 91.0])
+    create_chart(reference=TURNERS, measurement_method=HEIGHT, sex=FEMALE, centile_format=[0, 1], is_sds=True)
+    assert chart_cache.info().currsize == 5
+
+
+def test_modifying_chart_does_not_change_cache(chart_cache):
+    chart = create_chart(reference=UK_WHO, measurement_method=WEIGHT, sex=MALE)
+    expected = create_chart(reference=UK_WHO, measurement_method=WEIGHT, sex=MALE)
+    chart[1]["uk_who_infant"][MALE][WEIGHT][0]["data"][0]["y"] = -1.0
+    chart.append("modified")
+    assert create_chart(reference=UK_WHO, measurement_method=WEIGHT, sex=MALE) == expected
+
+
+@pytest.mark.parametrize(
+    "centile_format, is_sds",
+    [
+        (COLE_TWO_THIRDS_SDS_NINE_CENTILES, False),
+        (THREE_PERCENT_CENTILES, False),
+        ([2, 50, 98], False),
+        ([-2.5, 0, 2.5], True),
+    ]
+)
+def test_cached_charts_match_uncached(chart_cache, centile_format, is_sds):
+    chart_cache.configure(enabled=False)
+    uncached = create_chart(
+        reference=UK_WHO, centile_format=centile_format, measurement_method=HEIGHT, sex=FEMALE, is_sds=is_sds)
+    assert chart_cache.info().currsize == 0
+    chart_cache.configure(enabled=True)
+    for _ in range(2):
+        cached = create_chart(
+            reference=UK_WHO, centile_format=centile_format, measurement_method=HEIGHT, sex=FEMALE, is_sds=is_sds)
+        assert cached == uncached
+        assert repr(cached) == repr(uncached)
+    assert chart_cache.info().hits == 1
+
+
+def test_cache_keys():
+    assert chart_cache_key(UK_WHO, HEIGHT, FEMALE, [50], 1) == chart_cache_key(UK_WHO, HEIGHT, FEMALE, [50], True)
+    assert chart_cache_key(UK_WHO, HEIGHT, FEMALE, [50], False) != chart_cache_key(UK_WHO, HEIGHT, FEMALE, [50.0], False)
+    # only lists are custom centile collections, and unhashable values cannot be keys
+    assert chart_cache_key(UK_WHO, HEIGHT, FEMALE, (50,), False) is None
+    assert chart_cache_key(UK_WHO, HEIGHT, FEMALE, [[50]], False) is None
+
+
+def test_unknown_reference_is_not_cached(chart_cache):
+    assert create_chart(reference="uk90", measurement_method=HEIGHT, sex=MALE) is None
+    info = chart_cache.info()
+    assert (info.hits, info.misses, info.currsize) == (0, 0, 0)
+
+
+def test_lms_grid_settings_clear_cache(chart_cache):
+    create_chart(reference=TURNERS, measurement_method=HEIGHT, sex=FEMALE)
+    settings = LMS_GRID.info()
+    LMS_GRID.configure(enabled=settings.enabled)
+    assert chart_cache.info().currsize == 0
+
+
+def test_least_recently_used_evicted():
+    chart_cache = ChartCache(maxsize=2)
+    chart_cache.put("a", [1])
+    chart_cache.put("b", [2])
+    assert chart_cache.get("a") == [1]
+    chart_cache.put("c", [3])
+    assert chart_cache.get("b") is None
+    assert chart_cache.get("a") == [1]
+    chart_cache.configure(maxsize=1)
+    assert chart_cache.get("c") is None
+    info = chart_cache.info()
+    assert (info.hits, info.misses, info.evictions, info.maxsize, info.currsize) == (2, 2, 2, 1, 1)
+    assert info.hit_rate == 0.5
+    chart_cache.put("a", [1, 2])
+    assert chart_cache.info().nbytes == len(pickle.dumps([1, 2], protocol=pickle.HIGHEST_PROTOCOL))
+    chart_cache.configure(enabled=False)
+    assert chart_cache.info().nbytes == 0
+    with pytest.raises(ValueError):
+        chart_cache.configure(maxsize=0)
@@ -1,6 +1,7 @@
 import pytest
 from rcpchgrowth.constants import UK_90_PRETERM_AGES,WHO_2006_UNDER_TWOS_AGES,UK_WHO_2006_OVER_TWOS_AGES, UK90_AGES, TWENTY_FIVE_WEEKS_GESTATION
 
+from rcpchgrowth.chart_cache import CHART_CACHE
 from rcpchgrowth.chart_functions import create_chart
 @pytest.mark.parametrize(
         "sex, measurement_method",
@@ -54,4 +55,76 @@ def test_create_uk_who_chart_size(sex, measurement_method):
         assert len(chart[0]['uk90_preterm'][sex][measurement_method][0]['data'])==len(UK_90_PRETERM_AGES), f"The 'uk90_preterm' {sex} {measurement_method} chart 0.4th centile should have {len(UK_90_PRETERM_AGES)} entries, one for each centile."
         assert len(chart[1]['uk_who_infant'][sex][measurement_method][0]['data'])==len(WHO_2006_UNDER_TWOS_AGES), f"The 'uk_who_infant' {sex} {measurement_method} chart 0.4th centile should have {len(WHO_2006_UNDER_TWOS_AGES)} entries."
         assert len(chart[2]['uk_who_child'][sex][measurement_method][0]['data'])==len(UK_WHO_2006_OVER_TWOS_AGES), f"The 'uk_who_infant' {sex} {measurement_method} chart 0.4th centile should have {len(UK_WHO_2006_OVER_TWOS_AGES)} entries."
-        assert len(chart[3]['uk90_child'][sex][measurement_method][0]['data'])==len(UK90_AGES), f"The 'uk90_child' {sex} {measurement_method} chart 0.4th centile should have {len(UK90_AGES)} entries."
\ No newline at end of file
+        assert len(chart[3]['uk90_child'][sex][measurement_method][0]['data'])==len(UK90_AGES), f"The 'uk90_child' {sex} {measurement_method} chart 0.4th centile should have {len(UK90_AGES)} entries."
+
+def test_points_without_reference_data_are_logged_not_printed(capsys, caplog):
+    """
+    The ages a reference has no data for are skipped quietly, and recorded at DEBUG level
+    """
+    caplog.set_level("DEBUG", logger="rcpchgrowth")
+    # a cached chart would be returned without generating (and logging) its points
+    CHART_CACHE.clear()
+    chart = create_chart(reference="cdc", measurement_method="ofc", sex="male")
+
+    assert chart and capsys.readouterr().out == ""
+    assert any(
+        "CDC data does not exist for head circumference above 3 years." in record.getMessage()
+        for record in caplog.records if record.levelname == "DEBUG"
+    )
+
+    assert create_chart(reference="uk90", measurement_method="ofc", sex="male") is None
+    assert capsys.readouterr().out == ""
+    assert "spelling mistake" in caplog.records[-1].getMessage()
+
+
+def test_centiles_that_cannot_be_drawn_are_left_out_of_turner_charts():
+    # a centile of 0 has an SDS of minus infinity, which cannot be rounded for the chart
+    chart = create_chart(reference="turners-syndrome", centile_format=[0, 50], measurement_method="height", sex="female")
+    centiles = chart[0]["turners-syndrome"]["female"]["height"]
+    assert [centile_line["centile"] for centile_line in centiles] == [50]
+    assert centiles[0]["data"]
+
+
+def test_centile_lines_fall_back_one_line_at_a_time(monkeypatch):
+    # if the centile lines cannot be generated together, only the lines that fail on their own have no data
+    from rcpchgrowth import chart_functions
+
+    def failing_generate_centiles(**kwargs):
+        raise LookupError("no reference data")
+
+    def generate_centile(z, **kwargs):
+        if z > 1:
+            raise LookupError("no reference data")
+        return [{"l": kwargs["centile"], "x": 1.0, "y": z}]
+
+    monkeypatch.setattr(chart_functions, "generate_centiles", failing_generate_centiles)
+    monkeypatch.setattr(chart_functions, "generate_centile", generate_centile)
+    centile_lines = chart_functions.generate_centile_lines(
+        z_scores=[0.0, 2.0], centiles=[50, 97.7], measurement_method="height", sex="female",
+        reference="uk-who", reference_name="uk90_child")
+    assert centile_lines == [[{"l": 50, "x": 1.0, "y": 0.0}], None]
+
+
+@pytest.mark.parametrize(
+    "reference, sex, reference_name, index, is_sds, centile_format, expected",
+    [
+        # centile lines round their measurements as numpy did: the medians here are 42.34725 and 73.39455, which
+        # round() would make 42.3473 and 73.3945
+        ("uk-who", "female", "uk90_preterm", 6, False, "cole-nine-centiles", 42.3472),
+        ("uk-who", "female", "uk90_preterm", 6, False, "three-percent-centiles", 42.3472),
+        ("trisomy-21", "male", "trisomy-21", 14, False, "cole-nine-centiles", 73.3946),
+        ("trisomy-21", "male", "trisomy-21", 14, False, "three-percent-centiles", 73.3946),
+        # SDS lines round to the nearest 4 place decimal
+        ("uk-who", "female", "uk90_preterm", 6, True, [0], 42.3473),
+    ]
+)
+def test_centile_line_measurements_keep_their_published_rounding(
+        reference, sex, reference_name, index, is_sds, centile_format, expected):
+    CHART_CACHE.clear()
+    chart = create_chart(
+        reference=reference, centile_format=centile_format, measurement_method="height", sex=sex, is_sds=is_sds)
+    charts = {name: lines for reference_chart in chart for name, lines in reference_chart.items()}
+    fiftieth = next(
+        line for line in charts[reference_name][sex]["height"]
+        if line["sds" if is_sds else "centile"] == (0 if is_sds else 50))
+    assert fiftieth["data"][index]["y"] == expected
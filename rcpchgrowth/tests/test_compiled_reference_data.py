@@ -0,0 +1,171 @@
+"""
+Tests for the compiled binary reference data
+"""
+
+# standard imports
+from array import array
+from importlib import resources
+import json
+import logging
+import mmap
+import os
+import pathlib
+import sys
+
+# third-party imports
+import pytest
+
+# rcpch imports
+from rcpchgrowth import compiled_reference_data
+from rcpchgrowth.compiled_reference_data import (
+    check_compiled_data_tables,
+    compile_data_tables,
+    compile_reference_data,
+    compiled_file_name,
+    load_compiled_reference_data,
+)
+from rcpchgrowth.lms_tables import LMSTable, columnar_reference_data
+from rcpchgrowth.reference_data import REFERENCE_DATA, ReferenceDataLoader
+
+DATA_TABLES = resources.files("rcpchgrowth.data_tables")
+REFERENCE_FILES = sorted(
+    source.name
+    for source in DATA_TABLES.iterdir()
+    if source.name.endswith(".json") and "measurement" in json.loads(source.read_bytes())
+)
+LMS_FIELDS = ("decimal_age", "L", "M", "S", "sigma")
+
+
+@pytest.mark.parametrize("file_name", REFERENCE_FILES)
+def test_compiled_files_are_up_to_date(file_name):
+    # if this fails, rebuild the compiled files with python -m rcpchgrowth.compiled_reference_data
+    source_json = DATA_TABLES.joinpath(file_name).read_bytes()
+    assert load_compiled_reference_data(
+        DATA_TABLES.joinpath(compiled_file_name(file_name)), DATA_TABLES.joinpath(file_name)) is not None
+    assert DATA_TABLES.joinpath(compiled_file_name(file_name)).read_bytes() == compile_reference_data(source_json)
+
+
+def test_check_compiled_data_tables():
+    assert check_compiled_data_tables() == []
+
+
+@pytest.mark.parametrize("file_name", REFERENCE_FILES)
+def test_compiled_matches_json(file_name):
+    source_json = DATA_TABLES.joinpath(file_name).read_bytes()
+    from_json = columnar_reference_data(json.loads(source_json))
+    compiled = load_compiled_reference_data(
+        DATA_TABLES.joinpath(compiled_file_name(file_name)), DATA_TABLES.joinpath(file_name))
+
+    assert {key: value for key, value in compiled.items() if key != "measurement"} == {
+        key: value for key, value in from_json.items() if key != "measurement"
+    }
+    assert compiled["measurement"].keys() == from_json["measurement"].keys()
+    for measurement_method, sexes in from_json["measurement"].items():
+        for sex, json_table in sexes.items():
+            compiled_table = compiled["measurement"][measurement_method][sex]
+            if not isinstance(json_table, LMSTable):
+                assert compiled_table == json_table
+                continue
+            assert isinstance(compiled_table, LMSTable)
+            # the compiled tables drop the fields the calculations do not read
+            assert compiled_table == [
+                {field: lms_element[field] for field in LMS_FIELDS if field in lms_element} for lms_element in json_table
+            ]
+            for column in ["decimal_ages", "l", "m", "s", "sigma"]:
+                if getattr(json_table, column) is None:
+                    assert getattr(compiled_table, column) is None
+                else:
+                    assert list(getattr(compiled_table, column)) == list(getattr(json_table, column))
+
+
+def test_reference_data_is_memory_mapped():
+    lms_table = REFERENCE_DATA.load("uk90_child.json")["measurement"]["height"]["male"]
+    assert isinstance(lms_table.decimal_ages.obj, mmap.mmap)
+    assert lms_table.decimal_ages.readonly
+
+    json_table = ReferenceDataLoader(use_compiled=False).load("uk90_child.json")["measurement"]["height"]["male"]
+    assert isinstance(json_table.decimal_ages.obj, array)
+    assert json_table.decimal_ages.readonly
+
+
+def test_missing_or_other_format_compiled_file(tmp_path):
+    source = tmp_path / "turner.json"
+    source.write_bytes(DATA_TABLES.joinpath("turner.json").read_bytes())
+    compiled = tmp_path / "turner.lms"
+    assert load_compiled_reference_data(compiled, source) is None
+
+    compiled.write_bytes(compile_reference_data(source.read_bytes()))
+    assert load_compiled_reference_data(compiled, source) is not None
+
+    compiled.write_bytes(compile_reference_data(source.read_bytes()).replace(b"RCPCHLMS\x02", b"RCPCHLMS\x01", 1))
+    assert load_compiled_reference_data(compiled, source) is None
+
+    compiled.write_bytes(b"")
+    assert load_compiled_reference_data(compiled, source) is None
+
+
+@pytest.fixture
+def compiled_turner(tmp_path, monkeypatch):
+    # a package holding turner.json and a compiled copy written after it, which counts the hashes of the JSON
+    package = tmp_path / "copied_data_tables"
+    package.mkdir()
+    (package / "__init__.py").write_bytes(b"")
+    (package / "turner.json").write_bytes(DATA_TABLES.joinpath("turner.json").read_bytes())
+    (package / "turner.lms").write_bytes(DATA_TABLES.joinpath("turner.lms").read_bytes())
+    source_stat = os.stat(package / "turner.json")
+    os.utime(package / "turner.lms", ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    hashed = []
+
+    def counting(source_json, _digest=compiled_reference_data._source_digest):
+        hashed.append(len(source_json))
+        return _digest(source_json)
+
+    monkeypatch.setattr(compiled_reference_data, "_source_digest", counting)
+    yield package, hashed
+    sys.modules.pop("copied_data_tables", None)
+
+
+def test_up_to_date_compiled_file_is_used_without_reading_json(compiled_turner):
+    package, hashed = compiled_turner
+    reference_data = ReferenceDataLoader(package="copied_data_tables").load("turner.json")
+    assert isinstance(reference_data["measurement"]["height"]["female"].decimal_ages.obj, mmap.mmap)
+    assert hashed == []
+
+
+def test_compiled_file_older_than_json_is_hashed(compiled_turner):
+    package, hashed = compiled_turner
+    source_stat = os.stat(package / "turner.json")
+    os.utime(package / "turner.lms", ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns - 10**9))
+
+    reference_data = ReferenceDataLoader(package="copied_data_tables").load("turner.json")
+    assert isinstance(reference_data["measurement"]["height"]["female"].decimal_ages.obj, mmap.mmap)
+    assert hashed == [source_stat.st_size]
+
+
+@pytest.mark.parametrize("changed_m, expected", [(b'"M": 65.42', 65.42), (b'"M": 999', 999.0)])
+def test_stale_compiled_file_falls_back_to_json(compiled_turner, caplog, changed_m, expected):
+    # a change that keeps the size of the JSON is found by hashing it, as the JSON is newer than the compiled file
+    package, _ = compiled_turner
+    source_json = (package / "turner.json").read_bytes()
+    compiled_stat = os.stat(package / "turner.lms")
+    (package / "turner.json").write_bytes(source_json.replace(b'"M": 65.41', changed_m, 1))
+    os.utime(package / "turner.json", ns=(compiled_stat.st_atime_ns, compiled_stat.st_mtime_ns + 10**9))
+
+    with caplog.at_level(logging.WARNING, logger="rcpchgrowth.compiled_reference_data"):
+        reference_data = ReferenceDataLoader(package="copied_data_tables").load("turner.json")
+    lms_table = reference_data["measurement"]["height"]["female"]
+    assert lms_table.m[0] == expected
+    assert isinstance(lms_table.decimal_ages.obj, array)
+    assert "turner.lms is out of date with turner.json" in caplog.text
+
+
+def test_compile_data_tables_to_directory(tmp_path):
+    written = compile_data_tables(directory=tmp_path)
+    assert sorted(pathlib.Path(file_path).name for file_path in written) == [
+        compiled_file_name(file_name) for file_name in REFERENCE_FILES
+    ]
+    for file_name in REFERENCE_FILES:
+        compiled = tmp_path / compiled_file_name(file_name)
+        assert compiled.read_bytes() == DATA_TABLES.joinpath(compiled_file_name(file_name)).read_bytes()
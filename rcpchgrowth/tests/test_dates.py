@@ -1,6 +1,10 @@
 import unittest
-from datetime import date
-from ..date_calculations import chronological_decimal_age, corrected_decimal_age, estimated_date_delivery
+from calendar import monthrange
+
+import pytest
+from datetime import date, datetime, timedelta
+from dateutil import relativedelta
+from ..date_calculations import chronological_decimal_age, corrected_decimal_age, estimated_date_delivery, chronological_calendar_age, calendar_age_years_months_days
 
 
 # TODO: #92 TestDecimalAge needs to be converted to use PyTest
@@ -66,5 +70,28 @@ class TestDecimalAge(unittest.TestCase):
         self.assertEqual(edd, date(2011, 3, 4))
 
 
+def test_calendar_age_years_months_days_matches_relativedelta():
+    # every birth date at the end of a month, including leap years, over two years of observations
+    birth_dates = [
+        date(year, month, day) for year in (2019, 2020) for month in range(1, 13) for day in (1, 15, 28, 29, 30, 31)
+        if day <= monthrange(year, month)[1]
+    ]
+    for birth_date in birth_dates:
+        for days in range(800):
+            observation_date = birth_date + timedelta(days=days)
+            difference = relativedelta.relativedelta(observation_date, birth_date)
+            assert calendar_age_years_months_days(birth_date, observation_date) == (difference.years, difference.months, difference.days)
+
+
+def test_chronological_calendar_age():
+    assert chronological_calendar_age(date(2020, 1, 1), date(2020, 1, 1)) == "Birth date"
+    assert chronological_calendar_age(date(2020, 1, 31), date(2020, 3, 1)) == "1 month and 1 day"
+    assert chronological_calendar_age(date(2019, 3, 2), date(2021, 5, 20)) == "2 years, 2 months, 2 weeks and 4 days"
+    # a datetime only counts whole days
+    assert chronological_calendar_age(datetime(2020, 1, 1, 12), datetime(2020, 1, 3, 8)) == "1 day"
+    with pytest.raises(Exception):
+        chronological_calendar_age(date(2020, 1, 2), date(2020, 1, 1))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -87,3 +87,9 @@ def test_sds_for_measurement_chronological(line):
         line["measurement_method"]), float(line["observation_value"]), str(line["sex"]))
     tim_sds = float(line["chronological_sds"])
     assert sds == pytest.approx(tim_sds, abs=ACCURACY)
+
+
+@pytest.mark.parametrize("reference, age", [("cdc", -0.5), ("cdc", 21.0), ("uk-who", -0.5), ("uk-who", None)])
+def test_sds_for_measurement_without_reference_data_raises_lookup_error(reference, age):
+    with pytest.raises(LookupError):
+        global_functions.sds_for_measurement(reference, age, "weight", 3.0, "male")
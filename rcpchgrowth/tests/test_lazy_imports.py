@@ -0,0 +1,64 @@
+"""
+Tests for importing the public names of rcpchgrowth on first use
+"""
+
+# standard imports
+import subprocess
+import sys
+
+# third-party imports
+import pytest
+
+# rcpch imports
+import rcpchgrowth
+
+
+def test_import_imports_only_the_constants():
+    code = (
+        "import sys, rcpchgrowth\n"
+        "print(sorted(module for module in sys.modules if module.startswith('rcpchgrowth.') and '.constants' not in module))\n"
+        "print([package for package in ['numpy', 'scipy', 'dateutil'] if package in sys.modules])\n"
+        "from rcpchgrowth import sds_for_measurement\n"
+        "print('rcpchgrowth.global_functions' in sys.modules, 'numpy' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split("\n")[:3] == ["[]", "[]", "True False"]
+
+
+@pytest.mark.parametrize("name", sorted(rcpchgrowth._LAZY_ATTRIBUTES))
+def test_public_names(name):
+    value = getattr(rcpchgrowth, name)
+    module = sys.modules[f"rcpchgrowth.{rcpchgrowth._LAZY_ATTRIBUTES[name]}"]
+    assert value is getattr(module, name)
+    assert name in rcpchgrowth.__all__
+
+
+def test_submodules_and_constants():
+    from rcpchgrowth import uk_who, HEIGHT
+
+    assert uk_who is sys.modules["rcpchgrowth.uk_who"]
+    assert HEIGHT == "height"
+    with pytest.raises(AttributeError, match="not_a_name"):
+        rcpchgrowth.not_a_name
+
+
+def test_function_sharing_its_module_name():
+    # importing the mid_parental_height module for another of its names must not hide the mid_parental_height function
+    code = (
+        "import sys, rcpchgrowth\n"
+        "from rcpchgrowth import mid_parental_height_z\n"
+        "print(rcpchgrowth.mid_parental_height is sys.modules['rcpchgrowth.mid_parental_height'].mid_parental_height)\n"
+        "from rcpchgrowth import mid_parental_height\n"
+        "print(callable(mid_parental_height))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["True", "True"]
+
+
+@pytest.mark.parametrize("name", sorted(rcpchgrowth._LAZY_SUBMODULES))
+def test_submodules_are_listed(name):
+    assert name in rcpchgrowth.__all__ and name in dir(rcpchgrowth)
+    if name not in rcpchgrowth._LAZY_ATTRIBUTES:
+        assert getattr(rcpchgrowth, name) is sys.modules[f"rcpchgrowth.{name}"]
@@ -0,0 +1,99 @@
+"""
+Tests for the LMS cache in front of the LMS lookups in global_functions
+"""
+
+# standard imports
+import threading
+
+# third-party imports
+import pytest
+
+# rcpch imports
+from rcpchgrowth import global_functions, LMS_CACHE
+from rcpchgrowth.lms_cache import LMSCache, DEFAULT_LMS_CACHE_SIZE
+from rcpchgrowth.constants import UK_WHO, CDC, HEIGHT, BMI, FEMALE, MALE
+
+
+@pytest.fixture
+def lms_cache():
+    # the cache is shared by the process, so is emptied and restored around each test
+    LMS_CACHE.configure(maxsize=DEFAULT_LMS_CACHE_SIZE, enabled=True)
+    LMS_CACHE.clear()
+    yield LMS_CACHE
+    LMS_CACHE.configure(maxsize=DEFAULT_LMS_CACHE_SIZE, enabled=True)
+    LMS_CACHE.clear()
+
+
+def test_repeated_lookups_hit_cache(lms_cache):
+    for _ in range(3):
+        global_functions.sds_for_measurement(
+            reference=UK_WHO, age=7.3, measurement_method=HEIGHT, observation_value=121.0, sex=FEMALE)
+    info = lms_cache.info()
+    assert (info.hits, info.misses, info.currsize) == (2, 1, 1)
+
+    # measurement_from_sds can select the youngest reference, so is cached separately at the same age
+    global_functions.measurement_from_sds(
+        reference=UK_WHO, requested_sds=0, measurement_method=HEIGHT, sex=FEMALE, age=7.3, default_youngest_reference=True)
+    assert lms_cache.info().currsize == 2
+
+
+def test_cached_results_match_uncached(lms_cache):
+    ages = [2.5, 3.0, 4.0, 7.3, 11.07, 3.0, 2.5]
+    cached = [
+        global_functions.sds_for_measurement(reference=CDC, age=age, measurement_method=BMI, observation_value=24.0, sex=MALE)
+        for age in ages
+    ]
+    assert lms_cache.info().hits == 2
+    lms_cache.configure(enabled=False)
+    uncached = [
+        global_functions.sds_for_measurement(reference=CDC, age=age, measurement_method=BMI, observation_value=24.0, sex=MALE)
+        for age in ages
+    ]
+    assert cached == uncached
+    assert lms_cache.info().currsize == 0
+
+
+def test_lookup_errors_are_not_cached(lms_cache):
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            global_functions.sds_for_measurement(
+                reference=UK_WHO, age=21.0, measurement_method=HEIGHT, observation_value=170.0, sex=MALE)
+    assert lms_cache.info().currsize == 0
+
+
+def test_least_recently_used_evicted():
+    lms_cache = LMSCache(maxsize=2)
+    lms_cache.put("a", {"l": 1})
+    lms_cache.put("b", {"l": 2})
+    assert lms_cache.get("a") == {"l": 1}
+    lms_cache.put("c", {"l": 3})
+    assert lms_cache.get("b") is None
+    assert lms_cache.get("a") == {"l": 1}
+    lms_cache.configure(maxsize=1)
+    assert lms_cache.get("c") is None
+    info = lms_cache.info()
+    assert (info.hits, info.misses, info.evictions, info.maxsize, info.currsize) == (2, 2, 2, 1, 1)
+    with pytest.raises(ValueError):
+        lms_cache.configure(maxsize=0)
+
+
+def test_cache_is_thread_safe():
+    lms_cache = LMSCache(maxsize=50)
+
+    def worker(offset):
+        for i in range(2000):
+            key = (offset + i) % 100
+            if lms_cache.get(key) is None:
+                lms_cache.put(key, {"l": key})
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    info = lms_cache.info()
+    assert info.hits + info.misses == 16000
+    assert info.currsize == 50
+    # threads missing the same key at once both store it, so not every miss adds an entry
+    assert info.evictions <= info.misses - 50
@@ -0,0 +1,204 @@
+"""
+Tests for the columnar LMS tables, which must find the same ages as a scan of the list of LMS values
+and interpolate between them as fetch_lms always has
+"""
+
+# standard imports
+import json
+import math
+import os
+import random
+
+# third-party imports
+import pytest
+
+# rcpch imports
+from rcpchgrowth import global_functions
+from rcpchgrowth.lms_cache import LMS_CACHE
+from rcpchgrowth.lms_tables import LMSTable, LMS_GRID, DEFAULT_LMS_GRID_RESOLUTION, DEFAULT_LMS_GRID_MAX_MEMORY, days_for_age
+from rcpchgrowth.constants import UK_WHO
+from rcpchgrowth.uk_who import UK90_PRETERM_DATA, WHO_INFANTS_DATA, WHO_CHILD_DATA, UK90_CHILD_DATA
+from rcpchgrowth.who import WHO_2007_DATA
+from rcpchgrowth.cdc import CDC_INFANT_DATA, CDC_CHILD_DATA
+from rcpchgrowth.turner import TURNER_DATA
+from rcpchgrowth.trisomy_21 import TRISOMY_21_DATA
+from rcpchgrowth.trisomy_21_aap import TRISOMY_21_AAP_INFANT_DATA, TRISOMY_21_AAP_CHILD_DATA
+
+REFERENCE_DATA = [
+    UK90_PRETERM_DATA, WHO_INFANTS_DATA, WHO_CHILD_DATA, UK90_CHILD_DATA, WHO_2007_DATA, CDC_INFANT_DATA,
+    CDC_CHILD_DATA, TURNER_DATA, TRISOMY_21_DATA, TRISOMY_21_AAP_INFANT_DATA, TRISOMY_21_AAP_CHILD_DATA
+]
+
+LMS_TABLES = [
+    lms_table
+    for reference_data in REFERENCE_DATA
+    for measurement_method in reference_data["measurement"].values()
+    for lms_table in measurement_method.values()
+    if isinstance(lms_table, LMSTable) and len(lms_table) > 0
+]
+
+
+def scanned_nearest_lowest_index(lms_array, age):
+    # the linear scan that LMSTable replaces
+    lowest_index = 0
+    for num, lms_element in enumerate(lms_array):
+        if round(lms_element["decimal_age"], 16) == round(age, 16):
+            return num
+        if lms_element["decimal_age"] < age:
+            lowest_index = num
+    return lowest_index
+
+
+def test_reference_data_loaded_as_lms_tables():
+    assert len(LMS_TABLES) > 50
+    # weight for height is indexed by height, not age, so stays a list
+    assert not isinstance(TRISOMY_21_AAP_INFANT_DATA["measurement"]["weight_height"]["male"], LMSTable)
+
+
+def test_lms_table_columns():
+    lms_table = CDC_CHILD_DATA["measurement"]["bmi"]["female"]
+    # columns are lists, or memoryviews of compiled reference data
+    assert list(lms_table.decimal_ages) == [lms_element["decimal_age"] for lms_element in lms_table]
+    assert list(lms_table.m) == [lms_element["M"] for lms_element in lms_table]
+    assert list(lms_table.sigma) == [lms_element["sigma"] for lms_element in lms_table]
+    assert UK90_CHILD_DATA["measurement"]["height"]["male"].sigma is None
+
+
+@pytest.mark.parametrize("lms_table", LMS_TABLES)
+def test_nearest_lowest_index_matches_scan(lms_table):
+    random.seed(len(lms_table))
+    first_age, last_age = lms_table.decimal_ages[0], lms_table.decimal_ages[-1]
+    ages = list(lms_table.decimal_ages) + [first_age - 1, last_age + 1] + [
+        random.uniform(first_age, last_age) for _ in range(200)]
+    for age in ages:
+        assert lms_table.nearest_lowest_index(age) == scanned_nearest_lowest_index(lms_table, age)
+
+
+@pytest.mark.parametrize("lms_table", LMS_TABLES)
+def test_nearest_lowest_index_for_days_matches_decimal_age(lms_table):
+    first_days = math.floor(lms_table.decimal_ages[0] * 365.25)
+    last_days = math.ceil(lms_table.decimal_ages[-1] * 365.25)
+    for days in range(first_days - 3, last_days + 4):
+        age = days / 365.25
+        assert days_for_age(age) == days
+        index = lms_table.nearest_lowest_index(age)
+        assert lms_table.nearest_lowest_index_for_days(days) == (index, round(lms_table.decimal_ages[index], 4) == round(age, 4))
+
+
+def test_days_for_age():
+    assert days_for_age(8.0) == 2922
+    assert days_for_age(-0.2026009582477755) == -74
+    assert days_for_age(1 / 12) is None
+    assert days_for_age(float("nan")) is None
+    assert days_for_age(None) is None
+
+
+def test_fetch_lms_accepts_list():
+    lms_table = UK90_CHILD_DATA["measurement"]["weight"]["male"]
+    for age in [4.0, 4.01, 10.5, 19.99]:
+        assert global_functions.fetch_lms(age, list(lms_table)) == global_functions.fetch_lms(age, lms_table)
+
+
+@pytest.mark.parametrize("lms_table", LMS_TABLES)
+def test_piecewise_matches_interpolation(lms_table):
+    """
+    The precomputed polynomials must agree with Tim Cole's cubic to within 1e-12, and linear intervals
+    must be the same arithmetic as linear_interpolation
+    """
+    random.seed(len(lms_table))
+    piecewise = lms_table.piecewise
+    ages = lms_table.decimal_ages
+    parameters = [lms_table.l, lms_table.m, lms_table.s] + ([lms_table.sigma] if lms_table.sigma is not None else [])
+    for interval in range(len(lms_table) - 1):
+        if any(isinstance(parameter_values[interval], str) for parameter_values in parameters):
+            continue
+        for age in [random.uniform(ages[interval], ages[interval + 1]) for _ in range(5)]:
+            values = piecewise(age, interval=interval)
+            assert piecewise.interval(age) == interval
+            for value, parameter_values in zip(values, parameters):
+                if piecewise.cubic[interval]:
+                    expected = global_functions.cubic_interpolation(
+                        age=age,
+                        age_one_below=ages[interval],
+                        age_two_below=ages[interval - 1],
+                        age_one_above=ages[interval + 1],
+                        age_two_above=ages[interval + 2],
+                        parameter_two_below=parameter_values[interval - 1],
+                        parameter_one_below=parameter_values[interval],
+                        parameter_one_above=parameter_values[interval + 1],
+                        parameter_two_above=parameter_values[interval + 2],
+                    )
+                    assert value == pytest.approx(expected, abs=1e-12)
+                else:
+                    assert value == global_functions.linear_interpolation(
+                        age=age,
+                        age_one_below=ages[interval],
+                        age_one_above=ages[interval + 1],
+                        parameter_one_below=parameter_values[interval],
+                        parameter_one_above=parameter_values[interval + 1],
+                    )
+
+
+def test_piecewise_linear_interval_rejects_ages_outside():
+    piecewise = CDC_CHILD_DATA["measurement"]["bmi"]["male"].piecewise
+    assert not any(piecewise.cubic)
+    with pytest.raises(ValueError):
+        piecewise(piecewise.decimal_ages[0] - 0.1, interval=0)
+
+
+@pytest.fixture
+def lms_grid():
+    # the grid settings are shared by the process, so are restored after each test
+    LMS_GRID.configure(enabled=True, resolution=DEFAULT_LMS_GRID_RESOLUTION, max_memory=DEFAULT_LMS_GRID_MAX_MEMORY)
+    yield LMS_GRID
+    LMS_GRID.configure(enabled=False, resolution=DEFAULT_LMS_GRID_RESOLUTION, max_memory=DEFAULT_LMS_GRID_MAX_MEMORY)
+
+
+def test_lms_grid_within_documented_deviation(lms_grid):
+    """
+    SDS from the grids must be within the documented deviation of the exact interpolation for every validation row
+    """
+    with open(os.path.abspath(os.path.dirname(__file__)) + "/sds_age_validation_2021.json") as f:
+        rows = [
+            (float(line[age_type]), line["measurement_method"], float(line["observation_value"]), line["sex"])
+            for line in json.load(f)
+            for age_type in ["chronological_age", "corrected_age"]
+        ]
+
+    def sds_for_rows():
+        LMS_CACHE.clear()
+        sds = []
+        for age, measurement_method, observation_value, sex in rows:
+            try:
+                sds.append(global_functions.sds_for_measurement(
+                    reference=UK_WHO, age=age, measurement_method=measurement_method, observation_value=observation_value, sex=sex))
+            except LookupError:
+                sds.append(None)
+        return sds
+
+    grid_sds = sds_for_rows()
+    assert lms_grid.info().tables > 0
+    lms_grid.configure(enabled=False)
+    exact_sds = sds_for_rows()
+
+    assert [sds is None for sds in grid_sds] == [sds is None for sds in exact_sds]
+    deviations = [abs(grid - exact) for grid, exact in zip(grid_sds, exact_sds) if exact is not None]
+    assert max(deviations) <= LMS_GRID.MAX_SDS_DEVIATION
+
+
+def test_lms_grid_memory_limit(lms_grid):
+    small_table = UK90_CHILD_DATA["measurement"]["height"]["male"]
+    lms_grid.configure(max_memory=1000)
+    assert lms_grid.grid_for(small_table) is None
+    lms_grid.configure(resolution=1.0)
+    grid = lms_grid.grid_for(small_table)
+    assert grid.step <= 1.0
+    info = lms_grid.info()
+    assert info.memory <= 1000 and info.tables == 1
+    # ages outside the grid (and tables without one) are interpolated exactly
+    assert grid(small_table.decimal_ages[-1] + 0.5) is None
+    assert grid(small_table.decimal_ages[0])["m"] == small_table.m[0]
+
+
+def test_lms_grid_skips_missing_values(lms_grid):
+    assert lms_grid.grid_for(UK90_PRETERM_DATA["measurement"]["bmi"]["male"]) is None
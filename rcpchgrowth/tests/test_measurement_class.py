@@ -8,7 +8,7 @@ from pprint import pprint
 import pytest
 
 # rcpch imports
-from rcpchgrowth import Measurement
+from rcpchgrowth import Measurement, MeasurementResult
 from rcpchgrowth.constants import BMI
 
 # the ACCURACY constant defines the accuracy of the test comparisons
@@ -90,4 +90,240 @@ def test_measurement_class_ukwho_data(line):
         assert measurement_object.measurement[
             "measurement_calculated_values"]['chronological_sds'] == pytest.approx(
             line["chronological_sds"], abs=ACCURACY)
-    
\ No newline at end of file
+    
+
+@pytest.fixture
+def lms_lookups(monkeypatch):
+    # counts the LMS lookups made by the Measurement class
+    from rcpchgrowth import measurement
+
+    ages = []
+    lms_for_reference = measurement.lms_for_reference
+
+    def counting_lms_for_reference(**kwargs):
+        ages.append(kwargs["age"])
+        return lms_for_reference(**kwargs)
+
+    monkeypatch.setattr(measurement, "lms_for_reference", counting_lms_for_reference)
+    return ages
+
+
+def test_one_lms_lookup_for_term_baby(lms_lookups):
+    measurement = Measurement(
+        sex="female",
+        birth_date=datetime(2015, 3, 1),
+        observation_date=datetime(2023, 7, 12),
+        measurement_method=BMI,
+        observation_value=17.2,
+        reference="uk-who",
+        gestation_weeks=40,
+        gestation_days=0,
+    ).measurement
+    calculated = measurement["measurement_calculated_values"]
+    assert len(lms_lookups) == 1
+    assert calculated["corrected_sds"] == calculated["chronological_sds"]
+    assert calculated["corrected_centile_band"] == calculated["chronological_centile_band"]
+    assert calculated["corrected_percentage_median_bmi"] == calculated["chronological_percentage_median_bmi"]
+
+
+def test_one_lms_lookup_per_age_for_preterm_baby(lms_lookups):
+    from rcpchgrowth.global_functions import percentage_median_bmi, sds_for_measurement
+
+    measurement = Measurement(
+        sex="male",
+        birth_date=datetime(2022, 3, 1),
+        observation_date=datetime(2022, 9, 12),
+        measurement_method=BMI,
+        observation_value=16.8,
+        reference="uk-who",
+        gestation_weeks=30,
+        gestation_days=2,
+    ).measurement
+    dates = measurement["measurement_dates"]
+    calculated = measurement["measurement_calculated_values"]
+    assert lms_lookups == [dates["corrected_decimal_age"], dates["chronological_decimal_age"]]
+    for age_type in ["corrected", "chronological"]:
+        age = dates[f"{age_type}_decimal_age"]
+        assert calculated[f"{age_type}_sds"] == sds_for_measurement(
+            reference="uk-who", age=age, measurement_method=BMI, observation_value=16.8, sex="male")
+        assert calculated[f"{age_type}_percentage_median_bmi"] == percentage_median_bmi(
+            reference="uk-who", age=age, actual_bmi=16.8, sex="male")
+
+
+def test_measurement_result_builds_dictionaries_on_demand():
+    measurement = Measurement(
+        sex="male",
+        birth_date=datetime(2022, 3, 1),
+        observation_date=datetime(2022, 4, 1),
+        measurement_method="weight",
+        observation_value=1.9,
+        reference="uk-who",
+        gestation_weeks=30,
+        gestation_days=2,
+        events_text=["clinic"],
+    )
+    result = measurement.result
+    assert isinstance(result, MeasurementResult)
+    assert not hasattr(result, "__dict__")
+    assert "measurement" not in vars(measurement)
+
+    legacy = measurement.measurement
+    assert legacy == result.to_dict()
+    assert legacy is measurement.measurement
+    assert measurement.plottable_centile_data is legacy["plottable_data"]["centile_data"]
+    assert measurement.ages_object["measurement_dates"] is legacy["measurement_dates"]
+    assert measurement.calculated_measurements_object["measurement_calculated_values"] is legacy[
+        "measurement_calculated_values"]
+
+    calculated = legacy["measurement_calculated_values"]
+    assert (result.corrected_sds, result.chronological_centile) == (
+        calculated["corrected_sds"], calculated["chronological_centile"])
+    corrected_data = legacy["plottable_data"]["sds_data"]["corrected_decimal_age_data"]
+    assert corrected_data["y"] == result.corrected_sds
+    assert corrected_data["corrected_gestational_age"] == "34 + 5 weeks"
+    assert legacy["events_data"]["events_text"] == ["clinic"]
+
+    with pytest.raises(TypeError):
+        MeasurementResult(not_a_field=1)
+
+
+def test_centile_bands_are_worded_when_first_read(monkeypatch):
+    from rcpchgrowth import measurement as measurement_module
+
+    calls = []
+    for name in ["centile_band_code", "centile_band_for_code"]:
+        def counting(*args, _function=getattr(measurement_module, name), **kwargs):
+            calls.append(_function.__name__)
+            return _function(*args, **kwargs)
+        monkeypatch.setattr(measurement_module, name, counting)
+
+    measurement = Measurement(
+        sex="male",
+        birth_date=datetime(2022, 3, 1),
+        observation_date=datetime(2022, 9, 12),
+        measurement_method=BMI,
+        observation_value=16.8,
+        reference="uk-who",
+        gestation_weeks=30,
+        gestation_days=2,
+    )
+    # the bands are found when the measurement is made, and only worded when read
+    assert calls == ["centile_band_code", "centile_band_code"]
+    assert measurement.result.chronological_calendar_age == "6 months, 1 week and 4 days"
+    assert measurement.result.lay_corrected_decimal_age_comment.startswith("Because your child was born at 30+2 weeks")
+    assert len(calls) == 2
+
+    legacy = measurement.measurement
+    assert calls[2:] == ["centile_band_for_code", "centile_band_for_code"]
+    assert legacy["measurement_calculated_values"]["corrected_centile_band"].startswith("This body mass index")
+    assert measurement.measurement is legacy and len(calls) == 4
+
+
+def test_string_errors_are_reported_when_the_measurement_is_made(monkeypatch):
+    from rcpchgrowth import measurement as measurement_module
+
+    def failing(*args, **kwargs):
+        raise ValueError("failed")
+
+    monkeypatch.setattr(measurement_module, "comment_prematurity_correction", failing)
+    monkeypatch.setattr(measurement_module, "centile_band_code", failing)
+    measurement = Measurement(
+        sex="male",
+        birth_date=datetime(2022, 3, 1),
+        observation_date=datetime(2022, 9, 12),
+        measurement_method=BMI,
+        observation_value=16.8,
+        reference="uk-who",
+        gestation_weeks=30,
+        gestation_days=2,
+    )
+    result = measurement.result
+    assert result.corrected_decimal_age_error == "Error in comment on corrected decimal age."
+    assert result.corrected_measurement_error == "Not possible to calculate centile"
+    assert result.corrected_centile_band is None and result.lay_corrected_decimal_age_comment is None
+    # nothing is left to fail when the values are read
+    assert measurement.measurement["measurement_calculated_values"]["corrected_sds"] == result.corrected_sds
+
+
+def test_string_errors_are_found_without_wording_the_strings():
+    # the EDD is after the observation date, so there is no corrected calendar age
+    measurement = Measurement(
+        sex="female",
+        birth_date=datetime(2022, 3, 1),
+        observation_date=datetime(2022, 3, 20),
+        measurement_method="weight",
+        observation_value=1.2,
+        reference="uk-who",
+        gestation_weeks=28,
+        gestation_days=0,
+    )
+    assert measurement.result.corrected_calendar_age is None
+    assert measurement.result.chronological_decimal_age_error is None
+    assert measurement.result.chronological_calendar_age == "2 weeks and 5 days"
+
+
+def test_profiles_calculate_only_the_fields_asked_for(monkeypatch):
+    from rcpchgrowth import measurement as measurement_module
+
+    calls = []
+    for name in ["chronological_calendar_age", "comment_prematurity_correction", "centile_band_code", "centile"]:
+        def counting(*args, _function=getattr(measurement_module, name), **kwargs):
+            calls.append(_function.__name__)
+            return _function(*args, **kwargs)
+        monkeypatch.setattr(measurement_module, name, counting)
+
+    arguments = dict(
+        sex="male",
+        birth_date=datetime(2022, 3, 1),
+        observation_date=datetime(2022, 9, 12),
+        measurement_method=BMI,
+        observation_value=16.8,
+        reference="uk-who",
+        gestation_weeks=30,
+        gestation_days=2,
+    )
+    full = Measurement(**arguments).measurement
+    calls.clear()
+
+    minimal = Measurement(**arguments, profile="minimal")
+    assert minimal.measurement == {
+        "measurement_calculated_values": {
+            name: full["measurement_calculated_values"][name]
+            for name in ["corrected_sds", "chronological_sds", "corrected_measurement_error", "chronological_measurement_error"]
+        }
+    }
+    assert minimal.result.corrected_centile is None and minimal.result.corrected_percentage_median_bmi is None
+    assert minimal.plottable_centile_data is None
+    assert calls == []
+
+    numeric = Measurement(**arguments, profile="numeric").measurement["measurement_calculated_values"]
+    assert numeric == {
+        name: value for name, value in full["measurement_calculated_values"].items() if not name.endswith("_band")}
+    assert calls == ["centile", "centile"]
+    calls.clear()
+
+    plottable = Measurement(**arguments, profile="plottable").measurement
+    assert plottable == {
+        section: full[section] for section in ["child_observation_value", "measurement_calculated_values", "plottable_data"]}
+
+    chosen = Measurement(**arguments, fields=["birth_data", "corrected_percentage_median_bmi"]).measurement
+    assert chosen == {
+        "birth_data": full["birth_data"],
+        "measurement_calculated_values": {
+            "corrected_percentage_median_bmi": full["measurement_calculated_values"]["corrected_percentage_median_bmi"]},
+    }
+
+
+def test_unknown_profile_or_field():
+    arguments = dict(
+        sex="female",
+        birth_date=datetime(2020, 1, 1),
+        observation_date=datetime(2022, 1, 1),
+        measurement_method="height",
+        observation_value=85.0,
+        reference="uk-who",
+    )
+    with pytest.raises(ValueError, match="profile"):
+        Measurement(**arguments, profile="everything")
+    with pytest.raises(ValueError, match="corrected_z"):
+        Measurement(**arguments, fields=["corrected_z"])
@@ -0,0 +1,92 @@
+"""
+Tests for the standard library normal distribution functions, which replace scipy.stats.norm
+"""
+
+# standard imports
+import math
+import random
+import subprocess
+import sys
+
+# third-party imports
+import numpy as np
+import pytest
+
+# rcpch imports
+from rcpchgrowth import batch_functions, global_functions, normal_distribution
+from rcpchgrowth.normal_distribution import normal_cdf, normal_cdf_array, normal_ppf, normal_ppf_array
+
+ACCURACY = 1e-14
+
+
+def test_normal_cdf_matches_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    random.seed(2024)
+    for z in [random.uniform(-8, 8) for _ in range(10000)] + [-math.inf, 0.0, math.inf]:
+        # math.erfc and scipy differ in the last few digits far into the tails
+        assert normal_cdf(z) == pytest.approx(stats.norm.cdf(z), rel=1e-12, abs=1e-300)
+
+
+def test_normal_ppf_matches_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    random.seed(2024)
+    probabilities = (
+        [random.random() for _ in range(10000)]
+        + [10 ** -random.uniform(0, 300) for _ in range(1000)]
+        + [1 - 10 ** -random.uniform(0, 15) for _ in range(1000)]
+    )
+    for p in probabilities:
+        assert normal_ppf(p) == pytest.approx(stats.norm.ppf(p), rel=ACCURACY, abs=ACCURACY)
+
+
+def test_normal_ppf_limits():
+    assert normal_ppf(0.5) == 0
+    assert normal_ppf(0) == -math.inf
+    assert normal_ppf(1) == math.inf
+    assert math.isnan(normal_ppf(1.5))
+    assert math.isnan(normal_ppf(-0.5))
+    assert math.isnan(normal_ppf(math.nan))
+
+
+def test_normal_ppf_inverts_normal_cdf():
+    # probabilities close to 1 have too few significant digits to invert precisely, so the upper tail is not tested
+    for z in np.linspace(-6, 1, 71):
+        assert normal_ppf(normal_cdf(z)) == pytest.approx(z, abs=1e-12)
+
+
+def test_batch_functions_without_scipy(monkeypatch):
+    # the batch functions fall back to the NumPy versions of the normal distribution where scipy is not installed
+    z = np.array([-3.0, 0.0, 1.645, 2.5])
+    expected_centiles = batch_functions.centiles(z)
+    monkeypatch.setattr(normal_distribution, "_scipy_special", lambda: None)
+    centiles = batch_functions.centiles(z)
+    assert centiles == pytest.approx(expected_centiles, rel=ACCURACY)
+    assert normal_ppf_array(centiles / 100) == pytest.approx(z, abs=1e-12)
+
+
+def test_array_fallbacks_match_scalar_functions(monkeypatch):
+    monkeypatch.setattr(normal_distribution, "_scipy_special", lambda: None)
+    rng = np.random.default_rng(2024)
+    z = np.concatenate([rng.uniform(-37, 8, 10000), [-np.inf, -1.0, 0.0, 0.5, 1.0, np.inf, np.nan]])
+    expected = [normal_cdf(value) for value in z]
+    assert normal_cdf_array(z) == pytest.approx(expected, rel=1e-13, abs=0, nan_ok=True)
+    p = np.concatenate([
+        rng.random(10000), 10 ** -rng.uniform(0, 300, 1000), 1 - 10 ** -rng.uniform(0, 15, 1000),
+        [0.0, 0.5, 1.0, -0.5, 1.5, np.nan],
+    ])
+    expected = [normal_ppf(value) for value in p]
+    assert normal_ppf_array(p) == pytest.approx(expected, rel=ACCURACY, abs=ACCURACY, nan_ok=True)
+
+
+def test_import_does_not_need_scipy():
+    # blocking scipy makes any import of it fail: rcpchgrowth must import and calculate without it
+    code = (
+        "import sys; sys.modules['scipy'] = None\n"
+        "from rcpchgrowth import Measurement, batch_functions, global_functions\n"
+        "assert batch_functions.centiles([0.0])[0] == 50\n"
+        "print(repr(global_functions.sds_for_measurement('uk-who', 10.0, 'height', 140.0, 'female')))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    expected = global_functions.sds_for_measurement("uk-who", 10.0, "height", 140.0, "female")
+    assert float(result.stdout) == pytest.approx(expected, abs=1e-12)
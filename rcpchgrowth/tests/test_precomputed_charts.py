@@ -0,0 +1,94 @@
+"""
+Tests for the precomputed standard charts
+"""
+
+# standard imports
+import gzip
+import json
+
+# third-party imports
+import pytest
+
+# rcpch imports
+from rcpchgrowth import chart_bytes, create_chart, precomputed_charts
+from rcpchgrowth.precomputed_charts import (
+    PRECOMPUTED_CHARTS_FILE,
+    PrecomputedCharts,
+    check_precomputed_charts,
+    encode_chart,
+    source_hash,
+    standard_charts,
+    write_precomputed_charts,
+)
+from rcpchgrowth.constants import (
+    UK_WHO, CDC, HEIGHT, BMI, FEMALE, MALE, THREE_PERCENT_CENTILES, IDENTITY_CHART_ENCODING, GZIP_CHART_ENCODING
+)
+
+
+@pytest.fixture(scope="module")
+def built_charts(tmp_path_factory):
+    # the charts file is built with the package, so is built here as setup.py would
+    return write_precomputed_charts(tmp_path_factory.mktemp("data_tables") / PRECOMPUTED_CHARTS_FILE)
+
+
+@pytest.fixture
+def precomputed(built_charts, monkeypatch):
+    precomputed = PrecomputedCharts(file_path=built_charts)
+    monkeypatch.setattr(precomputed_charts, "PRECOMPUTED_CHARTS", precomputed)
+    return precomputed
+
+
+def test_built_charts_match_create_chart(precomputed):
+    assert precomputed.available()
+    assert precomputed.source_hash() == source_hash()
+    assert len(list(standard_charts())) == 240
+    assert check_precomputed_charts(precomputed) == []
+
+
+def test_chart_bytes_match_create_chart(precomputed):
+    compressed = chart_bytes(reference=CDC, centile_format=THREE_PERCENT_CENTILES, measurement_method=BMI, sex=MALE)
+    uncompressed = chart_bytes(
+        reference=CDC, centile_format=THREE_PERCENT_CENTILES, measurement_method=BMI, sex=MALE,
+        encoding=IDENTITY_CHART_ENCODING)
+    chart = create_chart(reference=CDC, centile_format=THREE_PERCENT_CENTILES, measurement_method=BMI, sex=MALE)
+    assert gzip.decompress(compressed) == uncompressed == encode_chart(chart)
+    assert json.loads(uncompressed) == chart
+
+    # named centile formats ignore is_sds
+    assert chart_bytes(reference=UK_WHO, is_sds=True) == chart_bytes(
+        reference=UK_WHO, measurement_method=HEIGHT, sex=FEMALE, encoding=GZIP_CHART_ENCODING)
+    assert encode_chart(create_chart(reference=UK_WHO, is_sds=True)) == chart_bytes(
+        reference=UK_WHO, encoding=IDENTITY_CHART_ENCODING)
+
+
+@pytest.mark.parametrize(
+    "reference, centile_format, measurement_method",
+    [
+        (UK_WHO, [2, 50, 98], HEIGHT),
+        (UK_WHO, "not-a-format", HEIGHT),
+        (UK_WHO, THREE_PERCENT_CENTILES, "not-a-measurement"),
+        ("uk90", THREE_PERCENT_CENTILES, HEIGHT),
+        ([UK_WHO], THREE_PERCENT_CENTILES, HEIGHT),
+    ]
+)
+def test_charts_not_precomputed(precomputed, reference, centile_format, measurement_method):
+    assert chart_bytes(reference=reference, centile_format=centile_format, measurement_method=measurement_method) is None
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError, match="encoding"):
+        chart_bytes(reference=UK_WHO, encoding="br")
+
+
+def test_missing_or_other_format_file_is_not_used(built_charts, tmp_path):
+    assert not PrecomputedCharts(file_name="missing.bin").available()
+    assert not PrecomputedCharts(file_path=tmp_path / "missing.bin").available()
+
+    with open(built_charts, "rb") as built_file:
+        contents = bytearray(built_file.read())
+    contents[8] += 1  # the format version
+    other_format = tmp_path / PRECOMPUTED_CHARTS_FILE
+    other_format.write_bytes(contents)
+    other = PrecomputedCharts(file_path=other_format)
+    assert not other.available()
+    assert other.get(UK_WHO, HEIGHT, FEMALE, THREE_PERCENT_CENTILES) is None
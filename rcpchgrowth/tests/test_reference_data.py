@@ -0,0 +1,114 @@
+"""
+Tests for loading the reference data on first use
+"""
+
+# standard imports
+import json
+import subprocess
+import sys
+import threading
+
+# third-party imports
+import pytest
+
+# rcpch imports
+from rcpchgrowth import uk_who, who, cdc, reference_data
+from rcpchgrowth.reference_data import ReferenceDataLoader, REFERENCE_DATA
+
+
+def test_import_loads_no_reference_data():
+    code = (
+        "from rcpchgrowth import Measurement, global_functions, create_chart\n"
+        "from rcpchgrowth.reference_data import REFERENCE_DATA\n"
+        "print(len(REFERENCE_DATA.loaded()))\n"
+        "global_functions.sds_for_measurement('uk-who', 10.0, 'height', 140.0, 'female')\n"
+        "print(','.join(REFERENCE_DATA.loaded()))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["0", "uk90_child.json"]
+
+
+def test_tables_are_shared_between_references():
+    assert uk_who.WHO_INFANTS_DATA is who.WHO_INFANTS_DATA is cdc.WHO_INFANTS_DATA
+    assert uk_who.WHO_INFANTS_DATA is REFERENCE_DATA.load("who_infants.json")
+    assert uk_who.uk_who_reference(age=1.0) is uk_who.WHO_INFANTS_DATA
+
+
+@pytest.mark.parametrize(
+    "select_reference, age",
+    [
+        (lambda age: uk_who.uk_who_reference(age=age), -0.5),
+        (lambda age: uk_who.uk_who_reference(age=age), 20.5),
+        (lambda age: cdc.cdc_reference(age=age, measurement_method="height"), 20.5),
+    ]
+)
+def test_reference_selection_raises_outside_reference(select_reference, age):
+    with pytest.raises(ValueError):
+        select_reference(age)
+
+
+@pytest.mark.parametrize("use_compiled", [True, False])
+def test_concurrent_first_access_loads_once(monkeypatch, use_compiled):
+    loader = ReferenceDataLoader(use_compiled=use_compiled)
+    loaded = []
+    for name in ["load_compiled_reference_data", "columnar_reference_data"]:
+        def counting(*args, _load=getattr(reference_data, name), **kwargs):
+            loaded.append(_load)
+            return _load(*args, **kwargs)
+        monkeypatch.setattr(reference_data, name, counting)
+    start = threading.Barrier(8)
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(loader.load("turner.json"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loaded) == 1
+    assert all(result is results[0] for result in results)
+    assert loader.loaded() == ["turner.json"]
+
+
+def test_unknown_module_attribute():
+    with pytest.raises(AttributeError, match="NOT_A_TABLE"):
+        uk_who.NOT_A_TABLE
+
+
+def test_reference_data_is_read_only():
+    uk90_child_data = REFERENCE_DATA.load("uk90_child.json")
+    with pytest.raises(TypeError):
+        uk90_child_data["measurement"]["height"]["male"] = []
+    lms_table = uk90_child_data["measurement"]["height"]["male"]
+    with pytest.raises(TypeError):
+        lms_table.m[0] = 0.0
+    # the LMS dictionaries of a table are shared by every caller, so cannot be changed either
+    with pytest.raises(TypeError):
+        lms_table[100]["M"] = 1.0
+    assert lms_table[100]["M"] == lms_table.m[100] != 1.0
+    preterm_bmi = REFERENCE_DATA.load("uk90_preterm.json")["measurement"]["bmi"]["male"]
+    assert isinstance(preterm_bmi.l, tuple)
+    weight_for_height = REFERENCE_DATA.load("trisomy_21_aap_infants.json")["measurement"]["weight_height"]["male"]
+    assert isinstance(weight_for_height, tuple)
+    with pytest.raises(TypeError):
+        weight_for_height[0]["L"] = 0.0
+    with pytest.raises(TypeError):
+        weight_for_height[0] = {}
+
+
+def test_selected_reference_data_is_plain():
+    # the public select functions return plain lists of dictionaries, which can be serialised and changed
+    from rcpchgrowth import select_reference_data_for_uk_who_chart, select_reference_data_for_trisomy_21
+    for selected in [
+        select_reference_data_for_uk_who_chart("uk90_child", "height", "male"),
+        select_reference_data_for_trisomy_21("height", "female"),
+    ]:
+        assert type(selected) is list and all(type(lms) is dict for lms in selected)
+        assert json.loads(json.dumps(selected)) == selected
+        selected[0]["M"] = -1.0
+    assert select_reference_data_for_uk_who_chart("uk90_child", "height", "male")[0]["M"] != -1.0
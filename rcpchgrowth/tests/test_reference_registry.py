@@ -0,0 +1,179 @@
+"""
+Tests for the reference registry used by the calculation and chart functions
+"""
+
+# third-party imports
+import pytest
+
+# rcpch imports
+from rcpchgrowth import create_chart, global_functions
+from rcpchgrowth.reference_registry import REFERENCE_REGISTRY, reference_for
+from rcpchgrowth.constants import (
+    REFERENCES,
+    UK_WHO,
+    CDC,
+    WHO,
+    UK_WHO_REFERENCES,
+    CDC_REFERENCES,
+    WHO_REFERENCES,
+    TRISOMY_21_AAP,
+    TRISOMY_21_AAP_REFERENCES,
+    CDC_INFANT,
+    CDC_CHILD,
+    TRISOMY_21_AAP_INFANT,
+    TRISOMY_21_AAP_CHILD,
+    UK90_PRETERM,
+    UK_WHO_INFANT,
+    UK_WHO_CHILD,
+    UK90_CHILD,
+    HEIGHT,
+    WEIGHT,
+    BMI,
+    HEAD_CIRCUMFERENCE,
+    FEMALE,
+    MALE,
+    FORTY_TWO_WEEKS_GESTATION,
+    STATUS_AGE_ABOVE_MEASUREMENT_DATA,
+    CDC_TO_THREE_AGE,
+    CDC_TO_TWO_AGE,
+    WHO_2006_UNDER_TWOS_AGES,
+)
+
+
+def test_every_reference_is_registered():
+    assert sorted(REFERENCE_REGISTRY) == sorted(REFERENCES)
+    for reference in REFERENCE_REGISTRY.values():
+        assert reference.create_chart is not None
+        assert reference.segments
+
+
+@pytest.mark.parametrize(
+    "reference, reference_names",
+    [(UK_WHO, UK_WHO_REFERENCES), (CDC, CDC_REFERENCES), (WHO, WHO_REFERENCES), (TRISOMY_21_AAP, TRISOMY_21_AAP_REFERENCES)],
+)
+def test_segments_match_reference_names(reference, reference_names):
+    assert list(reference_for(reference).segments) == reference_names
+
+
+def test_unknown_reference():
+    with pytest.raises(ValueError, match="No or incorrect reference supplied"):
+        reference_for("uk-who-2")
+    with pytest.raises(ValueError):
+        global_functions.lms_value_array_for_measurement_for_reference(
+            reference="uk-who-2", age=2.0, measurement_method=HEIGHT, sex=FEMALE)
+    with pytest.raises(LookupError):
+        reference_for(UK_WHO).segment(CDC_INFANT)
+    assert create_chart("uk-who-2") is None
+
+
+def test_centile_ages_by_measurement_method():
+    cdc_infant = reference_for(CDC).segment(CDC_INFANT)
+    assert cdc_infant.ages_for_centiles(HEAD_CIRCUMFERENCE) is CDC_TO_THREE_AGE
+    assert cdc_infant.ages_for_centiles(HEIGHT) is WHO_2006_UNDER_TWOS_AGES
+    assert cdc_infant.ages_for_centiles(WEIGHT) is WHO_2006_UNDER_TWOS_AGES
+    assert cdc_infant.ages_for_centiles(BMI) is CDC_TO_TWO_AGE
+
+
+def test_disjunction_ages():
+    uk_who = reference_for(UK_WHO)
+    assert uk_who.segment(UK_WHO_INFANT).should_default_to_youngest_reference(2)
+    assert uk_who.segment(UK_WHO_INFANT).should_default_to_youngest_reference(2.0)
+    assert not uk_who.segment(UK_WHO_INFANT).should_default_to_youngest_reference(4)
+    assert uk_who.segment(UK_WHO_CHILD).should_default_to_youngest_reference(4)
+    assert not uk_who.segment(UK90_CHILD).should_default_to_youngest_reference(4)
+
+
+@pytest.mark.parametrize(
+    "reference, age, measurement_method, default_youngest_reference, reference_name",
+    [
+        (UK_WHO, FORTY_TWO_WEEKS_GESTATION, WEIGHT, False, UK_WHO_INFANT),
+        (UK_WHO, FORTY_TWO_WEEKS_GESTATION, WEIGHT, True, UK90_PRETERM),
+        (UK_WHO, 4.0, HEIGHT, False, UK90_CHILD),
+        (UK_WHO, 4.0, HEIGHT, True, UK_WHO_CHILD),
+        (UK_WHO, 20.0, HEIGHT, False, UK90_CHILD),
+        (CDC, 2.0, HEIGHT, True, CDC_INFANT),
+        (CDC, 2.0, HEIGHT, False, CDC_CHILD),
+        (CDC, 3.0, HEAD_CIRCUMFERENCE, False, CDC_INFANT),
+        (TRISOMY_21_AAP, 3.0, HEIGHT, False, TRISOMY_21_AAP_INFANT),
+        (TRISOMY_21_AAP, 3.0, HEAD_CIRCUMFERENCE, False, TRISOMY_21_AAP_CHILD),
+        (TRISOMY_21_AAP, 3.0, HEAD_CIRCUMFERENCE, True, TRISOMY_21_AAP_INFANT),
+        (TRISOMY_21_AAP, 1.0, BMI, True, TRISOMY_21_AAP_CHILD),
+    ]
+)
+def test_segment_for_age(reference, age, measurement_method, default_youngest_reference, reference_name):
+    assert reference_for(reference).segment_for_age(
+        age, measurement_method, default_youngest_reference).name == reference_name
+
+
+def test_absence_rules():
+    uk_who = reference_for(UK_WHO)
+    assert uk_who.reference_data_absent(age=17.5, measurement_method=HEAD_CIRCUMFERENCE, sex=MALE) == (False, "")
+    absent, reason = uk_who.reference_data_absent(age=17.5, measurement_method=HEAD_CIRCUMFERENCE, sex=FEMALE)
+    assert absent and "girls over 17 y" in reason
+    [rule] = [rule for rule in uk_who.absence_rules if rule.reason == reason]
+    assert rule.status == STATUS_AGE_ABOVE_MEASUREMENT_DATA
+    with pytest.raises(LookupError, match="girls over 17 y"):
+        uk_who.lms_value_array_for_measurement(age=17.5, measurement_method=HEAD_CIRCUMFERENCE, sex=FEMALE)
+    with pytest.raises(LookupError, match="There is no UK-WHO reference for the age supplied."):
+        uk_who.lms_value_array_for_measurement(age=None, measurement_method=HEIGHT, sex=FEMALE)
+
+
+def test_centile_line_runs_to_disjunction():
+    # at 2 years the UK-WHO infant line takes the infant (lying length) values, the child line the standing height
+    infant_line = global_functions.generate_centile(
+        z=0, centile=50, measurement_method=HEIGHT, sex=FEMALE, reference=UK_WHO, reference_name=UK_WHO_INFANT)
+    child_line = global_functions.generate_centile(
+        z=0, centile=50, measurement_method=HEIGHT, sex=FEMALE, reference=UK_WHO, reference_name=UK_WHO_CHILD)
+    assert infant_line[-1]["x"] == child_line[0]["x"] == 2
+    assert infant_line[-1]["y"] == global_functions.measurement_from_sds(
+        reference=UK_WHO, requested_sds=0, measurement_method=HEIGHT, sex=FEMALE, age=2, default_youngest_reference=True)
+    assert child_line[0]["y"] == global_functions.measurement_from_sds(
+        reference=UK_WHO, requested_sds=0, measurement_method=HEIGHT, sex=FEMALE, age=2)
+    assert infant_line[-1]["y"] != child_line[0]["y"]
+
+
+@pytest.mark.parametrize(
+    "reference, reference_names, measurement_method",
+    [
+        (UK_WHO, UK_WHO_REFERENCES, HEIGHT),
+        (UK_WHO, UK_WHO_REFERENCES, BMI),
+        (CDC, CDC_REFERENCES, BMI),
+        (CDC, CDC_REFERENCES, HEAD_CIRCUMFERENCE),
+        (TRISOMY_21_AAP, TRISOMY_21_AAP_REFERENCES, WEIGHT),
+    ]
+)
+@pytest.mark.parametrize("is_sds", [False, True])
+def test_centiles_generated_together_match_points_calculated_one_by_one(
+        reference, reference_names, measurement_method, is_sds):
+    # each age is looked up once for all the lines, with the same disjunction handling as each point on its own
+    z_scores = [-2.6667, -0.6667, 0, 1.6, 2.5, 4.0]
+    centiles = [global_functions.centile(z) for z in z_scores]
+    reference_entry = reference_for(reference)
+    for reference_name in reference_names:
+        centile_lines = global_functions.generate_centiles(
+            z_scores=z_scores, centiles=centiles, measurement_method=measurement_method, sex=FEMALE,
+            reference=reference, reference_name=reference_name, is_sds=is_sds)
+        segment = reference_entry.segment(reference_name)
+        for line, z, centile in zip(centile_lines, z_scores, centiles):
+            expected = []
+            for age in segment.ages_for_centiles(measurement_method):
+                if reference_entry.reference_data_absent(age=age, measurement_method=measurement_method, sex=FEMALE)[0]:
+                    continue
+                try:
+                    measurement = global_functions.measurement_from_sds(
+                        reference=reference, requested_sds=z, measurement_method=measurement_method, sex=FEMALE,
+                        age=age, default_youngest_reference=segment.should_default_to_youngest_reference(age))
+                except LookupError:
+                    # points without LMS values (eg the CDC infant BMI values, which have no sigma) are skipped
+                    continue
+                expected.append({"l": round(z, 3) if is_sds else centile, "x": round(age, 4), "y": measurement})
+            if is_sds:
+                assert line == expected
+            else:
+                # centile lines round their measurements as numpy did, which can differ in the last place
+                assert [(point["l"], point["x"]) for point in line] == [(point["l"], point["x"]) for point in expected]
+                assert [point["y"] for point in line] == pytest.approx(
+                    [point["y"] for point in expected], abs=1.0001e-4)
+            assert line == global_functions.generate_centile(
+                z=z, centile=centile, measurement_method=measurement_method, sex=FEMALE, reference=reference,
+                reference_name=reference_name, is_sds=is_sds)
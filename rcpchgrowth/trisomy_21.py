@@ -1,7 +1,6 @@
 import json
-from importlib import resources
-from pathlib import Path
 from .constants import *
+from .reference_data import REFERENCE_DATA, returns_plain_reference_data
 # from .global_functions import z_score, cubic_interpolation, linear_interpolation, centile, measurement_for_z, nearest_lowest_index, fetch_lms
 # import timeit #see below, comment back in if timing functions in this module
 
@@ -19,15 +18,22 @@ lms: L, M or S
 reference: reference data
 """
 
-# load the reference data
-data_directory = resources.files("rcpchgrowth.data_tables")
+# the reference data files, loaded on first use through REFERENCE_DATA (see reference_data.py)
+TRISOMY_21_FILE = "trisomy_21.json"
 
+_REFERENCE_DATA_FILES = {
+    "TRISOMY_21_DATA": TRISOMY_21_FILE,
+}
 
 
-data_path = Path(data_directory, "trisomy_21.json")
-with open(data_path) as json_file:
-            TRISOMY_21_DATA = json.load(json_file)
-            json_file.close()
+def __getattr__(name: str):
+    # the tables named in _REFERENCE_DATA_FILES are loaded on first access
+    try:
+        file_name = _REFERENCE_DATA_FILES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return REFERENCE_DATA.load(file_name)
+
 
 def reference_data_absent( 
         age: float,
@@ -43,24 +49,13 @@ def reference_data_absent(
      - There is only BMI reference data until 18.92y
      - Head circumference reference data is available until 18.0y
      - lowest threshold is 0 weeks, upper threshold is 20y
+    These are the absence rules of the Trisomy 21 segment in reference_registry.py.
     """
+    # the registry imports the data file name from this module
+    from .reference_registry import reference_for
+
+    return reference_for(TRISOMY_21).reference_data_absent(age=age, measurement_method=measurement_method, sex=sex)
 
-    if age < 0: # lower threshold of trisomy_21 data
-        return True, "No reference data exists below 40 weeks gestation"
-    
-    if age > TWENTY_YEARS: # upper threshold of trisomy_21 data
-        return True, "Trisomy 21 reference data does not exist over the age of 20y."
-        
-    elif measurement_method == BMI and age > 18.82:
-        return True, f"Trisomy BMI reference data does not exist > 18.82 y."
-    
-    elif measurement_method == HEAD_CIRCUMFERENCE:
-        if age > EIGHTEEN_YEARS:
-            return True, "Trisomy head circumference reference data does not exist > 18 y"
-        else:
-            return False, ""
-    else:
-        return False, ""
 
 def trisomy_21_lms_array_for_measurement_and_sex(
         measurement_method: str,
@@ -68,13 +63,14 @@ def trisomy_21_lms_array_for_measurement_and_sex(
         age: float
     ):
 
-    data_invalid, data_error = reference_data_absent(age=age, measurement_method=measurement_method, sex=sex)
+    from .reference_registry import reference_for
+
+    return reference_for(TRISOMY_21).lms_value_array_for_measurement(
+        age=age, measurement_method=measurement_method, sex=sex
+    )
 
-    if data_invalid:
-        raise LookupError(data_error)
-    else:
-        return TRISOMY_21_DATA["measurement"][measurement_method][sex]
 
+@returns_plain_reference_data
 def select_reference_data_for_trisomy_21(measurement_method:str, sex:str):
     try:
         return_value = trisomy_21_lms_array_for_measurement_and_sex(measurement_method=measurement_method, sex=sex, age=0.0)
@@ -1,7 +1,6 @@
 import json
-from importlib import resources
-from pathlib import Path
 from .constants import *
+from .reference_data import REFERENCE_DATA, returns_plain_reference_data
 # from .global_functions import z_score, cubic_interpolation, linear_interpolation, centile, measurement_for_z, nearest_lowest_index, fetch_lms
 # import timeit #see below, comment back in if timing functions in this module
 
@@ -19,20 +18,24 @@ lms: L, M or S
 reference: reference data
 """
 
-# load the reference data
-data_directory = resources.files("rcpchgrowth.data_tables")
+# the reference data files, loaded on first use through REFERENCE_DATA (see reference_data.py)
+TRISOMY_21_AAP_INFANT_FILE = "trisomy_21_aap_infants.json"
+TRISOMY_21_AAP_CHILD_FILE = "trisomy_21_aap_children.json"
 
+_REFERENCE_DATA_FILES = {
+    "TRISOMY_21_AAP_INFANT_DATA": TRISOMY_21_AAP_INFANT_FILE,
+    "TRISOMY_21_AAP_CHILD_DATA": TRISOMY_21_AAP_CHILD_FILE,
+}
 
 
-data_path = Path(data_directory, "trisomy_21_aap_infants.json")
-with open(data_path) as json_file:
-            TRISOMY_21_AAP_INFANT_DATA = json.load(json_file)
-            json_file.close()
+def __getattr__(name: str):
+    # the tables named in _REFERENCE_DATA_FILES are loaded on first access
+    try:
+        file_name = _REFERENCE_DATA_FILES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return REFERENCE_DATA.load(file_name)
 
-data_path = Path(data_directory, "trisomy_21_aap_children.json")
-with open(data_path) as json_file:
-            TRISOMY_21_AAP_CHILD_DATA = json.load(json_file)
-            json_file.close()
 
 def reference_data_absent( 
         age: float,
@@ -48,21 +51,16 @@ def reference_data_absent(
      - There is only BMI reference data until 20y
      - Head circumference reference data is available until 18.0y
      - lowest threshold is 1 month, upper threshold is 20y
+    These are the absence rules of the Trisomy 21 (AAP) segments in reference_registry.py.
     """
+    # the registry imports the data file names from this module
+    from .reference_registry import reference_for
+
+    data_invalid, data_error = reference_for(TRISOMY_21_AAP).reference_data_absent(
+        age=age, measurement_method=measurement_method, sex=sex
+    )
+    return data_invalid, data_error if data_invalid else None
 
-    if age < 0: # lower threshold of trisomy_21 data
-        return True, "No Trisomy 21 (AAP) reference data exists below 40 weeks gestation"
-    
-    if age < 0.083 and measurement_method in ['height', 'ofc']: # lower threshold of trisomy_21 data
-        return True, "No Trisomy 21 (AAP) reference data exists below 1 month of age for height or head circumference."
-    
-    if age < 2 and measurement_method == 'bmi': # lower threshold of trisomy_21 data
-         return True, "No Trisomy 21 (AAP) reference data exists below 2 years of age for BMI."
-    
-    if age > TWENTY_YEARS: # upper threshold of trisomy_21 data
-        return True, "Trisomy 21 reference data does not exist over the age of 20y."
-    
-    return False, None
 
 def trisomy_21_aap_lms_array_for_measurement_and_sex(
         measurement_method: str,
@@ -72,24 +70,19 @@ def trisomy_21_aap_lms_array_for_measurement_and_sex(
     ):
     # returns the LMS array for a given measurement
     # raises a LookupError if the data is not available
-    # No need for default_youngest_reference as all the data is from the same source
     # Note there is an overlap in the age ranges of the two datasets, so the age parameter is used to select the correct dataset - below 36mths the data is more granular
+    # (see the Trisomy 21 (AAP) segments in reference_registry.py)
+    from .reference_registry import reference_for
 
-    data_invalid, data_error = reference_data_absent(age=age, measurement_method=measurement_method, sex=sex)
+    return reference_for(TRISOMY_21_AAP).lms_value_array_for_measurement(
+        age=age,
+        measurement_method=measurement_method,
+        sex=sex,
+        default_youngest_reference=default_youngest_reference,
+    )
 
-    if data_invalid:
-        raise LookupError(f"Reference data absent: {data_error}")
-    else:
-        if age <= 3.0 and measurement_method in ['height', 'weight', 'ofc']:
-            if measurement_method == 'ofc' and age==3 and default_youngest_reference:
-                return TRISOMY_21_AAP_INFANT_DATA["measurement"][measurement_method][sex]
-            elif measurement_method == 'ofc' and age==3 and not default_youngest_reference:
-                return TRISOMY_21_AAP_CHILD_DATA["measurement"][measurement_method][sex]
-            
-            return TRISOMY_21_AAP_INFANT_DATA["measurement"][measurement_method][sex]
-        else:
-            return TRISOMY_21_AAP_CHILD_DATA["measurement"][measurement_method][sex]
 
+@returns_plain_reference_data
 def select_reference_data_for_trisomy_21_aap(trisomy_21_aap_reference_name, measurement_method:str, sex:str, default_youngest_reference: bool = False):
 
     if trisomy_21_aap_reference_name == TRISOMY_21_AAP_INFANT:
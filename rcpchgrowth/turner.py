@@ -1,7 +1,6 @@
 import json
-from importlib import resources
-from pathlib import Path
 from .constants import *
+from .reference_data import REFERENCE_DATA, returns_plain_reference_data
 # import timeit #see below, comment back in if timing functions in this module
 
 """
@@ -18,13 +17,22 @@ lms: L, M or S
 reference: reference data
 """
 
-# load the reference data
-data_directory = resources.files("rcpchgrowth.data_tables")
+# the reference data files, loaded on first use through REFERENCE_DATA (see reference_data.py)
+TURNER_FILE = "turner.json"
+
+_REFERENCE_DATA_FILES = {
+    "TURNER_DATA": TURNER_FILE,
+}
+
+
+def __getattr__(name: str):
+    # the tables named in _REFERENCE_DATA_FILES are loaded on first access
+    try:
+        file_name = _REFERENCE_DATA_FILES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return REFERENCE_DATA.load(file_name)
 
-data_path = Path(data_directory, "turner.json")
-with open(data_path) as json_file:
-            TURNER_DATA = json.load(json_file)
-            json_file.close()
 
 def turner_lms_array_for_measurement_and_sex(
         measurement_method: str,    
@@ -32,18 +40,18 @@ def turner_lms_array_for_measurement_and_sex(
         age: float
     ):
 
-    invalid_data, data_error = reference_data_absent(age=age, measurement_method=measurement_method, sex=sex)
+    # the registry imports the data file name from this module
+    from .reference_registry import reference_for
 
-    if invalid_data:
-        raise LookupError(data_error)
-
-    # Get the Turner reference data
     try:
-        return TURNER_DATA["measurement"][measurement_method][sex]
-    except: # there is no reference for the age supplied
+        return reference_for(TURNERS).lms_value_array_for_measurement(
+            age=age, measurement_method=measurement_method, sex=sex
+        )
+    except KeyError: # there is no reference for the measurement_method or sex supplied
         raise LookupError("The Turner's syndrome reference cannot be found.")
     
 
+
 def reference_data_absent( 
         age: float,
         measurement_method: str,
@@ -57,23 +65,16 @@ def reference_data_absent(
     Turners syndrome
     Data are available for girls heights at year intervals from 1-20y
     No other reference data are available
+    These are the absence rules of the Turner segment in reference_registry.py.
     """
+    from .reference_registry import reference_for
+
+    invalid_data, data_error = reference_for(TURNERS).reference_data_absent(
+        age=age, measurement_method=measurement_method, sex=sex
+    )
+    return invalid_data, data_error if invalid_data else "Valid Data"
 
-    if age < 1: # lower threshold of Turner data
-        return True, 'There is no reference data below 1 year.'
-    elif age > TWENTY_YEARS: # upper threshold of Turner data
-        return True, "There is no reference data above 20 years."
-    elif measurement_method==WEIGHT or measurement_method==BMI or measurement_method==HEAD_CIRCUMFERENCE:
-        text_string = measurement_method
-        if measurement_method == BMI:
-            text_string = "BMI (body mass index)"
-        elif measurement_method == HEAD_CIRCUMFERENCE:
-            text_string = "head circumference"
-        return True, f"There is no reference data for {text_string}."
-    elif sex == MALE:
-        return True, f"Turner's syndrome only affects girls and women."
-    else:
-        return False, "Valid Data"
 
+@returns_plain_reference_data
 def select_reference_data_for_turner(measurement_method: str, sex: str):
     return turner_lms_array_for_measurement_and_sex(measurement_method=measurement_method, sex=sex, age=1.0)
\ No newline at end of file
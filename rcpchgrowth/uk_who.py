@@ -4,11 +4,10 @@ Handles UK-WHO-specific reference data selection
 
 # standard imports
 import json
-from importlib import resources
-from pathlib import Path
 
 # rcpch imports
 from .constants import *
+from .reference_data import REFERENCE_DATA, returns_plain_reference_data
 
 """
 birth_date: date of birth
@@ -24,38 +23,30 @@ lms: L, M or S
 reference: reference data
 """
 
-# load the reference data
-data_directory = resources.files("rcpchgrowth.data_tables")
-
-data_path = Path(
-    data_directory, "uk90_preterm.json")  # 23 - 42 weeks gestation
-with open(data_path) as json_file:
-    UK90_PRETERM_DATA = json.load(json_file)
-    json_file.close()
-
-data_path = Path(
-    data_directory, "uk90_term.json")  # 37-42 weeks gestation
-with open(data_path) as json_file:
-    UK90_TERM_DATA = json.load(json_file)
-    json_file.close()
-
-data_path = Path(
-    data_directory, "who_infants.json")  # 2 weeks to 2 years
-with open(data_path) as json_file:
-    WHO_INFANTS_DATA = json.load(json_file)
-    json_file.close()
-
-data_path = Path(
-    data_directory, "who_children.json")  # 2 years to 4 years
-with open(data_path) as json_file:
-    WHO_CHILD_DATA = json.load(json_file)
-    json_file.close()
-
-data_path = Path(
-    data_directory, "uk90_child.json")  # 4 years to 20 years
-with open(data_path) as json_file:
-    UK90_CHILD_DATA = json.load(json_file)
-    json_file.close()
+# the reference data files, loaded on first use through REFERENCE_DATA (see reference_data.py)
+UK90_PRETERM_FILE = "uk90_preterm.json"  # 23 - 42 weeks gestation
+UK90_TERM_FILE = "uk90_term.json"  # 37-42 weeks gestation
+WHO_INFANTS_FILE = "who_infants.json"  # 2 weeks to 2 years
+WHO_CHILD_FILE = "who_children.json"  # 2 years to 4 years
+UK90_CHILD_FILE = "uk90_child.json"  # 4 years to 20 years
+
+_REFERENCE_DATA_FILES = {
+    "UK90_PRETERM_DATA": UK90_PRETERM_FILE,
+    "UK90_TERM_DATA": UK90_TERM_FILE,
+    "WHO_INFANTS_DATA": WHO_INFANTS_FILE,
+    "WHO_CHILD_DATA": WHO_CHILD_FILE,
+    "UK90_CHILD_DATA": UK90_CHILD_FILE,
+}
+
+
+def __getattr__(name: str):
+    # the tables named in _REFERENCE_DATA_FILES are loaded on first access
+    try:
+        file_name = _REFERENCE_DATA_FILES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return REFERENCE_DATA.load(file_name)
+
 
 # public functions
 
@@ -75,30 +66,12 @@ def reference_data_absent(
      - There is only BMI reference data from 2 weeks of age to aged 20y
      - Head circumference reference data is available from 23 weeks gestation to 17y in girls and 18y in boys
      - lowest threshold is 23 weeks, upper threshold is 20y
+    These are the absence rules of the UK-WHO segments in reference_registry.py.
     """
+    # the registry imports the data file names from this module
+    from .reference_registry import reference_for
 
-    if age < TWENTY_THREE_WEEKS_GESTATION:  # lower threshold of UK90 data
-        return True, "UK-WHO data does not exist below 23 weeks gestation."
-
-    if age > TWENTY_YEARS:  # upper threshold of UK90 data
-        return True, "UK-WHO data does not exist above 20 years."
-
-    if measurement_method == HEIGHT and age < TWENTY_FIVE_WEEKS_GESTATION:
-        return True, "UK-WHO length data does not exist in infants below 25 weeks gestation."
-
-    elif measurement_method == BMI and age < FORTY_TWO_WEEKS_GESTATION:
-        return True, "UK-WHO BMI data does not exist below 2 weeks of age."
-
-    elif measurement_method == HEAD_CIRCUMFERENCE:
-        if (sex == MALE and age > EIGHTEEN_YEARS) or (sex == FEMALE and age > SEVENTEEN_YEARS):
-            if sex == MALE:
-                return True, "UK-WHO head circumference data does not exist in boys over 18 y of age."
-            else:
-                return True, "UK-WHO head circumference data does not exist in girls over 17 y of age."
-        else:
-            return False, ""
-    else:
-        return False, ""
+    return reference_for(UK_WHO).reference_data_absent(age=age, measurement_method=measurement_method, sex=sex)
 
 
 def uk_who_reference(
@@ -114,40 +87,21 @@ def uk_who_reference(
     The function return the appropriate reference file as json
     """
 
-    # These conditionals are to select the correct reference
+    # Below or above the range for which we have reference data, we can't provide a calculation.
     if age < UK90_REFERENCE_LOWER_THRESHOLD:
-        # Below the range for which we have reference data, we can't provide a calculation.
-        return ValueError("There is no UK90 reference data below 23 weeks gestation")
-    elif age < UK_WHO_INFANT_LOWER_THRESHOLD:
-        # Below 42 weeks, the UK90 preterm data is always used
-        return UK90_PRETERM_DATA
-
-    elif age < WHO_CHILD_LOWER_THRESHOLD:
-        # Children beyond 2 weeks but below 2 years are measured lying down using WHO data
-        if age == FORTY_TWO_WEEKS_GESTATION and default_youngest_reference:
-            # If default_youngest_reference is True, the younger reference is used to calculate values
-            # This is specifically for the overlap between WHO 2006 lying and standing in centile curve generation
-            return UK90_PRETERM_DATA
-        return WHO_INFANTS_DATA
-
-    elif age < WHO_CHILDREN_UPPER_THRESHOLD:
-        # Children 2 years and beyond but below 4 years are measured standing up using WHO data
-        if age == 2.0 and default_youngest_reference:
-            # If default_youngest_reference is True, the younger reference is used to calculate values
-            # This is specifically for the overlap between WHO 2006 lying and standing in centile curve generation
-            return WHO_INFANTS_DATA     
-        return WHO_CHILD_DATA
-        
-    elif age <= UK90_UPPER_THRESHOLD:
-        # All children 4 years and above are measured using UK90 child data
-        if age == 4.0 and default_youngest_reference:
-            # If default_youngest_reference is True, the younger reference is used to calculate values
-            # This is specifically for the overlap between WHO 2006 and UK90 in centile curve generation
-            return WHO_CHILD_DATA
-        return UK90_CHILD_DATA
+        raise ValueError("There is no UK90 reference data below 23 weeks gestation")
+    if age > UK90_UPPER_THRESHOLD:
+        raise ValueError("There is no UK90 reference data above the age of 20 years.")
 
-    else:
-        return ValueError("There is no UK90 reference data above the age of 20 years.")
+    # the segment is selected as for every calculation (see the UK-WHO segments in reference_registry.py):
+    # if default_youngest_reference is True, the younger reference is used at the disjunctions - this is
+    # specifically for the overlaps between UK90 preterm, WHO 2006 lying, WHO 2006 standing and UK90 child in centile curve generation
+    from .reference_registry import reference_for
+
+    segment = reference_for(UK_WHO).segment_for_age(
+        age=age, measurement_method=None, default_youngest_reference=default_youngest_reference
+    )
+    return REFERENCE_DATA.load(segment.data_file(None))
 
 
 def uk_who_lms_array_for_measurement_and_sex(
@@ -158,28 +112,18 @@ def uk_who_lms_array_for_measurement_and_sex(
 ) -> list:
 
     # selects the correct lms data array from the patchwork of references that make up UK-WHO
+    # (see the UK-WHO segments in reference_registry.py)
+    from .reference_registry import reference_for
 
-    try:
-        selected_reference = uk_who_reference(
-            age=age,
-            default_youngest_reference=default_youngest_reference
-        )
-    except:  #  there is no reference for the age supplied
-        return LookupError("There is no UK-WHO reference for the age supplied.")
-
-    # Check that the measurement requested has reference data at that age
-
-    invalid_data, data_error = reference_data_absent(
+    return reference_for(UK_WHO).lms_value_array_for_measurement(
         age=age,
         measurement_method=measurement_method,
-        sex=sex)
-
-    if invalid_data:
-        raise LookupError(data_error)
-    else:
-        return selected_reference["measurement"][measurement_method][sex]
+        sex=sex,
+        default_youngest_reference=default_youngest_reference,
+    )
 
 
+@returns_plain_reference_data
 def select_reference_data_for_uk_who_chart(
     uk_who_reference_name: str, 
     measurement_method: str, 
@@ -4,11 +4,10 @@ Handles WHO reference data selection
 
 # standard imports
 import json
-from importlib import resources
-from pathlib import Path
 
 # rcpch imports
 from .constants import *
+from .reference_data import REFERENCE_DATA, returns_plain_reference_data
 
 """
 birth_date: date of birth
@@ -24,26 +23,26 @@ lms: L, M or S
 reference: reference data
 """
 
-# load the reference data
-data_directory = resources.files("rcpchgrowth.data_tables")
+# the reference data files, loaded on first use through REFERENCE_DATA (see reference_data.py)
+WHO_INFANTS_FILE = "who_infants.json"  # 2 weeks to 2 years
+WHO_CHILD_FILE = "who_children.json"  # 2 years to 5 years
+WHO_2007_FILE = "who_2007_children.json"  # 5 years to 19 years
 
-data_path = Path(
-    data_directory, "who_infants.json")  # 2 weeks to 2 years
-with open(data_path) as json_file:
-    WHO_INFANTS_DATA = json.load(json_file)
-    json_file.close()
+_REFERENCE_DATA_FILES = {
+    "WHO_INFANTS_DATA": WHO_INFANTS_FILE,
+    "WHO_CHILD_DATA": WHO_CHILD_FILE,
+    "WHO_2007_DATA": WHO_2007_FILE,
+}
 
-data_path = Path(
-    data_directory, "who_children.json")  # 2 years to 5 years
-with open(data_path) as json_file:
-    WHO_CHILD_DATA = json.load(json_file)
-    json_file.close()
 
-data_path = Path(
-    data_directory, "who_2007_children.json")  # 5 years to 19 years
-with open(data_path) as json_file:
-    WHO_2007_DATA = json.load(json_file)
-    json_file.close()
+def __getattr__(name: str):
+    # the tables named in _REFERENCE_DATA_FILES are loaded on first access
+    try:
+        file_name = _REFERENCE_DATA_FILES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return REFERENCE_DATA.load(file_name)
+
 
 # public functions
 
@@ -63,22 +62,12 @@ def reference_data_absent(
      - There is only BMI reference data from 2 weeks of age to aged 20y
      - Head circumference reference data is available from 23 weeks gestation to 17y in girls and 18y in boys
      - lowest threshold is 23 weeks, upper threshold is 20y
+    These are the absence rules of the WHO segments in reference_registry.py.
     """
+    # the registry imports the data file names from this module
+    from .reference_registry import reference_for
 
-    if age < ZERO_YEARS:  # lower threshold of WHO data
-        return True, "WHO data does not exist below term."
-
-    if age > NINETEEN_YEARS:  # upper threshold of UK90 data
-        return True, "WHO data does not exist above 19 years."
-
-    if measurement_method == WEIGHT and age > TEN_YEARS:
-        return True, "WHO weight data does not exist in children over 10 y of age."
-    
-    if measurement_method == HEAD_CIRCUMFERENCE and age > FIVE_YEARS:
-        return True, "WHO head circumference data does not exist in children over 5 y of age."
-
-    else:
-        return False, ""
+    return reference_for(WHO).reference_data_absent(age=age, measurement_method=measurement_method, sex=sex)
 
 
 def who_reference(
@@ -94,26 +83,18 @@ def who_reference(
     The function return the appropriate reference file as json
     """
 
-    if age <= WHO_2006_REFERENCE_UPPER_THRESHOLD:
-        # Children up to and including 5 years are measured using WHO 2006 data
-        if (age == 2.0 and default_youngest_reference) or age < WHO_CHILD_LOWER_THRESHOLD:
-            # If default_youngest_reference is True, the younger reference is used to calculate values
-            # This is specifically for the overlap between WHO 2006 lying and standing in centile curve generation
-            # WHO 2006 reference is used for children below 2 years or those who are 2 years old and default_youngest_reference is True
-            return WHO_INFANTS_DATA
-        elif age == 5.0:
-            if default_youngest_reference:
-                return WHO_CHILD_DATA
-            else:
-                return WHO_2007_DATA
-        return WHO_CHILD_DATA
-        
-    elif age <= WHO_2007_REFERENCE_UPPER_THRESHOLD:
-        # All children over 5 years and above are measured using WHO 2007 child data
-        return WHO_2007_DATA
+    # the segment is selected as for every calculation (see the WHO segments in reference_registry.py):
+    # if default_youngest_reference is True, the younger reference is used at 2 and 5 years - this is
+    # specifically for the overlaps between WHO 2006 lying, WHO 2006 standing and WHO 2007 in centile curve generation
+    from .reference_registry import reference_for
 
-    else:
+    try:
+        segment = reference_for(WHO).segment_for_age(
+            age=age, measurement_method=None, default_youngest_reference=default_youngest_reference
+        )
+    except LookupError:
         raise LookupError("There are no WHO reference data above the age of 19 years.")
+    return REFERENCE_DATA.load(segment.data_file(None))
 
 
 def who_lms_array_for_measurement_and_sex(
@@ -123,29 +104,19 @@ def who_lms_array_for_measurement_and_sex(
     default_youngest_reference: bool = False
 ) -> list:
 
-    # selects the correct lms data array from the patchwork of references that make up UK-WHO
-
-    try:
-        selected_reference = who_reference(
-            age=age,
-            default_youngest_reference=default_youngest_reference
-        )
-    except:  #  there is no reference for the age supplied
-        raise LookupError("There is no WHO reference for the age supplied.")
+    # selects the correct lms data array from the patchwork of references that make up WHO
+    # (see the WHO segments in reference_registry.py)
+    from .reference_registry import reference_for
 
-    # Check that the measurement requested has reference data at that age
-
-    invalid_data, data_error = reference_data_absent(
+    return reference_for(WHO).lms_value_array_for_measurement(
         age=age,
         measurement_method=measurement_method,
-        sex=sex)
-
-    if invalid_data:
-        raise LookupError(data_error)
-    else:
-        return selected_reference["measurement"][measurement_method][sex]
+        sex=sex,
+        default_youngest_reference=default_youngest_reference,
+    )
 
 
+@returns_plain_reference_data
 def select_reference_data_for_who_chart(
     who_reference_name: str, 
     measurement_method: str, 
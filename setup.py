@@ -1,8 +1,29 @@
 from setuptools import setup, find_packages
-from os import path
+from setuptools.command.build_py import build_py
+from os import environ, path
+import subprocess
+import sys
 
 here = path.abspath(path.dirname(__file__))
 
+
+class build_py_with_charts(build_py):
+    """
+    Builds the package with its compiled reference data (see rcpchgrowth/compiled_reference_data.py) and precomputed
+    standard charts (see rcpchgrowth/precomputed_charts.py). Both are made by the package in build_lib, from the
+    reference data and chart functions being packaged, not by the source tree.
+    """
+
+    def run(self):
+        super().run()
+        if not self.dry_run:
+            environment = dict(environ, PYTHONPATH=path.abspath(self.build_lib))
+            for module in ["rcpchgrowth.compiled_reference_data", "rcpchgrowth.precomputed_charts"]:
+                subprocess.run(
+                    [sys.executable, "-m", module], cwd=self.build_lib, env=environment, check=True
+                )
+
+
 with open(path.join(here, "README.md"), encoding="utf-8") as f:
     long_description = f.read()
 
@@ -24,8 +45,12 @@ setup(
     keywords="growth charts, anthropometry, SDS, centile, UK-WHO, UK90, Trisomy 21 (UK), Trisomy 21 (AAP), Turner, CDC",
     packages=find_packages(),
     python_requires=">3.8",
-    install_requires=["python-dateutil", "scipy"],
+    install_requires=["numpy", "python-dateutil"],
+    extras_require={
+        "scipy": ["scipy"],  # faster normal distribution functions for large batches
+    },
     include_package_data=True,
+    cmdclass={"build_py": build_py_with_charts},
     project_urls={
         "Bug Reports": "https://github.com/rcpch/rcpchgrowth-python/issues",
         "API management": "https://dev.rcpch.ac.uk",